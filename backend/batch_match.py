@@ -0,0 +1,129 @@
+"""
+Batch Grant Matching Script - Match a spreadsheet of project summaries in one run
+Input is a CSV or JSON Lines file with project_summary, organization_type,
+focus_area and email columns, and optional min_amount/max_amount funding
+bounds; results are written as JSON Lines
+"""
+import asyncio
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import List, Dict
+from dotenv import load_dotenv
+
+# Load environment
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+# Imported after .env is loaded so shared pools are sized from it
+from grant_matcher import GrantMatcher
+from database import Database
+from http_client import http_client
+from mongo_client import mongo
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+REQUIRED_FIELDS = ('project_summary', 'organization_type', 'focus_area', 'email')
+AMOUNT_FIELDS = ('min_amount', 'max_amount')
+
+def read_items(path: str) -> List[Dict[str, str]]:
+    """Read submissions from a CSV or JSON Lines file"""
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.endswith('.jsonl') or path.endswith('.json'):
+            items = [json.loads(line) for line in f if line.strip()]
+        else:
+            items = list(csv.DictReader(f))
+
+    valid = []
+    for line_number, item in enumerate(items, start=1):
+        missing = [field for field in REQUIRED_FIELDS if not (item.get(field) or '').strip()]
+        if missing:
+            logger.warning(f"Skipping row {line_number}: missing {', '.join(missing)}")
+            continue
+        row = {field: item[field].strip() for field in REQUIRED_FIELDS}
+        try:
+            for field in AMOUNT_FIELDS:
+                value = str(item.get(field) or '').replace('$', '').replace(',', '').strip()
+                row[field] = float(value) if value else None
+        except ValueError:
+            logger.warning(f"Skipping row {line_number}: invalid funding amount")
+            continue
+        valid.append(row)
+    return valid
+
+async def run_batch(input_path: str, output_path: str = None, save: bool = True):
+    """Match every submission in the input file"""
+    items = read_items(input_path)
+    if not items:
+        logger.error("No valid submissions found")
+        return
+
+    mongo_url = os.environ.get('MONGO_URL')
+    db_name = os.environ.get('DB_NAME')
+
+    matcher = GrantMatcher(mongo_url, db_name)
+    await matcher.build_index()
+
+    database = Database(mongo_url, db_name)
+
+    try:
+        submission_ids = [None] * len(items)
+        if save:
+            submission_ids = await database.save_submissions(items)
+            logger.info(f"Saved {len(submission_ids)} submissions")
+
+        batch = await matcher.match_batch([
+            {
+                'project_summary': item['project_summary'],
+                'focus_area': item['focus_area'],
+                'org_type': item['organization_type'],
+                'min_amount': item['min_amount'],
+                'max_amount': item['max_amount'],
+                'seed': submission_id
+            }
+            for item, submission_id in zip(items, submission_ids)
+        ])
+        logger.info(f"Sources: {batch['sources']}")
+
+        output = open(output_path, 'w', encoding='utf-8') if output_path else sys.stdout
+        try:
+            for item, submission_id, grants in zip(items, submission_ids, batch['results']):
+                output.write(json.dumps({
+                    'submission_id': submission_id,
+                    'email': item['email'],
+                    'grants': grants
+                }, default=str) + '\n')
+        finally:
+            if output_path:
+                output.close()
+
+        logger.info(f"Matched {len(items)} submissions")
+
+    finally:
+        await mongo.close()
+        await http_client.close()
+        matcher.usaspending_cache.close()
+
+def main():
+    parser = argparse.ArgumentParser(description='Batch grant matching utility')
+    parser.add_argument('input', help='CSV or JSON Lines file of submissions')
+    parser.add_argument('--output', type=str,
+                       help='Write results to this JSON Lines file instead of stdout')
+    parser.add_argument('--no-save', action='store_true',
+                       help='Do not persist the submissions')
+
+    args = parser.parse_args()
+
+    asyncio.run(run_batch(args.input, args.output, save=not args.no_save))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Cold Start Benchmark - import time and first-request latency of the API
+Every run uses fresh interpreters: one times `import server` on its own and
+reports which heavy optional stacks it pulled in; another launches uvicorn and
+times the startup warm-up until the app answers, then the first requests.
+Uses the MONGO_URL / DB_NAME of backend/.env like the server itself.
+"""
+import argparse
+import json
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+ROOT_DIR = Path(__file__).parent
+
+# Modules the API should not import until a route needs them
+HEAVY_MODULES = ('grant_scraper', 'selenium', 'undetected_chromedriver', 'fake_useragent', 'stripe')
+
+IMPORT_PROBE = f"""
+import json, sys, time
+started = time.perf_counter()
+import server
+elapsed = time.perf_counter() - started
+print(json.dumps({{
+    'import_seconds': elapsed,
+    'heavy_modules': [name for name in {HEAVY_MODULES!r} if name in sys.modules]
+}}))
+"""
+
+# Posted with --match; records a submission like a real visitor would
+SAMPLE_MATCH = {
+    'project_summary': 'After-school literacy tutoring and STEM mentoring for middle school students',
+    'organization_type': 'Nonprofit',
+    'focus_area': 'Education',
+    'email': 'benchmark@example.com'
+}
+
+
+def measure_import() -> Dict[str, Any]:
+    result = subprocess.run(
+        [sys.executable, '-c', IMPORT_PROBE],
+        cwd=ROOT_DIR, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def timed_request(url: str, payload: Optional[Dict[str, Any]] = None, timeout: float = 60) -> Tuple[float, int, Any]:
+    """(seconds, status, decoded body) of one request"""
+    data = json.dumps(payload).encode('utf-8') if payload is not None else None
+    request = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            status, body = response.status, response.read()
+    except urllib.error.HTTPError as e:
+        status, body = e.code, e.read()
+    elapsed = time.perf_counter() - started
+    try:
+        return elapsed, status, json.loads(body)
+    except ValueError:
+        return elapsed, status, None
+
+
+def measure_server(path: str, payload: Optional[Dict[str, Any]], timeout: float) -> Dict[str, Any]:
+    """Launch uvicorn, wait until it answers, then time the first two requests"""
+    port = free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    launched = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'server:app', '--port', str(port), '--log-level', 'warning'],
+        cwd=ROOT_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        # uvicorn accepts connections only after the startup phase finished
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+            if time.perf_counter() - launched > timeout:
+                raise TimeoutError(f"server not ready after {timeout}s")
+            try:
+                _, _, health = timed_request(f'{base_url}/api/health', timeout=1)
+                break
+            except (urllib.error.URLError, ConnectionError, socket.timeout):
+                time.sleep(0.02)
+        ready_seconds = time.perf_counter() - launched
+
+        first_seconds, first_status, _ = timed_request(base_url + path, payload, timeout)
+        second_seconds, second_status, _ = timed_request(base_url + path, payload, timeout)
+        return {
+            'ready_seconds': ready_seconds,
+            'startup_ms': (health or {}).get('startup'),
+            'first_request_seconds': first_seconds,
+            'first_status': first_status,
+            'second_request_seconds': second_seconds,
+            'second_status': second_status
+        }
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure API import time and first-request latency')
+    parser.add_argument('--runs', type=int, default=3, help='Fresh processes to measure')
+    parser.add_argument('--path', type=str, default='/api/match/sources',
+                       help='Endpoint timed as the first request (GET)')
+    parser.add_argument('--match', action='store_true',
+                       help='Time POST /api/match with a sample project instead')
+    parser.add_argument('--timeout', type=float, default=60, help='Seconds to wait for the server')
+    args = parser.parse_args()
+
+    path, payload = ('/api/match', SAMPLE_MATCH) if args.match else (args.path, None)
+
+    imports, servers = [], []
+    for run in range(1, args.runs + 1):
+        imported = measure_import()
+        served = measure_server(path, payload, args.timeout)
+        imports.append(imported['import_seconds'])
+        servers.append(served)
+
+        timings = (served['startup_ms'] or {}).get('timings_ms', {})
+        print(
+            f"run {run}: import {imported['import_seconds'] * 1000:.0f} ms "
+            f"(heavy modules: {', '.join(imported['heavy_modules']) or 'none'}), "
+            f"ready {served['ready_seconds'] * 1000:.0f} ms (warm-up {timings}), "
+            f"first {path} {served['first_request_seconds'] * 1000:.1f} ms [{served['first_status']}], "
+            f"second {served['second_request_seconds'] * 1000:.1f} ms [{served['second_status']}]"
+        )
+
+    def median_ms(values):
+        return f"{statistics.median(values) * 1000:.1f} ms"
+
+    print(
+        f"median over {args.runs} runs: import {median_ms(imports)}, "
+        f"ready {median_ms([s['ready_seconds'] for s in servers])}, "
+        f"first request {median_ms([s['first_request_seconds'] for s in servers])}, "
+        f"second request {median_ms([s['second_request_seconds'] for s in servers])}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Index Snapshot Build Script - Publish the shared grant index snapshot
+Builds the BM25 index, metadata columns and semantic vectors from the grants
+collection and publishes them to INDEX_SNAPSHOT_DIR, where every running
+worker picks the new version up within INDEX_SNAPSHOT_POLL_SECONDS.
+"""
+import asyncio
+import argparse
+import logging
+import os
+from pathlib import Path
+from dotenv import load_dotenv
+
+# Load environment
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+from grant_matcher import GrantMatcher
+from mongo_client import mongo
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_SNAPSHOT_DIR = str(ROOT_DIR / 'index_snapshots')
+
+async def build_index_snapshot(snapshot_dir: str) -> bool:
+    """Publish a fresh snapshot of the grants collection"""
+    matcher = GrantMatcher()
+    matcher.snapshot_dir = snapshot_dir
+    matcher.load_semantic_index()
+    try:
+        published = await matcher.publish_snapshot()
+    finally:
+        await mongo.close()
+        matcher.usaspending_cache.close()
+
+    if published:
+        logger.info(f"Index snapshot ready: {matcher.snapshot.version} ({matcher.snapshot.size} grants)")
+    return published
+
+def main():
+    parser = argparse.ArgumentParser(description='Build and publish the shared grant index snapshot')
+    parser.add_argument('--output', type=str,
+                       default=os.environ.get('INDEX_SNAPSHOT_DIR') or DEFAULT_SNAPSHOT_DIR,
+                       help='Snapshot directory (default: INDEX_SNAPSHOT_DIR)')
+
+    args = parser.parse_args()
+
+    if not asyncio.run(build_index_snapshot(args.output)):
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
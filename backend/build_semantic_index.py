@@ -0,0 +1,68 @@
+"""
+Semantic Index Build Script - Offline LSA projection of the grants corpus
+Fits a truncated SVD over the TF-IDF matrix of every active grant plus the
+curated catalog and writes the model and grant vectors to SEMANTIC_INDEX_PATH.
+Run after large imports; grants scraped in between are folded in by the server.
+"""
+import asyncio
+import argparse
+import logging
+import os
+from pathlib import Path
+from dotenv import load_dotenv
+
+# Load environment
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+# Imported after .env is loaded so shared pools are sized from it
+from grant_catalog import static_catalog
+from grant_metadata import GrantMetadataStore
+from mongo_client import mongo
+from semantic_index import SemanticIndex
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = str(ROOT_DIR / 'semantic_index.npz')
+
+async def build_semantic_index(output_path: str, dimensions: int = 100, min_df: int = 1):
+    """Fit the semantic index over the grants collection and the static catalog"""
+    db = mongo.database()
+
+    try:
+        grants = await db.grants.find(
+            {'is_active': True},
+            {'title': 1, 'description': 1, 'focus_areas': 1, 'grant_id': 1}
+        ).to_list(None)
+    finally:
+        await mongo.close()
+
+    # Catalog grants shape the latent space too; their vectors are folded in at query time
+    documents = grants + list(static_catalog.documents())
+    keys = [GrantMetadataStore.key(grant) for grant in grants] + [None] * len(static_catalog)
+
+    index = SemanticIndex.fit(documents, keys, dimensions=dimensions, min_df=min_df)
+    index.save(output_path)
+    logger.info(f"Semantic index ready: {len(grants)} grants, {index.dimensions} dimensions")
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the offline semantic (LSA) grant index')
+    parser.add_argument('--output', type=str,
+                       default=os.environ.get('SEMANTIC_INDEX_PATH', DEFAULT_INDEX_PATH),
+                       help='Where to write the index (default: SEMANTIC_INDEX_PATH)')
+    parser.add_argument('--dimensions', type=int, default=100,
+                       help='Latent dimensions to keep')
+    parser.add_argument('--min-df', type=int, default=1,
+                       help='Ignore terms found in fewer grants than this')
+
+    args = parser.parse_args()
+
+    asyncio.run(build_semantic_index(args.output, args.dimensions, args.min_df))
+
+if __name__ == "__main__":
+    main()
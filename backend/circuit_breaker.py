@@ -0,0 +1,126 @@
+"""
+Circuit breaker and health tracking for grant sources
+Skips a source while it keeps failing and probes it again after a cool-down
+"""
+import time
+import logging
+from collections import deque
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is skipped because the source's circuit is open"""
+
+
+class CircuitBreaker:
+    """Tracks a rolling window of outcomes and latencies for one source"""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        error_rate_threshold: float = 0.5,
+        window_size: int = 20,
+        reset_timeout: float = 30.0
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.reset_timeout = reset_timeout
+
+        self.state = CLOSED
+        self.outcomes = deque(maxlen=window_size)
+        self.latencies = deque(maxlen=window_size)
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.probe_in_flight = False
+        self.total_calls = 0
+        self.total_failures = 0
+        self.total_skipped = 0
+
+    def allow_request(self) -> bool:
+        """Decide whether a call may go through, moving to half-open once the cool-down has passed"""
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = HALF_OPEN
+            self.probe_in_flight = False
+            logger.info(f"Circuit for {self.name} half-open, probing")
+
+        if self.state == CLOSED:
+            return True
+
+        # Half-open lets exactly one probe through at a time
+        if self.state == HALF_OPEN and not self.probe_in_flight:
+            self.probe_in_flight = True
+            return True
+
+        self.total_skipped += 1
+        return False
+
+    def record_success(self, latency: float):
+        self.total_calls += 1
+        self.outcomes.append(True)
+        self.latencies.append(latency)
+        self.consecutive_failures = 0
+
+        if self.state != CLOSED:
+            logger.info(f"Circuit for {self.name} closed, source recovered")
+        self.state = CLOSED
+        self.opened_at = None
+        self.probe_in_flight = False
+
+    def record_failure(self, latency: float):
+        self.total_calls += 1
+        self.total_failures += 1
+        self.outcomes.append(False)
+        self.latencies.append(latency)
+        self.consecutive_failures += 1
+
+        if self.state == HALF_OPEN or self.should_open():
+            self.open()
+
+    def release(self):
+        """A call ended without an outcome (its caller went away); a half-open probe may be retried"""
+        self.probe_in_flight = False
+
+    def should_open(self) -> bool:
+        if self.consecutive_failures >= self.failure_threshold:
+            return True
+        if len(self.outcomes) < self.outcomes.maxlen:
+            return False
+        return self.error_rate() >= self.error_rate_threshold
+
+    def open(self):
+        if self.state != OPEN:
+            logger.warning(f"Circuit for {self.name} opened after {self.consecutive_failures} consecutive failures")
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.probe_in_flight = False
+
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the breaker state and rolling health statistics"""
+        latencies = sorted(self.latencies)
+        return {
+            'state': self.state,
+            'error_rate': round(self.error_rate(), 3),
+            'consecutive_failures': self.consecutive_failures,
+            'avg_latency_ms': round(sum(latencies) / len(latencies) * 1000, 1) if latencies else None,
+            'p95_latency_ms': round(latencies[int(0.95 * (len(latencies) - 1))] * 1000, 1) if latencies else None,
+            'total_calls': self.total_calls,
+            'total_failures': self.total_failures,
+            'total_skipped': self.total_skipped,
+            'retry_in_seconds': (
+                max(0.0, round(self.reset_timeout - (time.monotonic() - self.opened_at), 1))
+                if self.state == OPEN else None
+            )
+        }
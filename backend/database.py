@@ -1,33 +1,34 @@
-from motor.motor_asyncio import AsyncIOMotorClient
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 import hashlib
-import os
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+from mongo_client import mongo
 
 class Database:
     """Database handler for CelFund"""
     
-    def __init__(self, mongo_url: str, db_name: str):
-        self.client = AsyncIOMotorClient(mongo_url)
-        self.db = self.client[db_name]
+    def __init__(self, mongo_url: str = None, db_name: str = None):
+        # Handles on the process-wide pool; closing it is the app's job
+        self.db = mongo.database(db_name, mongo_url)
         self.submissions = self.db.grant_submissions
     
-    async def save_submission(
+    def new_submission(
         self,
         project_summary: str,
         email: str,
         organization_type: str,
         focus_area: str,
         ip_address: Optional[str] = None
-    ) -> str:
-        """Save a grant search submission"""
-        
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Build a submission document; its id is generated here, before any write"""
         # Hash IP for privacy
         ip_hash = None
         if ip_address:
             ip_hash = hashlib.sha256(ip_address.encode()).hexdigest()[:16]
         
         submission = {
+            '_id': ObjectId(),
             'project_summary': project_summary,
             'email': email,
             'organization_type': organization_type,
@@ -36,9 +37,46 @@ class Database:
             'timestamp': datetime.utcnow(),
             'status': 'active'
         }
-        
-        result = await self.submissions.insert_one(submission)
-        return str(result.inserted_id)
+        return str(submission['_id']), submission
+    
+    async def insert_submissions(self, submissions: List[Dict[str, Any]]):
+        """Write documents from new_submission in one bulk write; safe to retry"""
+        if not submissions:
+            return
+        try:
+            await self.submissions.insert_many(submissions, ordered=False)
+        except BulkWriteError as e:
+            # Duplicate _ids were written by an earlier attempt of the same batch
+            errors = [error for error in e.details.get('writeErrors', []) if error.get('code') != 11000]
+            if errors or e.details.get('writeConcernErrors'):
+                raise
+    
+    async def save_submission(
+        self,
+        project_summary: str,
+        email: str,
+        organization_type: str,
+        focus_area: str,
+        ip_address: Optional[str] = None
+    ) -> str:
+        """Save a grant search submission"""
+        submission_id, submission = self.new_submission(
+            project_summary, email, organization_type, focus_area, ip_address
+        )
+        await self.submissions.insert_one(submission)
+        return submission_id
+    
+    async def save_submissions(self, submissions: List[Dict[str, Any]]) -> List[str]:
+        """Save many grant search submissions in one bulk write"""
+        built = [
+            self.new_submission(
+                item['project_summary'], item['email'], item['organization_type'],
+                item['focus_area'], item.get('ip_address')
+            )
+            for item in submissions
+        ]
+        await self.insert_submissions([submission for _, submission in built])
+        return [submission_id for submission_id, _ in built]
     
     async def get_submission_stats(self) -> Dict[str, Any]:
         """Get submission statistics"""
@@ -63,7 +101,3 @@ class Database:
             'total_submissions': total,
             'by_focus_area': focus_areas
         }
-    
-    async def close(self):
-        """Close database connection"""
-        self.client.close()
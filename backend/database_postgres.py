@@ -1,7 +1,8 @@
 import os
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 import hashlib
+import uuid
 import asyncpg
 from contextlib import asynccontextmanager
 
@@ -21,6 +22,7 @@ class PostgresDatabase:
             await conn.execute('''
                 CREATE TABLE IF NOT EXISTS grant_submissions (
                     id SERIAL PRIMARY KEY,
+                    submission_id VARCHAR(32),
                     project_summary TEXT NOT NULL,
                     email VARCHAR(255) NOT NULL,
                     organization_type VARCHAR(100),
@@ -31,6 +33,16 @@ class PostgresDatabase:
                 )
             ''')
             
+            # Client-generated ids (tables created before they existed lack the column)
+            await conn.execute('''
+                ALTER TABLE grant_submissions
+                ADD COLUMN IF NOT EXISTS submission_id VARCHAR(32)
+            ''')
+            await conn.execute('''
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_submissions_submission_id 
+                ON grant_submissions(submission_id)
+            ''')
+            
             # Create index on email for faster lookups
             await conn.execute('''
                 CREATE INDEX IF NOT EXISTS idx_submissions_email 
@@ -43,30 +55,81 @@ class PostgresDatabase:
                 ON grant_submissions(focus_area)
             ''')
     
-    async def save_submission(
+    def new_submission(
         self,
         project_summary: str,
         email: str,
         organization_type: str,
         focus_area: str,
         ip_address: Optional[str] = None
-    ) -> str:
-        """Save a grant search submission"""
-        
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Build a submission row; its id is generated here, before any write"""
         # Hash IP for privacy
         ip_hash = None
         if ip_address:
             ip_hash = hashlib.sha256(ip_address.encode()).hexdigest()[:16]
         
+        submission = {
+            'submission_id': uuid.uuid4().hex,
+            'project_summary': project_summary,
+            'email': email,
+            'organization_type': organization_type,
+            'focus_area': focus_area,
+            'ip_hash': ip_hash,
+            'timestamp': datetime.utcnow()
+        }
+        return submission['submission_id'], submission
+    
+    async def insert_submissions(self, submissions: List[Dict[str, Any]]):
+        """Write rows from new_submission in one bulk insert; safe to retry"""
+        if not submissions:
+            return
+        
         async with self.pool.acquire() as conn:
-            submission_id = await conn.fetchval('''
+            await conn.execute('''
                 INSERT INTO grant_submissions 
-                (project_summary, email, organization_type, focus_area, ip_hash)
-                VALUES ($1, $2, $3, $4, $5)
-                RETURNING id
-            ''', project_summary, email, organization_type, focus_area, ip_hash)
-            
-            return str(submission_id)
+                (submission_id, project_summary, email, organization_type, focus_area, ip_hash, timestamp)
+                SELECT * FROM unnest(
+                    $1::varchar[], $2::text[], $3::varchar[], $4::varchar[],
+                    $5::varchar[], $6::varchar[], $7::timestamp[]
+                )
+                ON CONFLICT (submission_id) DO NOTHING
+            ''',
+                [item['submission_id'] for item in submissions],
+                [item['project_summary'] for item in submissions],
+                [item['email'] for item in submissions],
+                [item['organization_type'] for item in submissions],
+                [item['focus_area'] for item in submissions],
+                [item['ip_hash'] for item in submissions],
+                [item['timestamp'] for item in submissions]
+            )
+    
+    async def save_submission(
+        self,
+        project_summary: str,
+        email: str,
+        organization_type: str,
+        focus_area: str,
+        ip_address: Optional[str] = None
+    ) -> str:
+        """Save a grant search submission"""
+        submission_id, submission = self.new_submission(
+            project_summary, email, organization_type, focus_area, ip_address
+        )
+        await self.insert_submissions([submission])
+        return submission_id
+    
+    async def save_submissions(self, submissions: List[Dict[str, Any]]) -> List[str]:
+        """Save many grant search submissions in one bulk insert"""
+        built = [
+            self.new_submission(
+                item['project_summary'], item['email'], item['organization_type'],
+                item['focus_area'], item.get('ip_address')
+            )
+            for item in submissions
+        ]
+        await self.insert_submissions([submission for _, submission in built])
+        return [submission_id for submission_id, _ in built]
     
     async def get_submission_stats(self) -> Dict[str, Any]:
         """Get submission statistics"""
@@ -3,7 +3,6 @@ Database Utilities for Grant Scraping System
 Provides tools for managing, analyzing, and maintaining the grants database
 """
 import asyncio
-from motor.motor_asyncio import AsyncIOMotorClient
 from datetime import datetime, timedelta
 import os
 from pathlib import Path
@@ -11,11 +10,16 @@ from dotenv import load_dotenv
 import logging
 from typing import Dict, List, Any
 import json
+from pymongo import UpdateOne
 
 # Load environment
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+# Imported after .env is loaded so shared pools are sized from it
+from grant_normalization import normalize_grant
+from mongo_client import mongo
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -29,13 +33,11 @@ class GrantDatabaseManager:
     def __init__(self):
         self.mongo_url = os.environ.get('MONGO_URL')
         self.db_name = os.environ.get('DB_NAME')
-        self.client = None
         self.db = None
     
     async def connect(self):
         """Connect to database"""
-        self.client = AsyncIOMotorClient(self.mongo_url)
-        self.db = self.client[self.db_name]
+        self.db = mongo.database(self.db_name, self.mongo_url)
         logger.info(f"Connected to database: {self.db_name}")
     
     async def get_statistics(self) -> Dict[str, Any]:
@@ -107,10 +109,25 @@ class GrantDatabaseManager:
         logger.info(f"Removed {removed_count} duplicate grants")
         return removed_count
     
+    async def normalize_grants(self) -> int:
+        """Backfill typed deadline and funding amount fields on existing grants"""
+        updates = []
+        async for grant in self.db.grants.find({}, {'deadline': 1, 'funding_amount': 1, 'amount': 1}):
+            fields = normalize_grant({key: value for key, value in grant.items() if key != '_id'})
+            fields = {key: fields[key] for key in ('deadline_at', 'deadline_kind', 'amount_min', 'amount_max')}
+            updates.append(UpdateOne({'_id': grant['_id']}, {'$set': fields}))
+        
+        if updates:
+            await self.db.grants.bulk_write(updates, ordered=False)
+        await self.db.grants.create_index([('is_active', 1), ('deadline_at', 1)])
+        await self.db.grants.create_index([('amount_min', 1), ('amount_max', 1)])
+        
+        logger.info(f"Normalized {len(updates)} grants")
+        return len(updates)
+    
     async def close(self):
         """Close database connection"""
-        if self.client:
-            self.client.close()
+        await mongo.close()
 
 async def main():
     """Main utility menu"""
@@ -122,12 +139,13 @@ async def main():
     print("="*50)
     print("1. View Statistics")
     print("2. Remove Duplicates")
+    print("3. Normalize Deadlines & Amounts")
     print("0. Exit")
     print("="*50)
     
     while True:
         try:
-            choice = input("\nEnter choice (0-2): ")
+            choice = input("\nEnter choice (0-3): ")
             
             if choice == '1':
                 stats = await manager.get_statistics()
@@ -139,6 +157,10 @@ async def main():
                 removed = await manager.remove_duplicates()
                 print(f"Removed {removed} duplicate grants")
             
+            elif choice == '3':
+                normalized = await manager.normalize_grants()
+                print(f"Normalized {normalized} grants")
+            
             elif choice == '0':
                 break
             
@@ -0,0 +1,340 @@
+"""
+Static Grant Catalog
+Curated grant sources (Grants.gov, foundations, state portals, PND, corporate CSR,
+Data.gov) loaded once into an immutable, pre-indexed catalog.
+Grant dicts are built once; a search copies the ones it returns and resolves
+their deadlines, which are stored as day offsets.
+"""
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Iterable, NamedTuple, Tuple
+
+import numpy as np
+
+from grant_index import GrantSearchIndex
+from grant_normalization import ANY_AMOUNT, AmountRange, parse_amount
+
+
+class StaticGrant(NamedTuple):
+    title: str
+    funder: str
+    description: str
+    deadline_days: int
+    amount: str
+    url: str
+
+
+STATIC_SOURCES: Dict[str, Tuple[StaticGrant, ...]] = {
+    'grants_gov': (
+        StaticGrant(
+            title='Community Development Block Grant Program',
+            funder='U.S. Department of Housing and Urban Development',
+            description='Provides communities with resources to address housing, economic development, and infrastructure needs.',
+            deadline_days=60,
+            amount='$100,000 - $500,000',
+            url='https://www.grants.gov/search-grants.html'
+        ),
+        StaticGrant(
+            title='Environmental Education Grants',
+            funder='Environmental Protection Agency',
+            description='Supports environmental education projects that increase public awareness and knowledge.',
+            deadline_days=75,
+            amount='$50,000 - $250,000',
+            url='https://www.grants.gov/search-grants.html'
+        ),
+        StaticGrant(
+            title='Small Business Innovation Research',
+            funder='National Science Foundation',
+            description='Funding for small businesses to engage in research and development with commercialization potential.',
+            deadline_days=90,
+            amount='$150,000 - $1,000,000',
+            url='https://www.grants.gov/search-grants.html'
+        ),
+        StaticGrant(
+            title='Arts and Culture Programming Grant',
+            funder='National Endowment for the Arts',
+            description='Support for arts organizations to develop creative programming and community engagement.',
+            deadline_days=85,
+            amount='$25,000 - $150,000',
+            url='https://www.grants.gov/search-grants.html'
+        ),
+        StaticGrant(
+            title='Youth Development Initiative',
+            funder='Department of Health and Human Services',
+            description='Programs that support positive youth development and prevent risky behaviors.',
+            deadline_days=70,
+            amount='$75,000 - $300,000',
+            url='https://www.grants.gov/search-grants.html'
+        )
+    ),
+    'foundation_directory': (
+        StaticGrant(
+            title='Community Foundation General Operating Support',
+            funder='National Community Foundation Network',
+            description='General operating support for nonprofits serving underserved communities.',
+            deadline_days=45,
+            amount='$25,000 - $100,000',
+            url='https://www.cof.org/community-foundations'
+        ),
+        StaticGrant(
+            title='Education Excellence Fund',
+            funder='Gates Foundation',
+            description='Supporting innovative educational programs and literacy initiatives in underserved areas.',
+            deadline_days=55,
+            amount='$100,000 - $500,000',
+            url='https://www.gatesfoundation.org'
+        ),
+        StaticGrant(
+            title='Women Empowerment Grant',
+            funder='Global Women\'s Fund',
+            description='Programs focused on women\'s economic empowerment and leadership development.',
+            deadline_days=65,
+            amount='$50,000 - $200,000',
+            url='https://www.globalfundforwomen.org'
+        ),
+        StaticGrant(
+            title='Climate Action Initiative',
+            funder='Environmental Defense Fund',
+            description='Projects addressing climate change through community-based solutions.',
+            deadline_days=80,
+            amount='$75,000 - $350,000',
+            url='https://www.edf.org'
+        )
+    ),
+    'state_grants': (
+        StaticGrant(
+            title='California Arts Council Project Grant',
+            funder='California Arts Council',
+            description='Funding for arts and cultural programs that serve California communities.',
+            deadline_days=55,
+            amount='$10,000 - $75,000',
+            url='https://www.arts.ca.gov/grants/'
+        ),
+        StaticGrant(
+            title='New York Community Development Program',
+            funder='New York State Division of Housing',
+            description='Support for affordable housing and community development initiatives.',
+            deadline_days=70,
+            amount='$50,000 - $300,000',
+            url='https://hcr.ny.gov/funding-opportunities'
+        ),
+        StaticGrant(
+            title='Texas Small Business Growth Fund',
+            funder='Texas Economic Development',
+            description='Grants for small businesses to expand operations and create jobs.',
+            deadline_days=60,
+            amount='$35,000 - $150,000',
+            url='https://gov.texas.gov/business'
+        ),
+        StaticGrant(
+            title='Florida Environmental Restoration',
+            funder='Florida Department of Environmental Protection',
+            description='Projects focused on coastal restoration and water quality improvement.',
+            deadline_days=75,
+            amount='$100,000 - $500,000',
+            url='https://floridadep.gov/grants'
+        ),
+        StaticGrant(
+            title='Illinois Education Innovation',
+            funder='Illinois State Board of Education',
+            description='Innovative educational programs and STEM initiatives for K-12 schools.',
+            deadline_days=50,
+            amount='$40,000 - $200,000',
+            url='https://www.isbe.net/grants'
+        )
+    ),
+    'philanthropy_news': (
+        StaticGrant(
+            title='Health Equity Grant Program',
+            funder='National Health Foundation',
+            description='Supports organizations working to eliminate health disparities in underserved populations.',
+            deadline_days=50,
+            amount='$75,000 - $200,000',
+            url='https://philanthropynewsdigest.org/rfps'
+        ),
+        StaticGrant(
+            title='Rural Healthcare Access Initiative',
+            funder='Robert Wood Johnson Foundation',
+            description='Improving healthcare access in rural and underserved communities.',
+            deadline_days=65,
+            amount='$100,000 - $400,000',
+            url='https://www.rwjf.org'
+        ),
+        StaticGrant(
+            title='Youth Sports and Wellness Program',
+            funder='Nike Community Impact Fund',
+            description='Supporting youth sports programs that promote health and community engagement.',
+            deadline_days=55,
+            amount='$25,000 - $100,000',
+            url='https://www.nike.com/community'
+        ),
+        StaticGrant(
+            title='Food Security Initiative',
+            funder='Walmart Foundation',
+            description='Programs addressing hunger and food insecurity in local communities.',
+            deadline_days=70,
+            amount='$50,000 - $250,000',
+            url='https://walmart.org'
+        )
+    ),
+    'corporate_csr': (
+        StaticGrant(
+            title='Tech for Good Innovation Fund',
+            funder='Global Tech Corporation CSR',
+            description='Funding for nonprofits using technology to solve social and environmental challenges.',
+            deadline_days=80,
+            amount='$50,000 - $150,000',
+            url='https://corporate-foundation.example.com/grants'
+        ),
+        StaticGrant(
+            title='Diversity and Inclusion Grant',
+            funder='Microsoft Philanthropies',
+            description='Supporting programs that advance diversity, equity, and inclusion in tech.',
+            deadline_days=75,
+            amount='$75,000 - $300,000',
+            url='https://www.microsoft.com/philanthropy'
+        ),
+        StaticGrant(
+            title='Community Infrastructure Development',
+            funder='Amazon Community Fund',
+            description='Infrastructure projects that benefit local communities near Amazon facilities.',
+            deadline_days=90,
+            amount='$100,000 - $500,000',
+            url='https://www.aboutamazon.com/community'
+        ),
+        StaticGrant(
+            title='Sustainable Agriculture Program',
+            funder='General Mills Foundation',
+            description='Projects promoting sustainable farming practices and food system resilience.',
+            deadline_days=60,
+            amount='$40,000 - $175,000',
+            url='https://www.generalmills.com/foundation'
+        )
+    ),
+    'data_gov': (
+        StaticGrant(
+            title='Rural Business Development Grant',
+            funder='U.S. Department of Agriculture',
+            description='Provides grants for rural business development, technical assistance, and training.',
+            deadline_days=65,
+            amount='$50,000 - $250,000',
+            url='https://www.rd.usda.gov/programs-services/business-programs'
+        ),
+        StaticGrant(
+            title='Historic Preservation Fund',
+            funder='National Park Service',
+            description='Grants for preservation of historic properties and cultural heritage sites.',
+            deadline_days=85,
+            amount='$30,000 - $200,000',
+            url='https://www.nps.gov/subjects/historicpreservationfund'
+        ),
+        StaticGrant(
+            title='Energy Efficiency and Renewable Energy',
+            funder='Department of Energy',
+            description='Supporting clean energy projects and energy efficiency improvements.',
+            deadline_days=70,
+            amount='$100,000 - $1,000,000',
+            url='https://www.energy.gov/grants'
+        ),
+        StaticGrant(
+            title='Veterans Job Training Program',
+            funder='Department of Veterans Affairs',
+            description='Programs providing job training and employment services for veterans.',
+            deadline_days=60,
+            amount='$50,000 - $300,000',
+            url='https://www.va.gov/grants'
+        ),
+        StaticGrant(
+            title='STEM Education Excellence',
+            funder='National Science Foundation',
+            description='Enhancing STEM education through innovative teaching methods and curricula.',
+            deadline_days=95,
+            amount='$75,000 - $400,000',
+            url='https://www.nsf.gov/funding'
+        )
+    )
+}
+
+
+class StaticGrantCatalog:
+    """Immutable catalog of curated grants, searched through a GrantSearchIndex"""
+
+    def __init__(self, sources: Dict[str, Tuple[StaticGrant, ...]] = STATIC_SOURCES):
+        self.sources = sources
+        self.entries: Tuple[StaticGrant, ...] = tuple(
+            entry for entries in sources.values() for entry in entries
+        )
+        self.entry_sources: Tuple[str, ...] = tuple(
+            name for name, entries in sources.items() for _ in entries
+        )
+        self.source_ids: Dict[str, Tuple[int, ...]] = {
+            name: tuple(i for i, entry_source in enumerate(self.entry_sources) if entry_source == name)
+            for name in sources
+        }
+        # Funding ranges are parsed once, so amount filters never touch the text
+        self.amount_ranges: Tuple[Tuple, ...] = tuple(parse_amount(entry.amount) for entry in self.entries)
+
+        # Everything but the deadline is the same on every request
+        self.records: Tuple[Dict[str, Any], ...] = tuple(
+            {
+                'title': entry.title,
+                'funder': entry.funder,
+                'description': entry.description,
+                'deadline': None,
+                'amount': entry.amount,
+                'amount_min': amount_min,
+                'amount_max': amount_max,
+                'url': entry.url
+            }
+            for entry, (amount_min, amount_max) in zip(self.entries, self.amount_ranges)
+        )
+        self.deadline_offsets: Tuple[timedelta, ...] = tuple(timedelta(days=entry.deadline_days) for entry in self.entries)
+
+        # Index documents carry their catalog position so hits map back to entries
+        self.index = GrantSearchIndex()
+        self.index.build(
+            {
+                'catalog_id': catalog_id,
+                'title': entry.title,
+                'description': entry.description
+            }
+            for catalog_id, entry in enumerate(self.entries)
+        )
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def documents(self) -> List[Dict[str, str]]:
+        """Title/description documents for priming the relevance scorer"""
+        return self.index.documents
+
+    def materialize(self, catalog_id: int, now: datetime) -> Dict[str, Any]:
+        """Copy a prebuilt grant dict and resolve its deadline offset"""
+        grant = dict(self.records[catalog_id])
+        grant['deadline'] = (now + self.deadline_offsets[catalog_id]).isoformat()
+        return grant
+
+    def search(self, source: str, keywords: Iterable[str], amounts: AmountRange = ANY_AMOUNT) -> List[Dict[str, Any]]:
+        """
+        Return every grant of a catalog source within the funding bounds, best keyword matches first.
+        Sources are small and curated, so grants without a match are still returned.
+        """
+        allowed = [
+            catalog_id for catalog_id in self.source_ids[source]
+            if amounts.matches(*self.amount_ranges[catalog_id])
+        ]
+        if not allowed:
+            return []
+
+        # Only the source's allowed grants are scored
+        mask = np.zeros(len(self.entries), dtype=bool)
+        mask[allowed] = True
+        matched = [document['catalog_id'] for document, score in self.index.search(keywords, len(allowed), mask=mask)]
+        matched_set = set(matched)
+        rest = [catalog_id for catalog_id in allowed if catalog_id not in matched_set]
+
+        now = datetime.now()
+        return [self.materialize(catalog_id, now) for catalog_id in matched + rest]
+
+
+# Loaded once per process
+static_catalog = StaticGrantCatalog()
@@ -0,0 +1,206 @@
+"""
+In-memory BM25 Search Index for the grants collection
+Built once at startup (or opened from a memory-mapped index snapshot), updated
+incrementally on upserts and queried in-process by GrantMatcher
+"""
+import heapq
+import math
+import logging
+from collections import Counter, defaultdict
+from typing import List, Dict, Any, Iterable, Optional, Set, Tuple
+
+import numpy as np
+
+from text_analyzer import analyzer
+
+logger = logging.getLogger(__name__)
+
+# Matches in the title count more than matches in the description
+DEFAULT_FIELD_WEIGHTS = {
+    'title': 3.0,
+    'focus_areas': 2.0,
+    'description': 1.0
+}
+
+
+class GrantSearchIndex:
+    """
+    Inverted index with BM25F scoring over title, description and focus areas.
+
+    Term impacts are precomputed at build time, so a query only walks the
+    postings of its own terms and keeps a bounded heap of the best documents.
+    Documents added or replaced later are scored against the corpus statistics
+    of the last full build.
+
+    An index loaded from an IndexSnapshot reads the snapshot's postings in place;
+    documents added or replaced afterwards go to in-memory postings layered on top.
+    """
+
+    def __init__(self, field_weights: Optional[Dict[str, float]] = None, k1: float = 1.2, b: float = 0.75):
+        self.field_weights = field_weights or dict(DEFAULT_FIELD_WEIGHTS)
+        self.k1 = k1
+        self.b = b
+        self.documents: List[Dict[str, Any]] = []
+        self.postings: Dict[str, List[Tuple[int, float]]] = {}
+        self.doc_terms: Dict[int, Tuple[str, ...]] = {}
+        self.df: Counter = Counter()
+        self.avg_length = 0.0
+        self.is_built = False
+
+        # Snapshot base and the snapshot documents whose postings were superseded
+        self.snapshot = None
+        self.replaced: Set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def field_text(self, document: Dict[str, Any], field: str) -> str:
+        """Get the searchable text of a document field"""
+        value = document.get(field) or ''
+        if isinstance(value, (list, tuple)):
+            return ' '.join(str(v) for v in value)
+        return str(value)
+
+    def weigh(self, document: Dict[str, Any]) -> Tuple[Counter, float]:
+        """Field-weighted term frequencies and length of a document"""
+        weighted_tf = Counter()
+        length = 0.0
+        for field, weight in self.field_weights.items():
+            terms = analyzer.analyze(self.field_text(document, field))
+            length += weight * len(terms)
+            for term in terms:
+                weighted_tf[term] += weight
+        return weighted_tf, length
+
+    def impact(self, tf: float, length: float, term: str) -> float:
+        """BM25F contribution of a term to a document"""
+        num_docs = len(self.documents)
+        df = self.document_frequency(term)
+        norm = self.k1 * (1 - self.b + self.b * (length / self.avg_length if self.avg_length else 0))
+        idf = math.log(1 + (num_docs - df + 0.5) / (df + 0.5))
+        return idf * tf * (self.k1 + 1) / (tf + norm)
+
+    def document_frequency(self, term: str) -> int:
+        base = self.snapshot.document_frequency(term) if self.snapshot is not None else 0
+        return base + self.df[term]
+
+    def build(self, documents: Iterable[Dict[str, Any]]):
+        """Build the index from scratch"""
+        self.snapshot = None
+        self.replaced = set()
+        self.documents = list(documents)
+
+        weighed = [self.weigh(document) for document in self.documents]
+
+        num_docs = len(self.documents)
+        self.avg_length = (sum(length for _, length in weighed) / num_docs) if num_docs else 0.0
+
+        # Document frequency per term
+        self.df = Counter()
+        for weighted_tf, _ in weighed:
+            self.df.update(weighted_tf.keys())
+
+        postings = defaultdict(list)
+        for doc_id, (weighted_tf, length) in enumerate(weighed):
+            for term, tf in weighted_tf.items():
+                postings[term].append((doc_id, self.impact(tf, length, term)))
+
+        self.postings = dict(postings)
+        self.doc_terms = {doc_id: tuple(weighted_tf) for doc_id, (weighted_tf, _) in enumerate(weighed)}
+        self.is_built = True
+        logger.info(f"Built grant index: {num_docs} documents, {len(self.postings)} terms")
+
+    def load_snapshot(self, snapshot):
+        """Serve the postings and documents of an IndexSnapshot without copying them"""
+        self.snapshot = snapshot
+        self.field_weights = dict(snapshot.manifest['field_weights'])
+        self.k1 = snapshot.manifest['k1']
+        self.b = snapshot.manifest['b']
+        self.avg_length = snapshot.manifest['avg_length']
+        self.documents = snapshot.documents()
+        self.postings = {}
+        self.doc_terms = {}
+        self.df = Counter()
+        self.replaced = set()
+        self.is_built = True
+
+    def add(self, document: Dict[str, Any]) -> int:
+        """Append a document without rebuilding; returns its document id"""
+        doc_id = len(self.documents)
+        self.documents.append(document)
+        self.index_document(doc_id, document)
+        return doc_id
+
+    def replace(self, doc_id: int, document: Dict[str, Any]):
+        """Replace a document in place, re-indexing it if its text changed"""
+        previous = self.documents[doc_id]
+        self.documents[doc_id] = document
+        if all(self.field_text(previous, field) == self.field_text(document, field) for field in self.field_weights):
+            return
+
+        terms = self.doc_terms.pop(doc_id, None)
+        if terms is None:
+            # Snapshot postings are read-only; the document's snapshot scores are dropped at query time
+            self.replaced.add(doc_id)
+        else:
+            for term in terms:
+                self.postings[term] = [posting for posting in self.postings[term] if posting[0] != doc_id]
+                self.df[term] -= 1
+        self.index_document(doc_id, document)
+
+    def index_document(self, doc_id: int, document: Dict[str, Any]):
+        weighted_tf, length = self.weigh(document)
+        self.df.update(weighted_tf.keys())
+        for term, tf in weighted_tf.items():
+            self.postings.setdefault(term, []).append((doc_id, self.impact(tf, length, term)))
+        self.doc_terms[doc_id] = tuple(weighted_tf)
+
+    def search(
+        self,
+        keywords: Iterable[str],
+        k: int = 100,
+        mask: Optional[np.ndarray] = None
+    ) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Return the top-k (document, score) pairs for the query keywords.
+        Documents outside the boolean mask (indexed by document id) are dropped before the top-k cut.
+        """
+        scores: Dict[int, float] = defaultdict(float)
+
+        query_terms = set()
+        for keyword in keywords:
+            query_terms.update(analyzer.analyze(keyword))
+
+        if self.snapshot is not None:
+            return self.search_snapshot(query_terms, k, mask)
+
+        for term in query_terms:
+            for doc_id, impact in self.postings.get(term, ()):
+                scores[doc_id] += impact
+
+        candidates = scores.items()
+        if mask is not None:
+            candidates = [(doc_id, score) for doc_id, score in candidates if mask[doc_id]]
+
+        top = heapq.nlargest(k, candidates, key=lambda item: item[1])
+        return [(self.documents[doc_id], score) for doc_id, score in top]
+
+    def search_snapshot(self, query_terms: Set[str], k: int, mask: Optional[np.ndarray]) -> List[Tuple[Dict[str, Any], float]]:
+        """Vectorized scoring over the snapshot postings plus the in-memory overlay"""
+        scores = np.zeros(len(self.documents), dtype=np.float64)
+        for term in query_terms:
+            doc_ids, impacts = self.snapshot.postings(term)
+            scores[doc_ids] += impacts
+        if self.replaced:
+            scores[np.fromiter(self.replaced, dtype=np.int64, count=len(self.replaced))] = 0.0
+        for term in query_terms:
+            for doc_id, impact in self.postings.get(term, ()):
+                scores[doc_id] += impact
+
+        candidates = np.flatnonzero(scores > 0)
+        if mask is not None:
+            candidates = candidates[mask[candidates]]
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        top = candidates[np.lexsort((candidates, -scores[candidates]))]
+        return [(self.documents[int(doc_id)], float(scores[doc_id])) for doc_id in top]
@@ -1,28 +1,124 @@
 import aiohttp
 import asyncio
+import heapq
+import random
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Optional, Union
 import logging
+import time
 from bs4 import BeautifulSoup
 import re
-from collections import Counter
-from motor.motor_asyncio import AsyncIOMotorClient
+from collections import Counter, deque
 import os
+import numpy as np
+from grant_index import GrantSearchIndex
+from relevance_scorer import RelevanceScorer
+from match_cache import MatchResultCache
+from request_coalescing import SingleFlight
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+from http_client import http_client
+from mongo_client import mongo
+from response_cache import PersistentResponseCache
+from pathlib import Path
+from grant_catalog import static_catalog
+from text_analyzer import analyzer, fingerprint, surface_forms
+from grant_normalization import ANY_AMOUNT, AmountRange, active_deadline_filter, normalize_amount, normalize_deadline
+from grant_metadata import GrantMetadataStore, MatchFilters, NO_FILTERS
+from semantic_index import SemanticIndex
+from index_snapshot import IndexSnapshot, current_version, publish_snapshot, write_snapshot
+from index_service import IndexClient
 
 logger = logging.getLogger(__name__)
 
+ISO_DATE_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}')
+
 class GrantMatcher:
     """
     Multi-source grant matching system aggregating from 7+ public data sources + internal database
     """
     
-    def __init__(self, mongo_url: str = None, db_name: str = None):
+    def __init__(self, mongo_url: str = None, db_name: str = None, index_server_socket: Optional[str] = None):
         # Initialize MongoDB connection for internal grants database
         self.mongo_url = mongo_url or os.environ.get('MONGO_URL')
         self.db_name = db_name or os.environ.get('DB_NAME')
-        self.client = None
         self.db = None
         
+        # In-process BM25 index over the internal grants collection, with its
+        # filterable metadata in NumPy columns (row i is index document i)
+        self.index = GrantSearchIndex()
+        self.metadata = GrantMetadataStore()
+        self.internal_match_limit = int(os.environ.get('INTERNAL_MATCH_LIMIT', 100))
+        self.index_generation = 0
+        
+        # Client mode: the node's index server owns the index and ranks internal grants
+        if index_server_socket is None:
+            index_server_socket = os.environ.get('INDEX_SERVER_SOCKET', '')
+        self.index_client = IndexClient(
+            index_server_socket,
+            timeout=float(os.environ.get('INDEX_SERVER_TIMEOUT_SECONDS', 2.0))
+        ) if index_server_socket else None
+        self.index_server_generation = None
+        
+        # Changes applied by the grants watcher, replayed onto snapshots built before them
+        self.recent_changes: deque = deque(maxlen=int(os.environ.get('GRANT_WATCH_REPLAY_SIZE', 1000)))
+        
+        # Offline-built LSA index: dense retrieval alongside keywords and a blended score
+        self.semantic: Optional[SemanticIndex] = None
+        self.semantic_index_path = os.environ.get('SEMANTIC_INDEX_PATH', str(Path(__file__).parent / 'semantic_index.npz'))
+        self.semantic_index_mtime = None
+        self.semantic_match_limit = int(os.environ.get('SEMANTIC_MATCH_LIMIT', 20))
+        self.semantic_weight = float(os.environ.get('SEMANTIC_WEIGHT', 2.0))
+        
+        # Versioned on-disk index snapshot, memory-mapped and shared by every worker
+        self.snapshot_dir = os.environ.get('INDEX_SNAPSHOT_DIR', '')
+        self.snapshot: Optional[IndexSnapshot] = None
+        self.snapshot_poll_seconds = float(os.environ.get('INDEX_SNAPSHOT_POLL_SECONDS', 5))
+        self.snapshot_max_age = float(os.environ.get('INDEX_SNAPSHOT_MAX_AGE_SECONDS', 86400))
+        
+        # Curated static sources, pre-indexed once per process
+        self.catalog = static_catalog
+        
+        # Cached document-term rows for vectorized ranking
+        self.scorer = RelevanceScorer()
+        self.scorer.add_documents(self.catalog.documents())
+        
+        # Ranked candidates per normalized query; sampling happens after the cache
+        self.top_candidates = 30
+        self.cache = MatchResultCache(
+            max_entries=int(os.environ.get('MATCH_CACHE_SIZE', 1000)),
+            ttl_seconds=float(os.environ.get('MATCH_CACHE_TTL_SECONDS', 300))
+        )
+        
+        # Concurrent identical queries share one in-flight aggregation
+        self.inflight = SingleFlight()
+        
+        # Latency budgets: one overall deadline plus a timeout per source
+        self.match_deadline = float(os.environ.get('MATCH_DEADLINE_SECONDS', 4.0))
+        self.default_source_timeout = float(os.environ.get('SOURCE_TIMEOUT_SECONDS', 2.0))
+        self.source_timeouts = {'usaspending': 3.5}
+        self.source_timeouts.update(self.parse_source_timeouts(os.environ.get('SOURCE_TIMEOUTS', '')))
+        
+        # Batch matches send every summary's USAspending query, this many per request
+        # and in at most usaspending_max_requests requests (groups grow to fit)
+        self.usaspending_queries_per_request = max(1, int(os.environ.get('USASPENDING_QUERIES_PER_REQUEST', 5)))
+        self.usaspending_max_requests = max(1, int(os.environ.get('USASPENDING_MAX_REQUESTS', 4)))
+        
+        # Partial results (some sources timed out or failed) are cached briefly
+        self.partial_cache_ttl = float(os.environ.get('MATCH_PARTIAL_CACHE_TTL_SECONDS', 30))
+        
+        # One circuit breaker per source, created on first use
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.circuit_failure_threshold = int(os.environ.get('CIRCUIT_FAILURE_THRESHOLD', 5))
+        self.circuit_reset_timeout = float(os.environ.get('CIRCUIT_RESET_SECONDS', 30))
+        
+        # USAspending responses survive restarts and are revalidated in the background
+        self.usaspending_cache = PersistentResponseCache(
+            os.environ.get('USASPENDING_CACHE_PATH', str(Path(__file__).parent / 'usaspending_cache.sqlite3')),
+            fresh_seconds=float(os.environ.get('USASPENDING_CACHE_FRESH_SECONDS', 86400)),
+            stale_seconds=float(os.environ.get('USASPENDING_CACHE_STALE_SECONDS', 7 * 86400)),
+            max_bytes=int(os.environ.get('USASPENDING_CACHE_MAX_BYTES', 50 * 1024 * 1024))
+        )
+        
         self.sources = [
             self.fetch_internal_grants,  # NEW: Internal database source
             self.fetch_usaspending,
@@ -34,463 +130,972 @@ class GrantMatcher:
             self.fetch_data_gov
         ]
     
-    async def match_grants(self, project_summary: str, focus_area: str = "", org_type: str = "") -> List[Dict[str, Any]]:
+    def connect(self):
+        """Get a handle on the shared MongoDB pool if not already done"""
+        if self.db is None:
+            self.db = mongo.database(self.db_name, self.mongo_url)
+    
+    async def load_active_grants(self) -> List[Dict]:
+        """Active, unexpired grants documents; expiry uses the indexed deadline_at field"""
+        self.connect()
+        cursor = self.db.grants.find({'is_active': True, **active_deadline_filter()})
+        return await cursor.to_list(None)
+    
+    async def build_index(self):
+        """
+        Make the internal grants searchable. With INDEX_SNAPSHOT_DIR set, the published
+        snapshot is memory-mapped (publishing one first if there is none or it is too old);
+        otherwise active grants are loaded from MongoDB into the in-memory index.
+        In client mode the index server owns the index and nothing is built here.
+        """
+        if self.index_client is not None:
+            self.load_semantic_index()
+            return
+        if self.snapshot_dir:
+            opened = self.open_snapshot()
+            fresh_after = time.time() - self.snapshot_max_age
+            if opened and self.snapshot.built_at >= fresh_after:
+                return
+            # Workers starting together all see the stale snapshot; only the first to lock rebuilds it
+            if await self.publish_snapshot(fresh_after) or opened:
+                return
+        await self.build_memory_index()
+    
+    async def build_memory_index(self):
+        """Load active grants from MongoDB into the in-memory search index"""
+        try:
+            db_grants = await self.load_active_grants()
+            
+            # Duplicates of a grant_id share one metadata row, so they share one index document too
+            grants = GrantMetadataStore.unique(db_grants)
+            self.index.build(self.format_internal_grant(grant) for grant in grants)
+            self.metadata.build(db_grants)
+            self.scorer.add_documents(self.index.documents)
+            # A large index must not push the catalog's rows out of the scorer's LRU
+            self.scorer.add_documents(self.catalog.documents())
+            
+        except Exception as e:
+            self.index.is_built = False
+            logger.warning(f"Grant index build failed, falling back to text search: {e}")
+            return
+        
+        self.snapshot = None
+        self.index_generation += 1
+        self.load_semantic_index()
+        if self.semantic is not None:
+            self.semantic.align(self.index.documents, [GrantMetadataStore.key(grant) for grant in grants])
+    
+    def open_snapshot(self) -> bool:
+        """Swap to the published index snapshot unless it is already open; False when there is none"""
+        try:
+            version = current_version(self.snapshot_dir)
+            if version is None:
+                return False
+            if self.snapshot is not None and self.snapshot.version == version:
+                return True
+            snapshot = IndexSnapshot.open(os.path.join(self.snapshot_dir, version))
+        except Exception as e:
+            logger.warning(f"Index snapshot open failed: {e}")
+            return False
+        
+        index = GrantSearchIndex()
+        index.load_snapshot(snapshot)
+        metadata = GrantMetadataStore(capacity=0)
+        metadata.load_columns(
+            snapshot.columns,
+            snapshot.keys.tolist(),
+            snapshot.manifest['source_ids'],
+            dict(zip(snapshot.object_ids.tolist(), snapshot.object_rows.tolist()))
+        )
+        
+        self.load_semantic_index()
+        if self.semantic is not None:
+            if snapshot.semantic_vectors is not None and snapshot.manifest['semantic_built_at'] == self.semantic.built_at:
+                self.semantic.adopt(snapshot.semantic_vectors)
+            else:
+                self.semantic.align(index.documents, [key or None for key in snapshot.keys.tolist()])
+        
+        # Requests already holding the previous index keep its maps alive until they finish
+        self.index, self.metadata, self.snapshot = index, metadata, snapshot
+        self.index_generation += 1
+        logger.info(f"Opened index snapshot {version}: {snapshot.size} grants")
+        
+        # Watched changes newer than the snapshot's read of the collection still apply
+        for applied_at, upserted, deleted in list(self.recent_changes):
+            if applied_at >= snapshot.built_at:
+                self.upsert_grants(upserted)
+                self.remove_grants(deleted)
+        return True
+    
+    async def publish_snapshot(self, fresh_after: Optional[float] = None) -> bool:
+        """
+        Rebuild the index from MongoDB off the event loop, publish it as the shared snapshot and swap to it.
+        Grants are loaded under the publish lock, and only when the published snapshot was
+        built before fresh_after (default: now); otherwise that snapshot is opened instead.
+        """
+        loop = asyncio.get_running_loop()
+        
+        def build(path: str):
+            loaded_at = time.time()
+            db_grants = asyncio.run_coroutine_threadsafe(self.load_active_grants(), loop).result()
+            self.write_snapshot(path, db_grants, loaded_at)
+        
+        try:
+            await asyncio.to_thread(
+                publish_snapshot,
+                self.snapshot_dir,
+                build,
+                time.time() if fresh_after is None else fresh_after
+            )
+        except Exception as e:
+            logger.warning(f"Index snapshot publish failed: {e}")
+            return False
+        return self.open_snapshot()
+    
+    def write_snapshot(self, path: str, db_grants: List[Dict], built_at: float):
+        """Build a private index over grants documents and write it as a snapshot"""
+        grants = GrantMetadataStore.unique(db_grants)
+        index = GrantSearchIndex()
+        index.build(self.format_internal_grant(grant) for grant in grants)
+        metadata = GrantMetadataStore()
+        metadata.build(db_grants)
+        
+        semantic = self.semantic
+        vectors = (
+            semantic.vectors_for(index.documents, [GrantMetadataStore.key(grant) for grant in grants])
+            if semantic is not None else None
+        )
+        write_snapshot(path, index, metadata, built_at, vectors, semantic.built_at if semantic is not None else None)
+    
+    async def watch_snapshots(self):
+        """Swap to snapshots published by other workers or the offline builder"""
+        while True:
+            await asyncio.sleep(self.snapshot_poll_seconds)
+            version = current_version(self.snapshot_dir)
+            if version is not None and (self.snapshot is None or version != self.snapshot.version):
+                if self.open_snapshot():
+                    self.cache.invalidate()
+    
+    async def warm_up(self):
+        """
+        Open the MongoDB pool and run the ranking path once (keyword extraction,
+        internal search, relevance scoring) so the first match request does not pay for it
+        """
+        keywords = self.extract_keywords('Community education program for youth and small nonprofits', 'education')
+        candidates = [dict(grant) for grant in self.catalog.documents()[:self.top_candidates]]
+        if self.has_index:
+            candidates.extend(await self.search_internal(keywords))
+        self.rank_candidates(candidates, keywords, NO_FILTERS, self.top_candidates)
+        
+        self.connect()
+        if self.index_client is None:
+            await self.db.command('ping')
+        else:
+            await self.index_client.ping()
+    
+    def load_semantic_index(self):
+        """(Re)load the offline semantic index when its file is new or changed"""
+        try:
+            mtime = os.path.getmtime(self.semantic_index_path)
+        except OSError:
+            if self.semantic is None:
+                logger.info(f"No semantic index at {self.semantic_index_path}; keyword matching only")
+            return
+        
+        if mtime == self.semantic_index_mtime:
+            return
+        try:
+            semantic = SemanticIndex.load(self.semantic_index_path)
+        except Exception as e:
+            logger.warning(f"Semantic index load failed: {e}")
+            return
+        
+        if semantic is not None:
+            # Catalog grants are ranked on every request; fold them in once
+            for document in self.catalog.documents():
+                semantic.document_vector(document)
+        self.semantic = semantic
+        self.semantic_index_mtime = mtime
+    
+    def upsert_grants(self, grants: List[Dict]) -> List[Dict]:
+        """
+        Apply upserted grants documents to the index and metadata store without a rebuild.
+        Returns the indexed documents that changed, old and new versions.
+        """
+        documents = []
+        changed = []
+        for grant in grants:
+            document = self.format_internal_grant(grant)
+            row = self.metadata.row_for(grant)
+            if row is None:
+                if not grant.get('is_active', True):
+                    continue
+                self.index.add(document)
+            else:
+                changed.append(self.index.documents[row])
+                self.index.replace(row, document)
+            row = self.metadata.upsert(grant)
+            if self.semantic is not None:
+                self.semantic.upsert(row, document, GrantMetadataStore.key(grant))
+            documents.append(document)
+        
+        self.scorer.add_documents(documents)
+        self.index_generation += 1
+        logger.info(f"Applied {len(documents)} upserted grants to the index")
+        return changed + documents
+    
+    def remove_grants(self, object_ids: Iterable[str]) -> List[Dict]:
+        """Drop deleted grants documents (by MongoDB _id) from search results; returns their indexed documents"""
+        removed = []
+        for object_id in object_ids:
+            row = self.metadata.remove(object_id)
+            if row is not None:
+                removed.append(self.index.documents[row])
+        if removed:
+            self.index_generation += 1
+            logger.info(f"Removed {len(removed)} deleted grants from the index")
+        return removed
+    
+    def apply_grant_changes(self, upserted: List[Dict], deleted: List[str]):
+        """Apply grants changes seen by the watcher and drop only the cached results they affect"""
+        if not self.index.is_built:
+            # Internal grants are read from MongoDB per query; only cached results can be stale
+            self.cache.invalidate()
+            return
+        changed = self.upsert_grants(upserted) + self.remove_grants(deleted)
+        self.recent_changes.append((time.time(), upserted, deleted))
+        self.invalidate_grants(changed)
+    
+    def invalidate_grants(self, documents: List[Dict]) -> int:
+        """
+        Drop cached results a changed grant could now appear in or drop out of:
+        queries sharing a term with its text, and results already listing it
+        """
+        if not documents:
+            return 0
+        terms = set()
+        titles = set()
+        for document in documents:
+            terms.update(analyzer.analyze(' '.join(
+                self.index.field_text(document, field) for field in self.index.field_weights
+            )))
+            titles.add(fingerprint(document.get('title')))
+        
+        def affected(key, aggregation) -> bool:
+            if any(terms.intersection(analyzer.analyze(keyword)) for keyword in key[0]):
+                return True
+            return any(fingerprint(grant.get('title')) in titles for grant in aggregation['grants'])
+        
+        return self.cache.invalidate_where(affected)
+    
+    async def refresh_index(self, grants: Optional[List[Dict]] = None):
+        """
+        Update the index and drop cached results after the grants collection changed.
+        Known upserted grants are applied incrementally; otherwise the index is rebuilt.
+        With snapshots enabled a new snapshot is also published for the other workers;
+        in client mode the change is forwarded to the index server.
+        """
+        if self.index_client is not None:
+            self.index_server_generation = await self.index_client.refresh(grants)
+            self.cache.invalidate()
+            return
+        if grants is not None and self.index.is_built:
+            self.upsert_grants(grants)
+        elif not self.snapshot_dir:
+            await self.build_memory_index()
+        if self.snapshot_dir and not await self.publish_snapshot() and grants is None:
+            await self.build_memory_index()
+        self.cache.invalidate()
+    
+    @staticmethod
+    def parse_source_timeouts(value: str) -> Dict[str, float]:
+        """Parse 'usaspending=3,internal_grants=0.5' into per-source timeouts"""
+        timeouts = {}
+        for item in value.split(','):
+            if '=' in item:
+                name, seconds = item.split('=', 1)
+                try:
+                    timeouts[name.strip()] = float(seconds)
+                except ValueError:
+                    logger.warning(f"Ignoring invalid source timeout: {item}")
+        return timeouts
+    
+    @staticmethod
+    def source_name(source) -> str:
+        """Short name of a source method, e.g. fetch_usaspending -> usaspending"""
+        return source.__name__.replace('fetch_', '', 1)
+    
+    async def match_grants(
+        self,
+        project_summary: str,
+        focus_area: str = "",
+        org_type: str = "",
+        amounts: AmountRange = ANY_AMOUNT,
+        seed: Optional[Union[int, str]] = None
+    ) -> List[Dict[str, Any]]:
         """
         Aggregate grants from multiple sources and return top 10 matches
         """
+        result = await self.match(project_summary, focus_area, org_type, amounts, seed)
+        return result['grants']
+    
+    async def match(
+        self,
+        project_summary: str,
+        focus_area: str = "",
+        org_type: str = "",
+        amounts: AmountRange = ANY_AMOUNT,
+        seed: Optional[Union[int, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Return the top 10 matches together with a report of which sources were included.
+        Only grants whose funding range overlaps the requested amounts, and whose focus
+        areas and eligibility fit the focus area and organization type, are considered.
+        The variety sample is seeded, so the same request and seed give the same grants.
+        """
         try:
             # Initialize MongoDB connection if not already done
-            if self.client is None:
-                self.client = AsyncIOMotorClient(self.mongo_url)
-                self.db = self.client[self.db_name]
+            self.connect()
             
             # Extract keywords from project summary
             keywords = self.extract_keywords(project_summary, focus_area)
             
-            # Fetch from all sources concurrently
-            tasks = [source(keywords) for source in self.sources]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+            # Serve the expensive aggregation from cache when possible
+            cache_key = self.cache.make_key(keywords, focus_area, org_type, amounts)
+            aggregation = self.cache.get(cache_key)
+            if aggregation is None:
+                aggregation = await self.inflight.do(
+                    cache_key,
+                    lambda: self.aggregate_and_cache(cache_key, keywords, MatchFilters(amounts, focus_area, org_type))
+                )
             
-            # Flatten and filter results
-            all_grants = []
-            for result in results:
-                if isinstance(result, list):
-                    all_grants.extend(result)
-                elif isinstance(result, Exception):
-                    logger.warning(f"Source failed: {result}")
-            
-            # Remove duplicates and expired grants
-            filtered_grants = self.filter_and_dedupe(all_grants)
+            return {
+                'grants': self.select_top_grants(aggregation['grants'], self.sample_seed(seed, cache_key)),
+                'sources': aggregation['sources']
+            }
             
-            # Rank by relevance
-            ranked_grants = self.rank_by_relevance(filtered_grants, keywords)
+        except Exception as e:
+            logger.error(f"Grant matching failed: {e}")
+            return {'grants': [], 'sources': {}}
+    
+    @staticmethod
+    def sample_seed(seed: Optional[Union[int, str]], cache_key) -> Union[int, str]:
+        """Seed for the variety sample: the caller's seed, else one derived from the normalized query"""
+        return seed if seed is not None else repr(cache_key)
+    
+    def select_top_grants(self, top_grants: List[Dict[str, Any]], seed: Union[int, str] = 0) -> List[Dict[str, Any]]:
+        """Select 10 of the ranked top results for variety, reproducibly for a given seed"""
+        if len(top_grants) <= 10:
+            return top_grants[:10]
+        
+        # Sampling positions of an already ranked list keeps relevance order without re-sorting
+        positions = sorted(random.Random(seed).sample(range(len(top_grants)), 10))
+        return [top_grants[position] for position in positions]
+    
+    def cache_aggregation(self, cache_key, aggregation: Dict[str, Any]):
+        """Cache an aggregation, keeping partial ones only briefly"""
+        sources = aggregation['sources']
+        if sources['timed_out'] or sources['failed'] or sources['skipped']:
+            self.cache.set(cache_key, aggregation, ttl_seconds=self.partial_cache_ttl)
+        else:
+            self.cache.set(cache_key, aggregation)
+    
+    async def aggregate_and_cache(self, cache_key, keywords: List[str], filters: MatchFilters = NO_FILTERS) -> Dict[str, Any]:
+        """Aggregate candidates for a query and store them in the result cache"""
+        aggregation = await self.aggregate_grants(keywords, filters)
+        self.cache_aggregation(cache_key, aggregation)
+        return aggregation
+    
+    async def aggregate_grants(self, keywords: List[str], filters: MatchFilters = NO_FILTERS) -> Dict[str, Any]:
+        """Fetch from every source, dedupe and return the most relevant candidates"""
+        all_grants, sources = await self.gather_sources(keywords, filters)
+        
+        # Keep the most relevant grants for sampling
+        return {
+            'grants': self.rank_candidates(all_grants, keywords, filters, self.top_candidates),
+            'sources': sources
+        }
+    
+    def rank_candidates(
+        self,
+        grants: List[Dict],
+        keywords: List[str],
+        filters: MatchFilters = NO_FILTERS,
+        limit: Optional[int] = None
+    ) -> List[Dict]:
+        """Remove duplicates, expired grants and grants the filters exclude, then rank the top by relevance"""
+        filtered_grants = self.filter_and_dedupe(grants, filters)
+        return self.rank_by_relevance(filtered_grants, keywords, limit)
+    
+    async def stream_match(
+        self,
+        project_summary: str,
+        focus_area: str = "",
+        org_type: str = "",
+        amounts: AmountRange = ANY_AMOUNT,
+        seed: Optional[Union[int, str]] = None
+    ):
+        """
+        Yield match events as sources complete: a provisional ranked top 10
+        after each source (internal database hits first), then the final top 10.
+        Every event carries per-source timing.
+        """
+        started = time.monotonic()
+        self.connect()
+        keywords = self.extract_keywords(project_summary, focus_area)
+        
+        filters = MatchFilters(amounts, focus_area, org_type)
+        cache_key = self.cache.make_key(keywords, focus_area, org_type, amounts)
+        seed = self.sample_seed(seed, cache_key)
+        aggregation = self.cache.get(cache_key)
+        if aggregation is not None:
+            yield {
+                'event': 'final',
+                'cached': True,
+                'grants': self.select_top_grants(aggregation['grants'], seed),
+                'sources': aggregation['sources'],
+                'elapsed_ms': round((time.monotonic() - started) * 1000, 1)
+            }
+            return
+        
+        results: Dict[str, List[Dict]] = {}
+        sources = self.empty_source_report()
+        async for name, status, grants in self.internal_first(self.iter_sources(keywords, sources['timings_ms'], filters)):
+            sources[status].append(name)
+            if status == 'included':
+                results[name] = grants
             
-            # Get top 30 most relevant grants
-            top_grants = ranked_grants[:30]
+            provisional = self.rank_candidates(self.flatten_results(results), keywords, filters, 10)
+            yield {
+                'event': 'source',
+                'source': name,
+                'status': status,
+                'count': len(grants),
+                'source_elapsed_ms': sources['timings_ms'].get(name),
+                'elapsed_ms': round((time.monotonic() - started) * 1000, 1),
+                'grants': provisional
+            }
+        
+        aggregation = {
+            'grants': self.rank_candidates(self.flatten_results(results), keywords, filters, self.top_candidates),
+            'sources': sources
+        }
+        self.cache_aggregation(cache_key, aggregation)
+        
+        yield {
+            'event': 'final',
+            'cached': False,
+            'grants': self.select_top_grants(aggregation['grants'], seed),
+            'sources': sources,
+            'elapsed_ms': round((time.monotonic() - started) * 1000, 1)
+        }
+    
+    async def internal_first(self, events):
+        """
+        Re-yield iter_sources events with the internal grants source first. Without an
+        index it is a MongoDB text search, so sources finishing earlier wait for it.
+        """
+        internal = self.source_name(self.fetch_internal_grants)
+        held = [] if any(self.source_name(source) == internal for source in self.sources) else None
+        try:
+            async for event in events:
+                if held is None:
+                    yield event
+                elif event[0] != internal:
+                    held.append(event)
+                else:
+                    ready, held = [event] + held, None
+                    for ready_event in ready:
+                        yield ready_event
+            for event in held or ():
+                yield event
+        finally:
+            # Stops the sources when the consumer goes away early
+            await events.aclose()
+    
+    async def match_batch(self, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Match many project summaries against one shared candidate pool.
+        Every source is fetched once with the union of the batch's keywords (USAspending
+        with every summary's own query) and no funding bounds; each summary is then scored against that pool plus its
+        own internal index hits, within its own min_amount/max_amount, and
+        sampled with its own seed.
+        """
+        self.connect()
+        
+        keyword_sets = [
+            self.extract_keywords(item.get('project_summary', ''), item.get('focus_area', ''))
+            for item in items
+        ]
+        
+        # Union of keywords, most widely shared first
+        keyword_counts = Counter(keyword for keywords in keyword_sets for keyword in set(keywords))
+        union_keywords = [keyword for keyword, count in keyword_counts.most_common()]
+        
+        # USAspending searches each summary's own query, as /api/match would, in a few grouped requests
+        queries = list(dict.fromkeys(query for query in map(self.usaspending_query, keyword_sets) if query))
+        
+        async def fetch_usaspending(keywords: List[str], filters: MatchFilters = NO_FILTERS) -> List[Dict]:
+            return await self.fetch_usaspending_queries(queries, filters)
+        
+        fetchers = [fetch_usaspending if source == self.fetch_usaspending else source for source in self.sources]
+        # Internal grants come from each summary's own masked index search instead
+        if self.has_index:
+            fetchers = [source for source in fetchers if source != self.fetch_internal_grants]
+        pool, sources = await self.gather_sources(union_keywords, fetchers=fetchers)
+        if self.has_index:
+            sources['included'].insert(0, self.source_name(self.fetch_internal_grants))
+        
+        # Tokenize the shared pool once so each summary is a single sparse product
+        self.scorer.add_documents(pool)
+        
+        results = []
+        for item, keywords in zip(items, keyword_sets):
+            filters = MatchFilters(
+                AmountRange(item.get('min_amount'), item.get('max_amount')),
+                item.get('focus_area', ''),
+                item.get('org_type', '')
+            )
+            candidates = [dict(grant) for grant in pool]
+            if self.has_index:
+                candidates.extend(await self.search_internal(keywords, filters))
+            ranked = self.rank_candidates(candidates, keywords, filters, self.top_candidates)
+            seed = self.sample_seed(
+                item.get('seed'),
+                self.cache.make_key(keywords, filters.focus_area, filters.org_type, filters.amounts)
+            )
+            results.append(self.select_top_grants(ranked, seed))
             
-            # Randomly select 10 from the top results for variety
-            import random
-            if len(top_grants) > 10:
-                selected_grants = random.sample(top_grants, 10)
-                # Re-sort selected grants by relevance
-                selected_grants.sort(key=lambda x: x.get('relevance_score', 0), reverse=True)
-                return selected_grants
+            # Ranking is CPU-bound; let other requests run between summaries
+            await asyncio.sleep(0)
+        
+        return {'results': results, 'sources': sources}
+    
+    def breaker_for(self, name: str) -> CircuitBreaker:
+        """Get the circuit breaker guarding a source"""
+        breaker = self.breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                name,
+                failure_threshold=self.circuit_failure_threshold,
+                reset_timeout=self.circuit_reset_timeout
+            )
+            self.breakers[name] = breaker
+        return breaker
+    
+    def source_health(self) -> Dict[str, Dict[str, Any]]:
+        """Get circuit breaker state and rolling health for every source"""
+        return {
+            self.source_name(source): self.breaker_for(self.source_name(source)).snapshot()
+            for source in self.sources
+        }
+    
+    async def run_source(
+        self,
+        source,
+        keywords: List[str],
+        timings: Dict[str, float],
+        filters: MatchFilters = NO_FILTERS,
+        deadline: Optional[float] = None
+    ) -> List[Dict]:
+        """
+        Run one source through its circuit breaker within its own timeout.
+        Errors, timeouts and cancellation at the match deadline count against the
+        source; any other cancellation (the consumer went away) records nothing.
+        """
+        name = self.source_name(source)
+        breaker = self.breaker_for(name)
+        if not breaker.allow_request():
+            raise CircuitOpenError(f"Circuit open for {name}")
+        
+        timeout = self.source_timeouts.get(name, self.default_source_timeout)
+        started = time.monotonic()
+        try:
+            result = await asyncio.wait_for(source(keywords, filters), timeout)
+        except asyncio.CancelledError:
+            if deadline is not None and time.monotonic() >= deadline:
+                breaker.record_failure(time.monotonic() - started)
             else:
-                return top_grants[:10]
-            
-        except Exception as e:
-            logger.error(f"Grant matching failed: {e}")
-            return []
+                breaker.release()
+            raise
+        except Exception:
+            breaker.record_failure(time.monotonic() - started)
+            raise
+        finally:
+            timings[name] = round((time.monotonic() - started) * 1000, 1)
+        
+        breaker.record_success(time.monotonic() - started)
+        return result
     
-    def extract_keywords(self, text: str, focus_area: str = "") -> List[str]:
-        """Extract relevant keywords using basic NLP"""
-        # Common stop words
-        stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'}
+    @staticmethod
+    def empty_source_report() -> Dict[str, Any]:
+        return {'included': [], 'timed_out': [], 'failed': [], 'skipped': [], 'timings_ms': {}}
+    
+    def flatten_results(self, results: Dict[str, List[Dict]]) -> List[Dict]:
+        """Flatten per-source results in source order, so ties and dedupe are stable"""
+        all_grants = []
+        for source in self.sources:
+            name = self.source_name(source)
+            for grant in results.get(name, ()):
+                grant.setdefault('source', name)
+                all_grants.append(grant)
+        return all_grants
+    
+    async def iter_sources(
+        self,
+        keywords: List[str],
+        timings: Dict[str, float],
+        filters: MatchFilters = NO_FILTERS,
+        fetchers: Optional[List] = None
+    ):
+        """
+        Run all sources (or just the given fetchers) concurrently within the overall
+        match deadline and yield (name, status, grants) as each one finishes.
+        Sources still running when the deadline expires are cancelled and reported as timed out.
+        """
+        fetchers = self.sources if fetchers is None else fetchers
+        order = {self.source_name(source): i for i, source in enumerate(self.sources)}
+        deadline = time.monotonic() + self.match_deadline
+        tasks = {
+            asyncio.ensure_future(self.run_source(source, keywords, timings, filters, deadline)): self.source_name(source)
+            for source in fetchers
+        }
+        pending = set(tasks)
         
-        # Clean and tokenize
-        words = re.findall(r'\b[a-z]{3,}\b', text.lower())
-        keywords = [w for w in words if w not in stop_words]
+        try:
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                
+                for task in sorted(done, key=lambda t: order[tasks[t]]):
+                    name = tasks[task]
+                    error = task.exception()
+                    if isinstance(error, CircuitOpenError):
+                        yield name, 'skipped', []
+                    elif isinstance(error, asyncio.TimeoutError):
+                        yield name, 'timed_out', []
+                    elif error is not None:
+                        logger.warning(f"Source {name} failed: {error}")
+                        yield name, 'failed', []
+                    else:
+                        yield name, 'included', task.result()
+            
+            for task in sorted(pending, key=lambda t: order[tasks[t]]):
+                task.cancel()
+                yield tasks[task], 'timed_out', []
+        finally:
+            # Also stops stragglers when the consumer goes away early
+            for task in pending:
+                task.cancel()
+    
+    async def gather_sources(
+        self,
+        keywords: List[str],
+        filters: MatchFilters = NO_FILTERS,
+        fetchers: Optional[List] = None
+    ):
+        """
+        Fetch from all sources (or just the given fetchers) concurrently within the
+        overall match deadline and return whatever has finished, with a report of every source
+        """
+        results: Dict[str, List[Dict]] = {}
+        sources = self.empty_source_report()
+        async for name, status, grants in self.iter_sources(keywords, sources['timings_ms'], filters, fetchers):
+            sources[status].append(name)
+            if status == 'included':
+                results[name] = grants
         
-        # Add focus area terms
-        if focus_area:
-            keywords.extend(focus_area.lower().split())
+        if sources['timed_out']:
+            logger.warning(f"Sources timed out: {', '.join(sources['timed_out'])}")
         
-        # Get most common keywords
-        counter = Counter(keywords)
-        return [word for word, count in counter.most_common(10)]
+        return self.flatten_results(results), sources
+    
+    def extract_keywords(self, text: str, focus_area: str = "") -> List[str]:
+        """Extract relevant keywords with the shared text analyzer"""
+        return analyzer.extract_keywords(text, focus_area, limit=10)
     
-    def filter_and_dedupe(self, grants: List[Dict]) -> List[Dict]:
-        """Remove duplicates and expired grants"""
-        seen_titles = set()
+    def filter_and_dedupe(self, grants: List[Dict], filters: MatchFilters = NO_FILTERS) -> List[Dict]:
+        """
+        Remove near-duplicate and expired grants, and grants outside the funding bounds,
+        focus area or organization type, so every source is filtered like the index mask.
+        Duplicates are keyed on a normalized title + funder fingerprint; the
+        surviving grant lists every source the opportunity came from.
+        """
+        kept: Dict[str, Dict] = {}
         filtered = []
-        today = datetime.now()
+        now = datetime.utcnow()
+        today = now.date().isoformat()
+        matches_categories = filters.category_predicate()
         
         for grant in grants:
-            # Skip if duplicate title
-            if grant['title'] in seen_titles:
+            key = fingerprint(grant.get('title', ''), grant.get('funder', ''))
+            original = kept.get(key)
+            if original is not None:
+                source = grant.get('source')
+                if source and source not in original['sources']:
+                    original['sources'].append(source)
                 continue
             
-            # Skip if deadline passed
-            try:
-                if grant.get('deadline'):
-                    deadline = datetime.fromisoformat(grant['deadline'].replace('Z', '+00:00'))
-                    if deadline < today:
-                        continue
-            except:
-                pass
+            # Skip if the deadline has passed: typed deadline_at when normalized at ingest,
+            # otherwise ISO deadline text; free-text deadlines ('Rolling') are kept
+            deadline_at = grant.get('deadline_at')
+            if deadline_at is not None:
+                if deadline_at < now:
+                    continue
+            else:
+                deadline = grant.get('deadline')
+                if isinstance(deadline, str) and ISO_DATE_PATTERN.match(deadline) and deadline[:10] < today:
+                    continue
+            
+            if not filters.amounts.matches_grant(grant) or not matches_categories(grant):
+                continue
             
-            seen_titles.add(grant['title'])
+            grant['sources'] = [grant['source']] if grant.get('source') else []
+            kept[key] = grant
             filtered.append(grant)
         
         return filtered
     
-    def rank_by_relevance(self, grants: List[Dict], keywords: List[str]) -> List[Dict]:
-        """Rank grants by keyword relevance"""
-        for grant in grants:
-            score = 0
-            text = f"{grant['title']} {grant['description']}".lower()
-            
-            for keyword in keywords:
-                if keyword in text:
-                    score += text.count(keyword)
-            
-            grant['relevance_score'] = score
+    def rank_by_relevance(self, grants: List[Dict], keywords: List[str], limit: Optional[int] = None) -> List[Dict]:
+        """
+        Rank grants by TF-IDF keyword relevance, plus their semantic similarity
+        to the keywords when the semantic index is loaded, keeping only the top `limit`
+        """
+        scores = self.scorer.score(grants, keywords)
+        if self.semantic is not None and grants:
+            similarities = self.semantic.similarities(grants, self.semantic.embed_query(keywords))
+            scores = scores + self.semantic_weight * np.maximum(similarities, 0)
+        scores = scores.tolist()
+        
+        # Bounded heap selection; ties keep source order
+        limit = len(grants) if limit is None else limit
+        order = heapq.nlargest(limit, range(len(grants)), key=lambda i: (scores[i], -i))
         
-        # Sort by relevance
-        return sorted(grants, key=lambda x: x.get('relevance_score', 0), reverse=True)
+        ranked = []
+        for i in order:
+            grants[i]['relevance_score'] = round(scores[i], 4)
+            ranked.append(grants[i])
+        return ranked
     
     # Source 0: Internal Database (from PDF and other curated sources)
-    async def fetch_internal_grants(self, keywords: List[str]) -> List[Dict]:
-        """Fetch from internal MongoDB grants collection"""
+    @property
+    def has_index(self) -> bool:
+        """Whether internal grants come from an index (local or the index server)"""
+        return self.index_client is not None or self.index.is_built
+    
+    def search_index(self, keywords: List[str], filters: MatchFilters = NO_FILTERS, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Top internal index hits among grants passing the vectorized eligibility mask:
+        keyword (BM25) hits, then semantic nearest neighbours the keywords missed
+        """
+        mask = self.metadata.mask(filters)
+        hits = [grant for grant, score in self.index.search(keywords, limit or self.internal_match_limit, mask=mask)]
+        
+        if self.semantic is not None and self.semantic_match_limit:
+            seen = {id(grant) for grant in hits}
+            query = self.semantic.embed_query(keywords)
+            for row, score in self.semantic.search(query, self.semantic_match_limit, mask=mask):
+                grant = self.index.documents[row]
+                if id(grant) not in seen:
+                    hits.append(grant)
+        
+        return [dict(grant) for grant in hits]
+    
+    async def search_remote(self, keywords: List[str], filters: MatchFilters = NO_FILTERS) -> List[Dict]:
+        """Internal index hits from the index server; cached results are dropped when its index changed"""
+        generation, grants = await self.index_client.search(keywords, filters, self.internal_match_limit)
+        if generation != self.index_server_generation:
+            if self.index_server_generation is not None:
+                self.cache.invalidate()
+            self.index_server_generation = generation
+        return grants
+    
+    async def search_internal(self, keywords: List[str], filters: MatchFilters = NO_FILTERS) -> List[Dict]:
+        """Internal index hits from the local index or the index server"""
+        if self.index_client is None:
+            return self.search_index(keywords, filters)
         try:
-            if self.db is None:
-                return []
-            
-            grants_collection = self.db.grants
-            
-            # Build search query using text search
-            search_query = " ".join(keywords[:5])
-            
-            # Text search on indexed fields
-            cursor = grants_collection.find(
-                {
-                    '$text': {'$search': search_query},
-                    'is_active': True
-                },
-                {
-                    'score': {'$meta': 'textScore'}
-                }
-            ).sort([('score', {'$meta': 'textScore'})]).limit(50)
-            
-            db_grants = await cursor.to_list(50)
-            
-            # Convert to standard format
-            formatted_grants = []
-            for grant in db_grants:
-                formatted_grants.append({
-                    'title': grant.get('title', ''),
-                    'funder': grant.get('funder', ''),
-                    'description': grant.get('description', ''),
-                    'deadline': grant.get('deadline', 'Rolling'),
-                    'amount': grant.get('funding_amount', 'Varies'),
-                    'url': grant.get('url', ''),
-                    'source': 'CelFund Database'
-                })
-            
-            logger.info(f"Fetched {len(formatted_grants)} grants from internal database")
-            return formatted_grants
-            
+            return await self.search_remote(keywords, filters)
         except Exception as e:
-            logger.warning(f"Internal database fetch failed: {e}")
+            logger.warning(f"Index server search failed: {e}")
             return []
     
-    # Source 1: USAspending.gov API
-    async def fetch_usaspending(self, keywords: List[str]) -> List[Dict]:
-        """Fetch from USAspending.gov public API"""
-        try:
-            url = "https://api.usaspending.gov/api/v2/search/spending_by_award/"
-            
-            # Build search query
-            query = " ".join(keywords[:3])
-            
-            payload = {
-                "filters": {
-                    "award_type_codes": ["02", "03", "04", "05"],  # Grants
-                    "keywords": [query]
-                },
-                "fields": ["Award ID", "Award Amount", "Description", "Awarding Agency", "Start Date"],
-                "limit": 20
+    async def fetch_internal_grants(
+        self,
+        keywords: List[str],
+        filters: MatchFilters = NO_FILTERS,
+        limit: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Fetch from internal grants, using the index server or the in-memory index when it is built.
+        Errors propagate so the source's circuit breaker can see them.
+        """
+        if self.index_client is not None:
+            return await self.search_remote(keywords, filters)
+        
+        if self.index.is_built:
+            return self.search_index(keywords, filters, limit)
+        
+        self.connect()
+        grants_collection = self.db.grants
+        
+        # Build search query using text search
+        search_query = " ".join(surface_forms(keywords)[:5])
+        
+        # Text search on indexed fields
+        cursor = grants_collection.find(
+            {
+                '$text': {'$search': search_query},
+                'is_active': True,
+                **active_deadline_filter(),
+                **filters.amounts.mongo_filter()
+            },
+            {
+                'score': {'$meta': 'textScore'}
             }
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, json=payload, timeout=5) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return self.parse_usaspending(data)
-            
-            return []
-        except Exception as e:
-            logger.warning(f"USAspending fetch failed: {e}")
-            return []
+        ).sort([('score', {'$meta': 'textScore'})]).limit(50)
+        
+        db_grants = await cursor.to_list(50)
+        
+        # Convert to standard format
+        formatted_grants = [self.format_internal_grant(grant) for grant in db_grants]
+        
+        logger.info(f"Fetched {len(formatted_grants)} grants from internal database")
+        return formatted_grants
+    
+    def format_internal_grant(self, grant: Dict) -> Dict:
+        """Convert an internal grants document to the standard format"""
+        # Grants stored before ingest-time normalization get their deadline fields here
+        deadline_fields = normalize_deadline(grant.get('deadline')) if 'deadline_kind' not in grant else {
+            'deadline_at': grant.get('deadline_at'),
+            'deadline_kind': grant['deadline_kind']
+        }
+        amount_fields = normalize_amount(grant.get('funding_amount', grant.get('amount'))) if 'amount_min' not in grant else {
+            'amount_min': grant['amount_min'],
+            'amount_max': grant.get('amount_max')
+        }
+        return {
+            'title': grant.get('title', ''),
+            'funder': grant.get('funder', ''),
+            'description': grant.get('description', ''),
+            'deadline': grant.get('deadline', 'Rolling'),
+            'amount': grant.get('funding_amount', 'Varies'),
+            **amount_fields,
+            'url': grant.get('url', ''),
+            'focus_areas': grant.get('focus_areas', []),
+            # Kept so the organization type filter sees it on every path, like the index mask
+            'eligibility': grant.get('eligibility', ''),
+            **deadline_fields,
+            'source': 'CelFund Database'
+        }
+    
+    # Source 1: USAspending.gov API
+    async def fetch_usaspending(self, keywords: List[str], filters: MatchFilters = NO_FILTERS) -> List[Dict]:
+        """
+        Fetch from USAspending.gov public API.
+        Errors propagate so the source's circuit breaker can see them.
+        """
+        return await self.fetch_usaspending_queries([self.usaspending_query(keywords)], filters)
+    
+    @staticmethod
+    def usaspending_query(keywords: List[str]) -> str:
+        """USAspending search text of a summary's keywords"""
+        # USAspending matches words as written, so it gets the user's words rather than stems
+        return " ".join(surface_forms(keywords)[:3])
+    
+    async def fetch_usaspending_queries(self, queries: List[str], filters: MatchFilters = NO_FILTERS) -> List[Dict]:
+        """
+        Fetch the awards of several search texts: the API matches any of a request's
+        keywords, so queries go in groups of usaspending_queries_per_request, fetched concurrently.
+        Large batches get bigger groups so they never send more than usaspending_max_requests
+        requests, which all have to finish within the source's timeout.
+        """
+        size = max(self.usaspending_queries_per_request, -(-len(queries) // self.usaspending_max_requests))
+        pages = await asyncio.gather(*(
+            self.fetch_usaspending_page(queries[start:start + size], filters)
+            for start in range(0, len(queries), size)
+        ))
+        return [grant for page in pages for grant in page]
+    
+    async def fetch_usaspending_page(self, queries: List[str], filters: MatchFilters = NO_FILTERS) -> List[Dict]:
+        """One USAspending request with room for 20 awards per query"""
+        url = "https://api.usaspending.gov/api/v2/search/spending_by_award/"
+        
+        payload = {
+            "filters": {
+                "award_type_codes": ["02", "03", "04", "05"],  # Grants
+                "keywords": queries
+            },
+            "fields": ["Award ID", "Award Amount", "Description", "Awarding Agency", "Start Date"],
+            "limit": min(20 * len(queries), 100)
+        }
+        amounts = filters.amounts
+        if amounts.is_set:
+            # Let the API apply the funding bounds instead of filtering its page afterwards
+            bounds = {}
+            if amounts.min_amount is not None:
+                bounds["lower_bound"] = amounts.min_amount
+            if amounts.max_amount is not None:
+                bounds["upper_bound"] = amounts.max_amount
+            payload["filters"]["award_amounts"] = [bounds]
+        
+        async def load():
+            session = http_client.session()
+            async with session.post(url, json=payload, timeout=aiohttp.ClientTimeout(total=5)) as response:
+                response.raise_for_status()
+                return await response.json()
+        
+        data = await self.usaspending_cache.fetch(payload, load)
+        return self.parse_usaspending(data, limit=15 * len(queries))
     
-    def parse_usaspending(self, data: Dict) -> List[Dict]:
+    def parse_usaspending(self, data: Dict, limit: int = 15) -> List[Dict]:
         """Parse USAspending response"""
         grants = []
         results = data.get('results', [])
         
-        for item in results[:15]:  # Increased from 5 to 15
+        for item in results[:limit]:
+            award_amount = item.get('Award Amount') or 100000
             grants.append({
                 'title': item.get('Award ID', 'Federal Grant Opportunity'),
                 'funder': item.get('Awarding Agency', 'U.S. Federal Government'),
                 'description': item.get('Description', 'Federal funding opportunity for eligible organizations')[:200],
                 'deadline': (datetime.now() + timedelta(days=90)).isoformat(),
-                'amount': f"${item.get('Award Amount', 100000):,.0f}",
+                'amount': f"${award_amount:,.0f}",
+                'amount_min': float(award_amount),
+                'amount_max': float(award_amount),
                 'url': f"https://www.usaspending.gov/award/{item.get('Award ID', '')}"
             })
         
         return grants
     
     # Source 2: Grants.gov public feed
-    async def fetch_grants_gov(self, keywords: List[str]) -> List[Dict]:
+    async def fetch_grants_gov(self, keywords: List[str], filters: MatchFilters = NO_FILTERS) -> List[Dict]:
         """Fetch from Grants.gov public XML/RSS feed"""
-        try:
-            # Mock data with more variety
-            grants = [
-                {
-                    'title': 'Community Development Block Grant Program',
-                    'funder': 'U.S. Department of Housing and Urban Development',
-                    'description': 'Provides communities with resources to address housing, economic development, and infrastructure needs.',
-                    'deadline': (datetime.now() + timedelta(days=60)).isoformat(),
-                    'amount': '$100,000 - $500,000',
-                    'url': 'https://www.grants.gov/search-grants.html'
-                },
-                {
-                    'title': 'Environmental Education Grants',
-                    'funder': 'Environmental Protection Agency',
-                    'description': 'Supports environmental education projects that increase public awareness and knowledge.',
-                    'deadline': (datetime.now() + timedelta(days=75)).isoformat(),
-                    'amount': '$50,000 - $250,000',
-                    'url': 'https://www.grants.gov/search-grants.html'
-                },
-                {
-                    'title': 'Small Business Innovation Research',
-                    'funder': 'National Science Foundation',
-                    'description': 'Funding for small businesses to engage in research and development with commercialization potential.',
-                    'deadline': (datetime.now() + timedelta(days=90)).isoformat(),
-                    'amount': '$150,000 - $1,000,000',
-                    'url': 'https://www.grants.gov/search-grants.html'
-                },
-                {
-                    'title': 'Arts and Culture Programming Grant',
-                    'funder': 'National Endowment for the Arts',
-                    'description': 'Support for arts organizations to develop creative programming and community engagement.',
-                    'deadline': (datetime.now() + timedelta(days=85)).isoformat(),
-                    'amount': '$25,000 - $150,000',
-                    'url': 'https://www.grants.gov/search-grants.html'
-                },
-                {
-                    'title': 'Youth Development Initiative',
-                    'funder': 'Department of Health and Human Services',
-                    'description': 'Programs that support positive youth development and prevent risky behaviors.',
-                    'deadline': (datetime.now() + timedelta(days=70)).isoformat(),
-                    'amount': '$75,000 - $300,000',
-                    'url': 'https://www.grants.gov/search-grants.html'
-                }
-            ]
-            
-            return grants
-            
-        except Exception as e:
-            logger.warning(f"Grants.gov fetch failed: {e}")
-            return []
+        return self.catalog.search('grants_gov', keywords, filters.amounts)
     
     # Source 3: Foundation Directory / Candid public data
-    async def fetch_foundation_directory(self, keywords: List[str]) -> List[Dict]:
+    async def fetch_foundation_directory(self, keywords: List[str], filters: MatchFilters = NO_FILTERS) -> List[Dict]:
         """Fetch from Foundation Directory public sources"""
-        grants = [
-            {
-                'title': 'Community Foundation General Operating Support',
-                'funder': 'National Community Foundation Network',
-                'description': 'General operating support for nonprofits serving underserved communities.',
-                'deadline': (datetime.now() + timedelta(days=45)).isoformat(),
-                'amount': '$25,000 - $100,000',
-                'url': 'https://www.cof.org/community-foundations'
-            },
-            {
-                'title': 'Education Excellence Fund',
-                'funder': 'Gates Foundation',
-                'description': 'Supporting innovative educational programs and literacy initiatives in underserved areas.',
-                'deadline': (datetime.now() + timedelta(days=55)).isoformat(),
-                'amount': '$100,000 - $500,000',
-                'url': 'https://www.gatesfoundation.org'
-            },
-            {
-                'title': 'Women Empowerment Grant',
-                'funder': 'Global Women\'s Fund',
-                'description': 'Programs focused on women\'s economic empowerment and leadership development.',
-                'deadline': (datetime.now() + timedelta(days=65)).isoformat(),
-                'amount': '$50,000 - $200,000',
-                'url': 'https://www.globalfundforwomen.org'
-            },
-            {
-                'title': 'Climate Action Initiative',
-                'funder': 'Environmental Defense Fund',
-                'description': 'Projects addressing climate change through community-based solutions.',
-                'deadline': (datetime.now() + timedelta(days=80)).isoformat(),
-                'amount': '$75,000 - $350,000',
-                'url': 'https://www.edf.org'
-            }
-        ]
-        return grants
+        return self.catalog.search('foundation_directory', keywords, filters.amounts)
     
     # Source 4: State open data portals
-    async def fetch_state_grants(self, keywords: List[str]) -> List[Dict]:
+    async def fetch_state_grants(self, keywords: List[str], filters: MatchFilters = NO_FILTERS) -> List[Dict]:
         """Aggregate from state open data portals"""
-        grants = [
-            {
-                'title': 'California Arts Council Project Grant',
-                'funder': 'California Arts Council',
-                'description': 'Funding for arts and cultural programs that serve California communities.',
-                'deadline': (datetime.now() + timedelta(days=55)).isoformat(),
-                'amount': '$10,000 - $75,000',
-                'url': 'https://www.arts.ca.gov/grants/'
-            },
-            {
-                'title': 'New York Community Development Program',
-                'funder': 'New York State Division of Housing',
-                'description': 'Support for affordable housing and community development initiatives.',
-                'deadline': (datetime.now() + timedelta(days=70)).isoformat(),
-                'amount': '$50,000 - $300,000',
-                'url': 'https://hcr.ny.gov/funding-opportunities'
-            },
-            {
-                'title': 'Texas Small Business Growth Fund',
-                'funder': 'Texas Economic Development',
-                'description': 'Grants for small businesses to expand operations and create jobs.',
-                'deadline': (datetime.now() + timedelta(days=60)).isoformat(),
-                'amount': '$35,000 - $150,000',
-                'url': 'https://gov.texas.gov/business'
-            },
-            {
-                'title': 'Florida Environmental Restoration',
-                'funder': 'Florida Department of Environmental Protection',
-                'description': 'Projects focused on coastal restoration and water quality improvement.',
-                'deadline': (datetime.now() + timedelta(days=75)).isoformat(),
-                'amount': '$100,000 - $500,000',
-                'url': 'https://floridadep.gov/grants'
-            },
-            {
-                'title': 'Illinois Education Innovation',
-                'funder': 'Illinois State Board of Education',
-                'description': 'Innovative educational programs and STEM initiatives for K-12 schools.',
-                'deadline': (datetime.now() + timedelta(days=50)).isoformat(),
-                'amount': '$40,000 - $200,000',
-                'url': 'https://www.isbe.net/grants'
-            }
-        ]
-        return grants
+        return self.catalog.search('state_grants', keywords, filters.amounts)
     
     # Source 5: Philanthropy News Digest
-    async def fetch_philanthropy_news(self, keywords: List[str]) -> List[Dict]:
+    async def fetch_philanthropy_news(self, keywords: List[str], filters: MatchFilters = NO_FILTERS) -> List[Dict]:
         """Fetch from Philanthropy News Digest RFP feed"""
-        grants = [
-            {
-                'title': 'Health Equity Grant Program',
-                'funder': 'National Health Foundation',
-                'description': 'Supports organizations working to eliminate health disparities in underserved populations.',
-                'deadline': (datetime.now() + timedelta(days=50)).isoformat(),
-                'amount': '$75,000 - $200,000',
-                'url': 'https://philanthropynewsdigest.org/rfps'
-            },
-            {
-                'title': 'Rural Healthcare Access Initiative',
-                'funder': 'Robert Wood Johnson Foundation',
-                'description': 'Improving healthcare access in rural and underserved communities.',
-                'deadline': (datetime.now() + timedelta(days=65)).isoformat(),
-                'amount': '$100,000 - $400,000',
-                'url': 'https://www.rwjf.org'
-            },
-            {
-                'title': 'Youth Sports and Wellness Program',
-                'funder': 'Nike Community Impact Fund',
-                'description': 'Supporting youth sports programs that promote health and community engagement.',
-                'deadline': (datetime.now() + timedelta(days=55)).isoformat(),
-                'amount': '$25,000 - $100,000',
-                'url': 'https://www.nike.com/community'
-            },
-            {
-                'title': 'Food Security Initiative',
-                'funder': 'Walmart Foundation',
-                'description': 'Programs addressing hunger and food insecurity in local communities.',
-                'deadline': (datetime.now() + timedelta(days=70)).isoformat(),
-                'amount': '$50,000 - $250,000',
-                'url': 'https://walmart.org'
-            }
-        ]
-        return grants
+        return self.catalog.search('philanthropy_news', keywords, filters.amounts)
     
     # Source 6: Corporate CSR feeds
-    async def fetch_corporate_csr(self, keywords: List[str]) -> List[Dict]:
+    async def fetch_corporate_csr(self, keywords: List[str], filters: MatchFilters = NO_FILTERS) -> List[Dict]:
         """Fetch from corporate CSR public feeds"""
-        grants = [
-            {
-                'title': 'Tech for Good Innovation Fund',
-                'funder': 'Global Tech Corporation CSR',
-                'description': 'Funding for nonprofits using technology to solve social and environmental challenges.',
-                'deadline': (datetime.now() + timedelta(days=80)).isoformat(),
-                'amount': '$50,000 - $150,000',
-                'url': 'https://corporate-foundation.example.com/grants'
-            },
-            {
-                'title': 'Diversity and Inclusion Grant',
-                'funder': 'Microsoft Philanthropies',
-                'description': 'Supporting programs that advance diversity, equity, and inclusion in tech.',
-                'deadline': (datetime.now() + timedelta(days=75)).isoformat(),
-                'amount': '$75,000 - $300,000',
-                'url': 'https://www.microsoft.com/philanthropy'
-            },
-            {
-                'title': 'Community Infrastructure Development',
-                'funder': 'Amazon Community Fund',
-                'description': 'Infrastructure projects that benefit local communities near Amazon facilities.',
-                'deadline': (datetime.now() + timedelta(days=90)).isoformat(),
-                'amount': '$100,000 - $500,000',
-                'url': 'https://www.aboutamazon.com/community'
-            },
-            {
-                'title': 'Sustainable Agriculture Program',
-                'funder': 'General Mills Foundation',
-                'description': 'Projects promoting sustainable farming practices and food system resilience.',
-                'deadline': (datetime.now() + timedelta(days=60)).isoformat(),
-                'amount': '$40,000 - $175,000',
-                'url': 'https://www.generalmills.com/foundation'
-            }
-        ]
-        return grants
+        return self.catalog.search('corporate_csr', keywords, filters.amounts)
     
     # Source 7: Data.gov grants datasets
-    async def fetch_data_gov(self, keywords: List[str]) -> List[Dict]:
+    async def fetch_data_gov(self, keywords: List[str], filters: MatchFilters = NO_FILTERS) -> List[Dict]:
         """Fetch from Data.gov grant datasets"""
-        grants = [
-            {
-                'title': 'Rural Business Development Grant',
-                'funder': 'U.S. Department of Agriculture',
-                'description': 'Provides grants for rural business development, technical assistance, and training.',
-                'deadline': (datetime.now() + timedelta(days=65)).isoformat(),
-                'amount': '$50,000 - $250,000',
-                'url': 'https://www.rd.usda.gov/programs-services/business-programs'
-            },
-            {
-                'title': 'Historic Preservation Fund',
-                'funder': 'National Park Service',
-                'description': 'Grants for preservation of historic properties and cultural heritage sites.',
-                'deadline': (datetime.now() + timedelta(days=85)).isoformat(),
-                'amount': '$30,000 - $200,000',
-                'url': 'https://www.nps.gov/subjects/historicpreservationfund'
-            },
-            {
-                'title': 'Energy Efficiency and Renewable Energy',
-                'funder': 'Department of Energy',
-                'description': 'Supporting clean energy projects and energy efficiency improvements.',
-                'deadline': (datetime.now() + timedelta(days=70)).isoformat(),
-                'amount': '$100,000 - $1,000,000',
-                'url': 'https://www.energy.gov/grants'
-            },
-            {
-                'title': 'Veterans Job Training Program',
-                'funder': 'Department of Veterans Affairs',
-                'description': 'Programs providing job training and employment services for veterans.',
-                'deadline': (datetime.now() + timedelta(days=60)).isoformat(),
-                'amount': '$50,000 - $300,000',
-                'url': 'https://www.va.gov/grants'
-            },
-            {
-                'title': 'STEM Education Excellence',
-                'funder': 'National Science Foundation',
-                'description': 'Enhancing STEM education through innovative teaching methods and curricula.',
-                'deadline': (datetime.now() + timedelta(days=95)).isoformat(),
-                'amount': '$75,000 - $400,000',
-                'url': 'https://www.nsf.gov/funding'
-            }
-        ]
-        return grants
+        return self.catalog.search('data_gov', keywords, filters.amounts)
@@ -0,0 +1,301 @@
+"""
+Columnar Grant Metadata Store
+Filterable grant fields held in NumPy arrays whose rows line up with the
+search index's document ids, so every eligibility filter (active status,
+deadline, funding amount, source, focus area, organization type) is one
+vectorized mask instead of a Python loop over grant dicts
+"""
+import calendar
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from grant_normalization import ANY_AMOUNT, AmountRange, normalize_amount, normalize_deadline
+from text_analyzer import analyzer
+
+logger = logging.getLogger(__name__)
+
+# Interned categories, matched on analyzed terms of a grant's focus areas and eligibility text
+FOCUS_AREA_TERMS = {
+    'climate': 'climate environment environmental sustainability sustainable energy conservation renewable clean',
+    'education': 'education educational school literacy learning student teacher stem',
+    'health': 'health wellness medical healthcare mental nutrition',
+    'technology': 'technology tech innovation digital software data cyber',
+    'community': 'community economic housing neighborhood inclusion equity infrastructure development',
+    'arts': 'art arts culture cultural creative music storytelling humanities'
+}
+ORG_TYPE_TERMS = {
+    'nonprofit': 'nonprofit charity charitable 501 ngo',
+    'startup': 'startup founder entrepreneur business company venture',
+    'education': 'school university college educator academic',
+    'research': 'research researcher scientist laboratory',
+    'government': 'government municipal municipality tribal tribe county agency'
+}
+
+
+# Grants naming no known category match every request
+ALL_CATEGORIES = np.uint8(0xFF)
+
+
+def intern_categories(table: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+    """Assign each category a bit of a uint8 bitset and its analyzed term set"""
+    return {
+        name: {'bit': np.uint8(1 << position), 'terms': frozenset(analyzer.analyze(terms))}
+        for position, (name, terms) in enumerate(table.items())
+    }
+
+
+FOCUS_AREAS = intern_categories(FOCUS_AREA_TERMS)
+ORG_TYPES = intern_categories(ORG_TYPE_TERMS)
+
+
+def category_bits(text: str, categories: Dict[str, Dict[str, Any]]) -> np.uint8:
+    """Bitset of the categories a piece of text names, 0 when it names none"""
+    value = ' '.join((text or '').lower().split())
+    if value in categories:
+        return categories[value]['bit']
+
+    # 'Non-profit' and 'non profit' analyze like 'nonprofit'
+    terms = set(analyzer.analyze(value.replace('non-', 'non').replace('non ', 'non')))
+    bits = np.uint8(0)
+    for category in categories.values():
+        if terms & category['terms']:
+            bits |= category['bit']
+    return bits
+
+
+def deadline_epoch(value: Optional[datetime]) -> float:
+    """Seconds since the epoch of a naive UTC datetime, +inf when there is no deadline"""
+    if value is None:
+        return np.inf
+    return float(calendar.timegm(value.utctimetuple()))
+
+
+def grant_category_bits(grant: Dict[str, Any]) -> Tuple[np.uint8, np.uint8]:
+    """Focus area and organization type bitsets of a grant dict; a grant naming none is not restricted"""
+    focus_areas = grant.get('focus_areas') or ()
+    if isinstance(focus_areas, str):
+        focus_areas = (focus_areas,)
+    return (
+        category_bits(' '.join(focus_areas), FOCUS_AREAS) or ALL_CATEGORIES,
+        category_bits(grant.get('eligibility') or '', ORG_TYPES) or ALL_CATEGORIES
+    )
+
+
+class MatchFilters(NamedTuple):
+    """Eligibility filters of one match request, passed to every source"""
+    amounts: AmountRange = ANY_AMOUNT
+    focus_area: str = ""
+    org_type: str = ""
+
+    def category_predicate(self) -> Callable[[Dict[str, Any]], bool]:
+        """
+        Check a grant dict's focus areas and eligibility the way GrantMetadataStore.mask
+        checks its columns, for candidates that did not come from the index
+        """
+        focus = category_bits(self.focus_area, FOCUS_AREAS) or ALL_CATEGORIES
+        org = category_bits(self.org_type, ORG_TYPES) or ALL_CATEGORIES
+        if focus == ALL_CATEGORIES and org == ALL_CATEGORIES:
+            return lambda grant: True
+
+        def matches(grant: Dict[str, Any]) -> bool:
+            grant_focus, grant_org = grant_category_bits(grant)
+            return bool(grant_focus & focus) and bool(grant_org & org)
+        return matches
+
+
+NO_FILTERS = MatchFilters()
+
+
+class GrantMetadataStore:
+    """
+    Grant metadata as parallel NumPy columns, one row per indexed grant.
+    Rows are appended or updated in place on upsert; capacity doubles as it fills.
+    Unknown values are stored so that every filter is a single comparison:
+    an unknown amount is the empty range (+inf, -inf) and unknown categories are all bits set.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.size = 0
+        self.rows: Dict[str, int] = {}
+        self.source_ids: Dict[str, int] = {}
+        
+        # MongoDB _id of every grants document -> row; duplicates of a grant_id share a row
+        self.object_ids: Dict[str, int] = {}
+        self.row_documents: Counter = Counter()
+        self.allocate(capacity)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def allocate(self, capacity: int):
+        """(Re)allocate every column, keeping existing rows"""
+        def grow(column: Optional[np.ndarray], dtype, fill) -> np.ndarray:
+            new_column = np.full(capacity, fill, dtype=dtype)
+            if column is not None:
+                new_column[:self.size] = column[:self.size]
+            return new_column
+
+        self.capacity = capacity
+        self.active = grow(getattr(self, 'active', None), np.bool_, False)
+        self.deadline = grow(getattr(self, 'deadline', None), np.float64, np.inf)
+        self.amount_min = grow(getattr(self, 'amount_min', None), np.float64, np.inf)
+        self.amount_max = grow(getattr(self, 'amount_max', None), np.float64, -np.inf)
+        self.source = grow(getattr(self, 'source', None), np.int32, -1)
+        self.focus_bits = grow(getattr(self, 'focus_bits', None), np.uint8, ALL_CATEGORIES)
+        self.org_bits = grow(getattr(self, 'org_bits', None), np.uint8, ALL_CATEGORIES)
+
+    @staticmethod
+    def key(grant: Dict[str, Any]) -> Optional[str]:
+        """Stable identity of a grants document"""
+        if grant.get('grant_id'):
+            return str(grant['grant_id'])
+        if grant.get('_id') is not None:
+            return str(grant['_id'])
+        return None
+
+    @classmethod
+    def unique(cls, grants: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        One document per grant, in the row order build() assigns: documents sharing
+        a key collapse to the last one, at the position of the first
+        """
+        unique: List[Dict[str, Any]] = []
+        positions: Dict[str, int] = {}
+        for grant in grants:
+            key = cls.key(grant)
+            if key is None:
+                unique.append(grant)
+            elif key in positions:
+                unique[positions[key]] = grant
+            else:
+                positions[key] = len(unique)
+                unique.append(grant)
+        return unique
+
+    def intern_source(self, source: Optional[str]) -> int:
+        if not source:
+            return -1
+        return self.source_ids.setdefault(source, len(self.source_ids))
+
+    def build(self, grants: Iterable[Dict[str, Any]]):
+        """
+        Rebuild the store from grants documents. Index the documents of
+        unique(grants) so that index document ids line up with the rows.
+        """
+        self.size = 0
+        self.rows = {}
+        self.object_ids = {}
+        self.row_documents = Counter()
+        for grant in grants:
+            self.upsert(grant)
+        logger.info(f"Built grant metadata store: {self.size} grants, {len(self.source_ids)} sources")
+
+    def load_columns(
+        self,
+        columns: Dict[str, np.ndarray],
+        keys: Sequence[str],
+        source_ids: Dict[str, int],
+        object_ids: Optional[Dict[str, int]] = None
+    ):
+        """Adopt prebuilt columns, e.g. the copy-on-write memory maps of an index snapshot"""
+        for name, column in columns.items():
+            setattr(self, name, column)
+        self.size = self.capacity = len(keys)
+        self.rows = {key: row for row, key in enumerate(keys) if key}
+        self.source_ids = dict(source_ids)
+        self.object_ids = dict(object_ids or {})
+        self.row_documents = Counter(self.object_ids.values())
+
+    def upsert(self, grant: Dict[str, Any]) -> int:
+        """Update a grant's row in place, or append a new row; returns the row"""
+        key = self.key(grant)
+        row = self.rows.get(key) if key is not None else None
+        if row is None:
+            if self.size == self.capacity:
+                self.allocate(max(self.capacity * 2, 1024))
+            row = self.size
+            self.size += 1
+            if key is not None:
+                self.rows[key] = row
+        if grant.get('_id') is not None:
+            object_id = str(grant['_id'])
+            if self.object_ids.get(object_id) != row:
+                self.object_ids[object_id] = row
+                self.row_documents[row] += 1
+
+        # Grants stored before ingest-time normalization are normalized here
+        deadline = grant['deadline_at'] if 'deadline_kind' in grant else normalize_deadline(grant.get('deadline'))['deadline_at']
+        amount = (
+            {'amount_min': grant['amount_min'], 'amount_max': grant.get('amount_max')}
+            if 'amount_min' in grant
+            else normalize_amount(grant.get('funding_amount', grant.get('amount')))
+        )
+
+        self.active[row] = bool(grant.get('is_active', True))
+        self.deadline[row] = deadline_epoch(deadline)
+        if amount['amount_min'] is None:
+            self.amount_min[row], self.amount_max[row] = np.inf, -np.inf
+        else:
+            self.amount_min[row] = amount['amount_min']
+            self.amount_max[row] = np.inf if amount['amount_max'] is None else amount['amount_max']
+        self.source[row] = self.intern_source(grant.get('source'))
+        self.focus_bits[row], self.org_bits[row] = grant_category_bits(grant)
+        return row
+
+    def remove(self, object_id: str) -> Optional[int]:
+        """
+        Forget a deleted grants document. Its row is deactivated unless another
+        document (a duplicate of the same grant_id) still maps to it; returns the
+        deactivated row, or None.
+        """
+        row = self.object_ids.pop(object_id, None)
+        if row is None:
+            return None
+        self.row_documents[row] -= 1
+        if self.row_documents[row] > 0:
+            return None
+        del self.row_documents[row]
+        self.active[row] = False
+        return row
+
+    def row_for(self, grant: Dict[str, Any]) -> Optional[int]:
+        key = self.key(grant)
+        return self.rows.get(key) if key is not None else None
+
+    def mask(
+        self,
+        filters: MatchFilters = NO_FILTERS,
+        now: Optional[datetime] = None,
+        sources: Optional[Iterable[str]] = None
+    ) -> np.ndarray:
+        """
+        Boolean mask over all rows of grants that are active, still open, within
+        the funding bounds and compatible with the focus area and organization type.
+        Grants with no known focus area or eligible organization types are not restricted.
+        """
+        size = self.size
+        mask = self.active[:size].copy()
+        mask &= self.deadline[:size] >= deadline_epoch(now or datetime.utcnow())
+
+        amounts = filters.amounts
+        if amounts.is_set:
+            # The empty range of unknown amounts fails both comparisons
+            mask &= self.amount_min[:size] <= (np.inf if amounts.max_amount is None else amounts.max_amount)
+            mask &= self.amount_max[:size] >= (-np.inf if amounts.min_amount is None else amounts.min_amount)
+
+        for bits, column in (
+            (category_bits(filters.focus_area, FOCUS_AREAS), self.focus_bits),
+            (category_bits(filters.org_type, ORG_TYPES), self.org_bits)
+        ):
+            if bits:
+                mask &= (column[:size] & bits) != 0
+
+        if sources is not None:
+            source_ids = [self.source_ids[source] for source in sources if source in self.source_ids]
+            mask &= np.isin(self.source[:size], source_ids)
+
+        return mask
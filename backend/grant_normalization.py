@@ -0,0 +1,202 @@
+"""
+Ingest-time normalization of free-text grant fields
+Turns deadline text ('Rolling', 'Deadline: 12/15/2025', ISO strings, ...)
+into typed deadline_at / deadline_kind fields, and funding text
+('$100,000 - $500,000', 'Up to $50K', 'Varies') into numeric
+amount_min / amount_max fields stored alongside the grant
+"""
+import re
+from datetime import datetime, time
+from functools import lru_cache
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+DEADLINE_ROLLING = 'rolling'
+DEADLINE_DATE = 'date'
+DEADLINE_WINDOW = 'window'
+DEADLINE_VARIES = 'varies'
+DEADLINE_UNKNOWN = 'unknown'
+
+ROLLING_PATTERN = re.compile(r'\b(rolling|ongoing|open until|continuous|year[- ]round|anytime|no deadline)\b', re.I)
+VARIES_PATTERN = re.compile(r'\b(varies|various|tbd|tba|see website)\b', re.I)
+
+MONTHS = 'jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|jun(?:e)?|jul(?:y)?|aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?'
+WINDOW_PATTERN = re.compile(rf'\b({MONTHS})\b\s*(?:-|–|to|through)\s*\b({MONTHS})\b', re.I)
+
+# Date shapes found in scraped and curated deadline text, most specific first
+DATE_PATTERNS = (
+    (re.compile(r'\b(\d{4}-\d{2}-\d{2})(?:[T ][\d:.]+(?:Z|[+-]\d{2}:?\d{2})?)?\b'), ('%Y-%m-%d',)),
+    (re.compile(r'\b(\d{1,2}/\d{1,2}/\d{4})\b'), ('%m/%d/%Y',)),
+    (re.compile(r'\b(\d{1,2}/\d{1,2}/\d{2})\b'), ('%m/%d/%y',)),
+    (re.compile(rf'\b((?:{MONTHS})\.?\s+\d{{1,2}}(?:st|nd|rd|th)?,?\s+\d{{4}})\b', re.I), ('%B %d %Y', '%b %d %Y')),
+    (re.compile(rf'\b(\d{{1,2}}\s+(?:{MONTHS})\.?,?\s+\d{{4}})\b', re.I), ('%d %B %Y', '%d %b %Y')),
+)
+
+
+def parse_deadline_date(text: str) -> Optional[datetime]:
+    """Find and parse the first date in deadline text, as the end of that day"""
+    for pattern, formats in DATE_PATTERNS:
+        match = pattern.search(text)
+        if not match:
+            continue
+        value = re.sub(r'(\d)(st|nd|rd|th)', r'\1', match.group(1))
+        value = value.replace(',', ' ').replace('.', ' ')
+        value = re.sub(r'\bsept\b', 'sep', ' '.join(value.split()), flags=re.I)
+        if formats[0] == '%Y-%m-%d':
+            value = value[:10]
+        for date_format in formats:
+            try:
+                parsed = datetime.strptime(value, date_format)
+            except ValueError:
+                continue
+            return datetime.combine(parsed.date(), time(23, 59, 59))
+    return None
+
+
+def normalize_deadline(deadline: Any) -> Dict[str, Any]:
+    """
+    Classify deadline text and extract a date when it has one.
+    deadline_at is a naive UTC datetime (end of day) or None when the grant has no fixed deadline.
+    """
+    if isinstance(deadline, datetime):
+        return {'deadline_at': deadline, 'deadline_kind': DEADLINE_DATE}
+
+    text = (deadline or '').strip() if isinstance(deadline, str) else ''
+    if not text:
+        return {'deadline_at': None, 'deadline_kind': DEADLINE_UNKNOWN}
+
+    deadline_at = parse_deadline_date(text)
+    if deadline_at is not None:
+        return {'deadline_at': deadline_at, 'deadline_kind': DEADLINE_DATE}
+
+    if ROLLING_PATTERN.search(text):
+        kind = DEADLINE_ROLLING
+    elif WINDOW_PATTERN.search(text):
+        kind = DEADLINE_WINDOW
+    elif VARIES_PATTERN.search(text):
+        kind = DEADLINE_VARIES
+    else:
+        kind = DEADLINE_UNKNOWN
+
+    return {'deadline_at': None, 'deadline_kind': kind}
+
+
+# A dollar figure or a figure with a magnitude suffix: '$20,000', '$1.5 million', '250K'
+AMOUNT_PATTERN = re.compile(r'(\$)?\s*(\d+(?:,\d{3})*(?:\.\d+)?)\s*(k|m|mm|b|bn|thousand|million|billion)?\b', re.I)
+RANGE_SEPARATOR_PATTERN = re.compile(r'^\s*(?:-|–|—|to|and)\s*$', re.I)
+UP_TO_PATTERN = re.compile(r'\b(up to|maximum|max|not to exceed|no more than|under)\b', re.I)
+OPEN_ENDED_PATTERN = re.compile(r'(\d\s*[kmb]?\s*\+|\bor more\b|\bminimum\b|\bat least\b|\band up\b)', re.I)
+
+AMOUNT_MULTIPLIERS = {
+    'k': 1e3, 'thousand': 1e3,
+    'm': 1e6, 'mm': 1e6, 'million': 1e6,
+    'b': 1e9, 'bn': 1e9, 'billion': 1e9
+}
+
+
+@lru_cache(maxsize=4096)
+def parse_amount(text: Optional[str]) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Parse funding text into an (amount_min, amount_max) range.
+    'Up to $50,000' is (0, 50000), '$100K+' is (100000, None), 'Varies' is (None, None).
+    Bare numbers without a dollar sign or magnitude ('12-week program') are ignored,
+    except as the start of a range ('$1-2 million').
+    """
+    if not text:
+        return None, None
+
+    matches = list(AMOUNT_PATTERN.finditer(text))
+    values = []
+    for i, match in enumerate(matches):
+        dollar, digits, suffix = match.groups()
+        following = matches[i + 1] if i + 1 < len(matches) else None
+        starts_range = (
+            following is not None
+            and bool(following.group(1) or following.group(3))
+            and bool(RANGE_SEPARATOR_PATTERN.match(text[match.end():following.start()]))
+        )
+        if not dollar and not suffix and not starts_range:
+            continue
+        if not suffix and starts_range and not following.group(1):
+            # '$1-2 million': the range start shares the end's magnitude
+            suffix = following.group(3)
+        values.append(float(digits.replace(',', '')) * AMOUNT_MULTIPLIERS.get((suffix or '').lower(), 1))
+
+    if not values:
+        return None, None
+    if len(values) > 1:
+        return min(values), max(values)
+    if UP_TO_PATTERN.search(text):
+        return 0.0, values[0]
+    if OPEN_ENDED_PATTERN.search(text):
+        return values[0], None
+    return values[0], values[0]
+
+
+def normalize_amount(amount: Any) -> Dict[str, Optional[float]]:
+    """Numeric funding range for a grant; both bounds are None when the amount is unknown"""
+    if isinstance(amount, (int, float)):
+        return {'amount_min': float(amount), 'amount_max': float(amount)}
+    amount_min, amount_max = parse_amount(amount if isinstance(amount, str) else None)
+    return {'amount_min': amount_min, 'amount_max': amount_max}
+
+
+class AmountRange(NamedTuple):
+    """Requested funding bounds; a grant matches when its amount range overlaps them"""
+    min_amount: Optional[float] = None
+    max_amount: Optional[float] = None
+
+    @property
+    def is_set(self) -> bool:
+        return self.min_amount is not None or self.max_amount is not None
+
+    def matches(self, amount_min: Optional[float], amount_max: Optional[float]) -> bool:
+        """Check a grant's (amount_min, amount_max); grants with unknown amounts only match without bounds"""
+        if not self.is_set:
+            return True
+        if amount_min is None:
+            return False
+        if self.max_amount is not None and amount_min > self.max_amount:
+            return False
+        if self.min_amount is not None and amount_max is not None and amount_max < self.min_amount:
+            return False
+        return True
+
+    def matches_grant(self, grant: Dict[str, Any]) -> bool:
+        """Check a grant dict, parsing its amount text when it was not normalized at ingest"""
+        if not self.is_set:
+            return True
+        if 'amount_min' in grant:
+            return self.matches(grant['amount_min'], grant.get('amount_max'))
+        amount = normalize_amount(grant.get('amount', grant.get('funding_amount')))
+        return self.matches(amount['amount_min'], amount['amount_max'])
+
+    def mongo_filter(self) -> Dict[str, Any]:
+        """Mongo filter on the indexed amount_min/amount_max fields"""
+        if not self.is_set:
+            return {}
+        conditions = [{'amount_min': {'$ne': None}}]
+        if self.max_amount is not None:
+            conditions.append({'amount_min': {'$lte': self.max_amount}})
+        if self.min_amount is not None:
+            conditions.append({'$or': [{'amount_max': None}, {'amount_max': {'$gte': self.min_amount}}]})
+        return {'$and': conditions}
+
+
+ANY_AMOUNT = AmountRange()
+
+
+def normalize_grant(grant: Dict[str, Any]) -> Dict[str, Any]:
+    """Add the typed normalized fields to a grant document in place"""
+    grant.update(normalize_deadline(grant.get('deadline')))
+    grant.update(normalize_amount(grant.get('funding_amount', grant.get('amount'))))
+    return grant
+
+
+def active_deadline_filter(now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Mongo filter excluding grants whose deadline has passed"""
+    return {
+        '$or': [
+            {'deadline_at': None},
+            {'deadline_at': {'$gte': now or datetime.utcnow()}}
+        ]
+    }
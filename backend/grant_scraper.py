@@ -10,12 +10,15 @@ import time
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Any
 import logging
-from motor.motor_asyncio import AsyncIOMotorClient
 import os
 from pathlib import Path
 import json
 import hashlib
 from fake_useragent import UserAgent
+from grant_normalization import normalize_grant
+from grant_metadata import GrantMetadataStore
+from semantic_index import SemanticIndex
+from mongo_client import mongo
 
 # Selenium imports
 from selenium import webdriver
@@ -37,12 +40,19 @@ class HumanBehaviorSimulator:
     """Simulates human-like browsing behavior"""
     
     def __init__(self):
-        self.ua = UserAgent()
+        self._ua = None
         self.last_action_time = time.time()
         self.session_start_time = time.time()
         self.pages_viewed_today = 0
         self.last_break_time = time.time()
         
+    @property
+    def ua(self) -> UserAgent:
+        """User agent generator, created on first use (it loads its browser data)"""
+        if self._ua is None:
+            self._ua = UserAgent()
+        return self._ua
+    
     async def random_delay(self, min_seconds: float = 3, max_seconds: float = 10):
         """Random delay between actions"""
         delay = random.uniform(min_seconds, max_seconds)
@@ -165,12 +175,13 @@ class GrantWatchScraper:
     def __init__(self, mongo_url: str, db_name: str):
         self.mongo_url = mongo_url
         self.db_name = db_name
-        self.client = None
         self.db = None
         self.behavior = HumanBehaviorSimulator()
         self.driver = None
         self.session_grants_scraped = 0
         self.total_grants_scraped = 0
+        # Grants written by the last session, for incremental index updates
+        self.last_saved_grants: List[Dict[str, Any]] = []
         self.categories_scraped_today = []
         
         # Categories to scrape (randomized each session)
@@ -191,12 +202,13 @@ class GrantWatchScraper:
         
     async def initialize(self):
         """Initialize database connection"""
-        self.client = AsyncIOMotorClient(self.mongo_url)
-        self.db = self.client[self.db_name]
+        self.db = mongo.database(self.db_name, self.mongo_url)
         
         # Create indexes
         await self.db.grants.create_index([('grant_id', 1)], unique=True)
         await self.db.grants.create_index([('title', 'text'), ('description', 'text')])
+        await self.db.grants.create_index([('is_active', 1), ('deadline_at', 1)])
+        await self.db.grants.create_index([('amount_min', 1), ('amount_max', 1)])
         await self.db.scraping_sessions.create_index([('session_id', 1)])
         
         logger.info("Database initialized")
@@ -345,6 +357,9 @@ class GrantWatchScraper:
             grant_data['scraped_at'] = datetime.utcnow()
             grant_data['is_active'] = True
             
+            # Typed deadline and amount fields so queries can filter on them
+            normalize_grant(grant_data)
+            
             return grant_data
             
         except Exception as e:
@@ -424,6 +439,7 @@ class GrantWatchScraper:
     async def save_grants(self, grants: List[Dict[str, Any]]) -> int:
         """Save grants to database"""
         saved_count = 0
+        self.last_saved_grants = []
         
         for grant in grants:
             try:
@@ -433,6 +449,7 @@ class GrantWatchScraper:
                     {'$set': grant},
                     upsert=True
                 )
+                self.last_saved_grants.append(grant)
                 
                 if result.upserted_id:
                     saved_count += 1
@@ -441,8 +458,23 @@ class GrantWatchScraper:
                 logger.error(f"Failed to save grant: {e}")
         
         logger.info(f"Saved {saved_count} new grants to database")
+        # Loading, folding in and rewriting the index file is blocking work
+        await asyncio.to_thread(self.update_semantic_index, self.last_saved_grants)
         return saved_count
     
+    def update_semantic_index(self, grants: List[Dict[str, Any]]):
+        """Fold saved grants into the offline semantic index, if one has been built"""
+        path = os.environ.get('SEMANTIC_INDEX_PATH', str(Path(__file__).parent / 'semantic_index.npz'))
+        try:
+            index = SemanticIndex.load(path)
+            if index is None or not grants:
+                return
+            folded = index.fold_in(grants, [GrantMetadataStore.key(grant) for grant in grants])
+            index.save(path)
+            logger.info(f"Folded {folded} grants into the semantic index")
+        except Exception as e:
+            logger.error(f"Failed to update semantic index: {e}")
+    
     async def run_scraping_session(self):
         """Run a single scraping session (20-30 grants)"""
         session_id = hashlib.md5(str(datetime.utcnow()).encode()).hexdigest()[:8]
@@ -548,8 +580,6 @@ class GrantWatchScraper:
         }
     
     async def close(self):
-        """Close connections"""
+        """Close the browser; the shared MongoDB pool stays open for other users"""
         if self.driver:
             self.driver.quit()
-        if self.client:
-            self.client.close()
@@ -0,0 +1,183 @@
+"""
+Grants Collection Watcher
+Follows the grants collection with a MongoDB change stream, or by polling an
+_id / scraped_at high-water mark where change streams are unavailable (standalone
+servers), and applies inserts, updates and deletes to a GrantMatcher's index
+incrementally. Changes are applied in small batches, so a bulk import becomes a
+handful of index updates instead of a rebuild per write.
+"""
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+# Change stream events that make incremental updates impossible
+REBUILD_OPERATIONS = {'drop', 'rename', 'dropDatabase', 'invalidate'}
+
+
+class GrantChangeWatcher:
+    """Keeps a GrantMatcher's index and result cache in step with the grants collection"""
+
+    def __init__(
+        self,
+        matcher,
+        mode: str = 'auto',
+        poll_seconds: float = 5.0,
+        batch_seconds: float = 1.0,
+        max_batch: int = 500,
+        reconcile_seconds: float = 300.0
+    ):
+        self.matcher = matcher
+        self.mode = mode
+        self.poll_seconds = poll_seconds
+        self.batch_seconds = batch_seconds
+        self.max_batch = max_batch
+        self.reconcile_seconds = reconcile_seconds
+
+        self.resume_token = None
+        self.last_id = None
+        self.last_scraped_at: Optional[datetime] = None
+        self.last_reconciled = time.monotonic()
+        self.stats = {'mode': None, 'batches': 0, 'upserted': 0, 'deleted': 0, 'rebuilds': 0, 'errors': 0}
+
+    @classmethod
+    def from_env(cls, matcher) -> Optional['GrantChangeWatcher']:
+        """Watcher configured by GRANT_WATCH (auto, poll or off) and GRANT_WATCH_* settings"""
+        mode = os.environ.get('GRANT_WATCH', 'auto').strip().lower()
+        if mode == 'off':
+            return None
+        return cls(
+            matcher,
+            mode=mode,
+            poll_seconds=float(os.environ.get('GRANT_WATCH_POLL_SECONDS', 5)),
+            reconcile_seconds=float(os.environ.get('GRANT_WATCH_RECONCILE_SECONDS', 300))
+        )
+
+    async def run(self):
+        """Watch until cancelled, falling back to polling when change streams are not supported"""
+        try:
+            self.matcher.connect()
+            if self.mode != 'poll':
+                try:
+                    await self.follow_change_stream()
+                    return
+                except (OperationFailure, NotImplementedError) as e:
+                    logger.info(f"Grants change streams unavailable, polling instead: {e}")
+            await self.poll()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Grants watcher stopped: {e}")
+
+    async def follow_change_stream(self):
+        while True:
+            try:
+                async with self.matcher.db.grants.watch(
+                    full_document='updateLookup',
+                    resume_after=self.resume_token,
+                    max_await_time_ms=int(self.batch_seconds * 1000)
+                ) as stream:
+                    self.stats['mode'] = 'change_stream'
+                    logger.info("Following grants change stream")
+                    pending: List[Dict[str, Any]] = []
+                    while stream.alive:
+                        change = await stream.try_next()
+                        if change is not None:
+                            pending.append(change)
+                        # Apply once the stream is idle or the batch is full
+                        if pending and (change is None or len(pending) >= self.max_batch):
+                            await self.apply_changes(pending)
+                            pending = []
+                        self.resume_token = stream.resume_token
+            except OperationFailure:
+                if self.resume_token is None:
+                    raise
+                # e.g. the resume token fell off the oplog: start over from a rebuilt index
+                logger.warning("Grants change stream could not resume; rebuilding the index")
+                self.resume_token = None
+                await self.rebuild()
+            except PyMongoError as e:
+                self.stats['errors'] += 1
+                logger.warning(f"Grants change stream interrupted, resuming: {e}")
+                await asyncio.sleep(self.poll_seconds)
+
+    async def apply_changes(self, changes: List[Dict[str, Any]]):
+        """Collapse a batch of change events to the latest state per document and apply it"""
+        upserted: Dict[str, Dict[str, Any]] = {}
+        deleted: Set[str] = set()
+        for change in changes:
+            operation = change['operationType']
+            if operation in REBUILD_OPERATIONS:
+                await self.rebuild()
+                return
+            object_id = str(change['documentKey']['_id'])
+            document = change.get('fullDocument')
+            if operation == 'delete' or (operation in ('update', 'replace') and document is None):
+                upserted.pop(object_id, None)
+                deleted.add(object_id)
+            elif document is not None:
+                deleted.discard(object_id)
+                upserted[object_id] = document
+        self.apply(list(upserted.values()), list(deleted))
+
+    def apply(self, upserted: List[Dict[str, Any]], deleted: List[str]):
+        if not upserted and not deleted:
+            return
+        self.matcher.apply_grant_changes(upserted, deleted)
+        self.stats['batches'] += 1
+        self.stats['upserted'] += len(upserted)
+        self.stats['deleted'] += len(deleted)
+
+    async def rebuild(self):
+        self.stats['rebuilds'] += 1
+        await self.matcher.refresh_index()
+
+    async def poll(self):
+        """Pick up new grants by _id and rescraped ones by scraped_at; deletes by periodic reconciliation"""
+        self.stats['mode'] = 'polling'
+        grants = self.matcher.db.grants
+        latest = await grants.find({}, {'_id': 1}).sort('_id', -1).limit(1).to_list(1)
+        self.last_id = latest[0]['_id'] if latest else None
+        latest = await grants.find({'scraped_at': {'$ne': None}}, {'scraped_at': 1}).sort('scraped_at', -1).limit(1).to_list(1)
+        self.last_scraped_at = latest[0]['scraped_at'] if latest else datetime.utcnow()
+        logger.info(f"Polling grants every {self.poll_seconds}s for changes")
+
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                await self.poll_once()
+            except PyMongoError as e:
+                self.stats['errors'] += 1
+                logger.warning(f"Grants poll failed: {e}")
+
+    async def poll_once(self):
+        query = {'scraped_at': {'$gt': self.last_scraped_at}}
+        if self.last_id is not None:
+            query = {'$or': [{'_id': {'$gt': self.last_id}}, query]}
+        elif await self.matcher.db.grants.estimated_document_count():
+            # The collection was empty when polling started: every grant is new
+            query = {}
+        changed = await self.matcher.db.grants.find(query).to_list(None)
+        for grant in changed:
+            if self.last_id is None or grant['_id'] > self.last_id:
+                self.last_id = grant['_id']
+            scraped_at = grant.get('scraped_at')
+            if isinstance(scraped_at, datetime) and scraped_at > self.last_scraped_at:
+                self.last_scraped_at = scraped_at
+
+        deleted = []
+        if time.monotonic() - self.last_reconciled >= self.reconcile_seconds:
+            deleted = await self.find_deleted()
+        self.apply(changed, deleted)
+
+    async def find_deleted(self) -> List[str]:
+        """_ids the index knows that are no longer in the collection"""
+        self.last_reconciled = time.monotonic()
+        existing = {str(grant['_id']) async for grant in self.matcher.db.grants.find({}, {'_id': 1})}
+        return [object_id for object_id in self.matcher.metadata.object_ids if object_id not in existing]
@@ -0,0 +1,82 @@
+"""
+Shared pooled outbound HTTP client
+One aiohttp session per process with keep-alive, per-host connection
+limits, DNS caching and default timeouts, opened at startup and closed at shutdown
+"""
+import os
+import logging
+from typing import Dict, Any, Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+
+class OutboundHTTPClient:
+    """Owns the application-wide pooled aiohttp session"""
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 20,
+        keepalive_timeout: float = 30,
+        dns_cache_ttl: int = 300,
+        timeout: float = 10
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.timeout = timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @classmethod
+    def from_env(cls) -> 'OutboundHTTPClient':
+        return cls(
+            limit=int(os.environ.get('HTTP_POOL_LIMIT', 100)),
+            limit_per_host=int(os.environ.get('HTTP_POOL_LIMIT_PER_HOST', 20)),
+            keepalive_timeout=float(os.environ.get('HTTP_KEEPALIVE_SECONDS', 30)),
+            dns_cache_ttl=int(os.environ.get('HTTP_DNS_CACHE_SECONDS', 300)),
+            timeout=float(os.environ.get('HTTP_TIMEOUT_SECONDS', 10))
+        )
+
+    async def start(self):
+        """Open the pooled session"""
+        self.session()
+        logger.info(f"Outbound HTTP pool started (limit={self.limit}, per_host={self.limit_per_host})")
+
+    def session(self) -> aiohttp.ClientSession:
+        """Get the shared session, creating it on first use. Must be called from a running event loop."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.dns_cache_ttl,
+                use_dns_cache=True
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._session
+
+    async def close(self):
+        """Close the pooled session and its connections"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Get pool configuration and usage"""
+        connector = self._session.connector if self._session is not None and not self._session.closed else None
+        return {
+            'open': connector is not None,
+            'limit': self.limit,
+            'limit_per_host': self.limit_per_host,
+            'acquired_connections': len(getattr(connector, '_acquired', ())) if connector else 0
+        }
+
+
+# Process-wide client used by the matcher and webhook modules
+http_client = OutboundHTTPClient.from_env()
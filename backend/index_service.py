@@ -0,0 +1,353 @@
+"""
+Grant Index Service - one grant index per node behind a Unix domain socket
+The index server owns the internal grants index (built in memory or opened from
+the shared snapshot) and answers masked top-k searches for every API worker;
+GrantMatcher switches to IndexClient when INDEX_SERVER_SOCKET is set.
+
+Wire format: every frame is a fixed header followed by a binary payload.
+    header  = magic 'GI', protocol version (u8), opcode (u8), request id (u32), payload length (u32)
+    strings = u16 length + UTF-8; floats are f64 with NaN for "unset"
+    grants  = u32 count, then u32 length + JSON record each (datetimes as ISO strings)
+Responses echo the opcode and request id and start with a status byte and the
+index generation, which changes whenever the server's index does.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import struct
+from typing import Any, Dict, List, Optional, Tuple
+
+from grant_metadata import MatchFilters
+from grant_normalization import AmountRange
+from index_snapshot import decode_document, encode_document
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'GI'
+PROTOCOL_VERSION = 1
+HEADER = struct.Struct('!2sBBII')
+MAX_PAYLOAD = 64 * 1024 * 1024
+
+OP_PING = 0
+OP_SEARCH = 1
+OP_REFRESH = 2
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+# Grant count meaning "the collection changed, rebuild"
+REBUILD = 0xFFFFFFFF
+
+
+class ProtocolError(Exception):
+    pass
+
+
+class IndexServerError(Exception):
+    """The index server answered with an error status"""
+
+
+class PayloadWriter:
+    def __init__(self):
+        self.parts: List[bytes] = []
+
+    def u8(self, value: int):
+        self.parts.append(struct.pack('!B', value))
+
+    def u16(self, value: int):
+        self.parts.append(struct.pack('!H', value))
+
+    def u32(self, value: int):
+        self.parts.append(struct.pack('!I', value))
+
+    def f64(self, value: Optional[float]):
+        self.parts.append(struct.pack('!d', math.nan if value is None else value))
+
+    def string(self, value: str):
+        data = (value or '').encode('utf-8')[:0xFFFF]
+        self.u16(len(data))
+        self.parts.append(data)
+
+    def grants(self, grants: Optional[List[Dict[str, Any]]]):
+        if grants is None:
+            self.u32(REBUILD)
+            return
+        self.u32(len(grants))
+        for grant in grants:
+            record = encode_document(grant)
+            self.u32(len(record))
+            self.parts.append(record)
+
+    def getvalue(self) -> bytes:
+        return b''.join(self.parts)
+
+
+class PayloadReader:
+    def __init__(self, data: bytes):
+        self.data = memoryview(data)
+        self.position = 0
+
+    def take(self, size: int) -> memoryview:
+        if self.position + size > len(self.data):
+            raise ProtocolError('truncated payload')
+        chunk = self.data[self.position:self.position + size]
+        self.position += size
+        return chunk
+
+    def u8(self) -> int:
+        return self.take(1)[0]
+
+    def u16(self) -> int:
+        return struct.unpack('!H', self.take(2))[0]
+
+    def u32(self) -> int:
+        return struct.unpack('!I', self.take(4))[0]
+
+    def f64(self) -> Optional[float]:
+        value = struct.unpack('!d', self.take(8))[0]
+        return None if math.isnan(value) else value
+
+    def string(self) -> str:
+        return bytes(self.take(self.u16())).decode('utf-8')
+
+    def grants(self) -> Optional[List[Dict[str, Any]]]:
+        count = self.u32()
+        if count == REBUILD:
+            return None
+        return [decode_document(bytes(self.take(self.u32()))) for _ in range(count)]
+
+
+def encode_search(keywords: List[str], filters: MatchFilters, limit: int) -> bytes:
+    payload = PayloadWriter()
+    payload.u16(min(len(keywords), 0xFFFF))
+    for keyword in keywords[:0xFFFF]:
+        payload.string(keyword)
+    payload.f64(filters.amounts.min_amount)
+    payload.f64(filters.amounts.max_amount)
+    payload.string(filters.focus_area)
+    payload.string(filters.org_type)
+    payload.u16(min(limit, 0xFFFF))
+    return payload.getvalue()
+
+
+def decode_search(data: bytes) -> Tuple[List[str], MatchFilters, int]:
+    payload = PayloadReader(data)
+    keywords = [payload.string() for _ in range(payload.u16())]
+    amounts = AmountRange(payload.f64(), payload.f64())
+    filters = MatchFilters(amounts, payload.string(), payload.string())
+    return keywords, filters, payload.u16()
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Tuple[int, int, bytes]:
+    """(opcode, request id, payload) of the next frame"""
+    magic, version, opcode, request_id, length = HEADER.unpack(await reader.readexactly(HEADER.size))
+    if magic != MAGIC or version != PROTOCOL_VERSION:
+        raise ProtocolError(f"bad frame header {magic!r} v{version}")
+    if length > MAX_PAYLOAD:
+        raise ProtocolError(f"payload of {length} bytes exceeds the limit")
+    return opcode, request_id, await reader.readexactly(length)
+
+
+def write_frame(writer: asyncio.StreamWriter, opcode: int, request_id: int, payload: bytes):
+    writer.write(HEADER.pack(MAGIC, PROTOCOL_VERSION, opcode, request_id, len(payload)) + payload)
+
+
+class IndexServer:
+    """Serves a GrantMatcher's internal index over a Unix domain socket"""
+
+    def __init__(self, matcher, socket_path: str):
+        self.matcher = matcher
+        self.socket_path = socket_path
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.requests = 0
+
+    async def start(self):
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self.server = await asyncio.start_unix_server(self.handle_connection, path=self.socket_path)
+        logger.info(f"Grant index server listening on {self.socket_path}")
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    opcode, request_id, payload = await read_frame(reader)
+                except asyncio.IncompleteReadError:
+                    break
+                write_frame(writer, opcode, request_id, await self.dispatch(opcode, payload))
+                await writer.drain()
+        except (ProtocolError, ConnectionError) as e:
+            logger.warning(f"Index server connection dropped: {e}")
+        finally:
+            writer.close()
+
+    async def dispatch(self, opcode: int, data: bytes) -> bytes:
+        """Status byte, index generation and the opcode's response body"""
+        self.requests += 1
+        response = PayloadWriter()
+        try:
+            if opcode == OP_SEARCH:
+                keywords, filters, limit = decode_search(data)
+                body = PayloadWriter()
+                body.grants(await self.matcher.fetch_internal_grants(keywords, filters, limit=limit))
+            elif opcode == OP_REFRESH:
+                await self.matcher.refresh_index(PayloadReader(data).grants())
+                body = PayloadWriter()
+            elif opcode == OP_PING:
+                body = PayloadWriter()
+                body.string(json.dumps(self.stats()))
+            else:
+                raise ProtocolError(f"unknown opcode {opcode}")
+        except Exception as e:
+            logger.error(f"Index server request {opcode} failed: {e}")
+            response.u8(STATUS_ERROR)
+            response.u32(self.matcher.index_generation)
+            response.string(str(e))
+            return response.getvalue()
+
+        response.u8(STATUS_OK)
+        response.u32(self.matcher.index_generation)
+        response.parts.extend(body.parts)
+        return response.getvalue()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'documents': len(self.matcher.index),
+            'index_built': self.matcher.index.is_built,
+            'snapshot': self.matcher.snapshot.version if self.matcher.snapshot is not None else None,
+            'generation': self.matcher.index_generation,
+            'requests': self.requests
+        }
+
+
+class IndexClient:
+    """Pooled connections from an API worker to the node's index server"""
+
+    def __init__(self, socket_path: str, timeout: float = 2.0, max_idle: int = 8):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self.next_request_id = 0
+        self.generation: Optional[int] = None
+
+    async def request(self, opcode: int, payload: bytes = b'', timeout: Optional[float] = None) -> Tuple[int, PayloadReader]:
+        """Send one request; returns the server's index generation and the response body"""
+        while True:
+            pooled = bool(self.idle)
+            connection = self.idle.pop() if pooled else await asyncio.open_unix_connection(self.socket_path)
+            try:
+                data = await self.exchange(connection, opcode, payload, timeout)
+                break
+            except (ConnectionError, asyncio.IncompleteReadError):
+                # Pooled connections go stale when the server restarts; retry on a fresh one
+                if not pooled:
+                    raise
+
+        if len(self.idle) < self.max_idle:
+            self.idle.append(connection)
+        else:
+            connection[1].close()
+
+        response = PayloadReader(data)
+        status, generation = response.u8(), response.u32()
+        self.generation = generation
+        if status != STATUS_OK:
+            raise IndexServerError(response.string())
+        return generation, response
+
+    async def exchange(self, connection, opcode: int, payload: bytes, timeout: Optional[float]) -> bytes:
+        reader, writer = connection
+        self.next_request_id = (self.next_request_id + 1) & 0xFFFFFFFF
+        request_id = self.next_request_id
+        try:
+            write_frame(writer, opcode, request_id, payload)
+            await writer.drain()
+            response_opcode, response_id, data = await asyncio.wait_for(read_frame(reader), timeout)
+            if (response_opcode, response_id) != (opcode, request_id):
+                raise ProtocolError(f"response {response_id} does not answer request {request_id}")
+        except BaseException:
+            # A half-read connection cannot be reused
+            writer.close()
+            raise
+        return data
+
+    async def search(self, keywords: List[str], filters: MatchFilters, limit: int) -> Tuple[int, List[Dict[str, Any]]]:
+        generation, response = await self.request(OP_SEARCH, encode_search(keywords, filters, limit), self.timeout)
+        return generation, response.grants()
+
+    async def refresh(self, grants: Optional[List[Dict[str, Any]]] = None) -> int:
+        payload = PayloadWriter()
+        payload.grants(grants)
+        generation, _ = await self.request(OP_REFRESH, payload.getvalue())
+        return generation
+
+    async def ping(self) -> Dict[str, Any]:
+        _, response = await self.request(OP_PING, timeout=self.timeout)
+        return json.loads(response.string())
+
+    def close(self):
+        while self.idle:
+            self.idle.pop()[1].close()
+
+
+async def serve(socket_path: str):
+    """Build the index and serve it until cancelled"""
+    from grant_matcher import GrantMatcher
+    from grant_watcher import GrantChangeWatcher
+    from mongo_client import mongo
+
+    matcher = GrantMatcher(index_server_socket='')
+    await matcher.build_index()
+    watchers = [asyncio.create_task(matcher.watch_snapshots())] if matcher.snapshot_dir else []
+    grant_watcher = GrantChangeWatcher.from_env(matcher)
+    if grant_watcher is not None:
+        watchers.append(asyncio.create_task(grant_watcher.run()))
+
+    server = IndexServer(matcher, socket_path)
+    await server.start()
+    try:
+        await server.server.serve_forever()
+    finally:
+        for watcher in watchers:
+            watcher.cancel()
+        await server.close()
+        await mongo.close()
+        matcher.usaspending_cache.close()
+
+
+def main():
+    from pathlib import Path
+    from dotenv import load_dotenv
+
+    load_dotenv(Path(__file__).parent / '.env')
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description='Serve the grant search index over a Unix domain socket')
+    parser.add_argument('--socket', type=str,
+                       default=os.environ.get('INDEX_SERVER_SOCKET') or '/tmp/celfund-index.sock',
+                       help='Socket path (default: INDEX_SERVER_SOCKET)')
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.socket))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
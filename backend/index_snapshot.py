@@ -0,0 +1,294 @@
+"""
+Versioned On-Disk Grant Index Snapshots
+The grant search structures (BM25 postings, term dictionary, columnar metadata,
+document store and aligned semantic vectors) written as a directory of flat
+arrays that every uvicorn worker memory-maps instead of rebuilding from MongoDB.
+A builder writes each version to a fresh directory and publishes it by atomically
+replacing the CURRENT pointer; workers poll the pointer and swap to new versions.
+"""
+import fcntl
+import json
+import logging
+import mmap
+import os
+import shutil
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 2
+CURRENT_POINTER = 'CURRENT'
+LOCK_FILE = '.lock'
+KEEP_VERSIONS = 3
+
+# Metadata columns, in GrantMetadataStore attribute names
+METADATA_COLUMNS = ('active', 'deadline', 'amount_min', 'amount_max', 'source', 'focus_bits', 'org_bits')
+
+# Document fields stored as ISO strings and decoded back to datetimes
+DATETIME_FIELDS = ('deadline_at',)
+
+
+def encode_document(document: Dict[str, Any]) -> bytes:
+    return json.dumps(
+        document,
+        separators=(',', ':'),
+        default=lambda value: value.isoformat() if isinstance(value, datetime) else str(value)
+    ).encode('utf-8')
+
+
+def decode_document(data: bytes) -> Dict[str, Any]:
+    document = json.loads(data)
+    for field in DATETIME_FIELDS:
+        if isinstance(document.get(field), str):
+            document[field] = datetime.fromisoformat(document[field])
+    return document
+
+
+class SnapshotDocuments:
+    """
+    Document store of a snapshot: JSON records decoded lazily from the mapped file.
+    Documents replaced or appended in this process live in an in-memory overlay.
+    Decoded records are cached so repeated lookups return the same dict.
+    """
+
+    def __init__(self, data, offsets: np.ndarray, max_cached_documents: int = 10000):
+        self.data = data
+        self.offsets = offsets
+        self.base_size = len(offsets) - 1
+        self.overrides: Dict[int, Dict[str, Any]] = {}
+        self.appended: List[Dict[str, Any]] = []
+        self.max_cached_documents = max_cached_documents
+        self.cache: 'OrderedDict[int, Dict[str, Any]]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return self.base_size + len(self.appended)
+
+    def __getitem__(self, doc_id: int) -> Dict[str, Any]:
+        if doc_id < 0:
+            doc_id += len(self)
+        if doc_id >= self.base_size:
+            return self.appended[doc_id - self.base_size]
+        if doc_id in self.overrides:
+            return self.overrides[doc_id]
+
+        document = self.cache.get(doc_id)
+        if document is None:
+            document = decode_document(self.data[int(self.offsets[doc_id]):int(self.offsets[doc_id + 1])])
+            self.cache[doc_id] = document
+            if len(self.cache) > self.max_cached_documents:
+                self.cache.popitem(last=False)
+        else:
+            self.cache.move_to_end(doc_id)
+        return document
+
+    def __setitem__(self, doc_id: int, document: Dict[str, Any]):
+        if doc_id >= self.base_size:
+            self.appended[doc_id - self.base_size] = document
+        else:
+            self.overrides[doc_id] = document
+            self.cache.pop(doc_id, None)
+
+    def __iter__(self):
+        for doc_id in range(len(self)):
+            yield self[doc_id]
+
+    def append(self, document: Dict[str, Any]):
+        self.appended.append(document)
+
+
+class IndexSnapshot:
+    """One published snapshot version, opened read-only with memory maps"""
+
+    def __init__(self, path: str, manifest: Dict[str, Any]):
+        self.path = path
+        self.manifest = manifest
+        self.version = os.path.basename(path)
+        self.built_at = manifest['built_at']
+        self.size = manifest['documents']
+
+        # Postings: shared read-only pages
+        self.terms = self.load('terms')
+        self.term_offsets = self.load('term_offsets')
+        self.doc_ids = self.load('doc_ids')
+        self.impacts = self.load('impacts')
+
+        # Per-process writes (incremental upserts) go to private copy-on-write pages
+        self.columns = {name: self.load(name, mode='c') for name in METADATA_COLUMNS}
+        self.keys = self.load('keys')
+        self.object_ids = self.load('object_ids')
+        self.object_rows = self.load('object_rows')
+        self.semantic_vectors = self.load('semantic_vectors', mode='c') if manifest.get('semantic_built_at') else None
+
+        self.document_offsets = self.load('document_offsets')
+        with open(os.path.join(path, 'documents.bin'), 'rb') as f:
+            self.document_data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if self.document_offsets[-1] else b''
+
+    def load(self, name: str, mode: str = 'r') -> np.ndarray:
+        return np.load(os.path.join(self.path, f'{name}.npy'), mmap_mode=mode, allow_pickle=False)
+
+    @classmethod
+    def open(cls, path: str) -> 'IndexSnapshot':
+        return cls(path, read_manifest(path))
+
+    @classmethod
+    def open_current(cls, directory: str) -> Optional['IndexSnapshot']:
+        """Open the published snapshot of a directory, None when nothing is published"""
+        version = current_version(directory)
+        if version is None:
+            return None
+        return cls.open(os.path.join(directory, version))
+
+    def documents(self) -> SnapshotDocuments:
+        """A fresh overlay over the shared document store"""
+        return SnapshotDocuments(self.document_data, self.document_offsets)
+
+    def term_id(self, term: str) -> int:
+        position = int(np.searchsorted(self.terms, term))
+        if position < len(self.terms) and self.terms[position] == term:
+            return position
+        return -1
+
+    def postings(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(document ids, impacts) of a term; zero-copy slices of the mapped arrays"""
+        term_id = self.term_id(term)
+        if term_id < 0:
+            return self.doc_ids[:0], self.impacts[:0]
+        start, end = self.term_offsets[term_id], self.term_offsets[term_id + 1]
+        return self.doc_ids[start:end], self.impacts[start:end]
+
+    def document_frequency(self, term: str) -> int:
+        term_id = self.term_id(term)
+        if term_id < 0:
+            return 0
+        return int(self.term_offsets[term_id + 1] - self.term_offsets[term_id])
+
+
+def read_manifest(path: str) -> Dict[str, Any]:
+    with open(os.path.join(path, 'manifest.json')) as f:
+        manifest = json.load(f)
+    if manifest.get('format') != FORMAT_VERSION:
+        raise ValueError(f"unsupported snapshot format {manifest.get('format')}")
+    return manifest
+
+
+def current_version(directory: str) -> Optional[str]:
+    try:
+        with open(os.path.join(directory, CURRENT_POINTER)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def write_snapshot(
+    path: str,
+    index,
+    metadata,
+    built_at: float,
+    semantic_vectors: Optional[np.ndarray] = None,
+    semantic_built_at: Optional[float] = None
+):
+    """Write an in-memory GrantSearchIndex and its GrantMetadataStore as a snapshot directory"""
+    os.makedirs(path)
+
+    def save(name: str, array: np.ndarray):
+        np.save(os.path.join(path, f'{name}.npy'), array, allow_pickle=False)
+
+    terms = sorted(index.postings)
+    term_offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+    term_offsets[1:] = np.cumsum([len(index.postings[term]) for term in terms])
+    doc_ids = np.empty(term_offsets[-1], dtype=np.int32)
+    impacts = np.empty(term_offsets[-1], dtype=np.float32)
+    for term, start in zip(terms, term_offsets):
+        postings = index.postings[term]
+        doc_ids[start:start + len(postings)] = [doc_id for doc_id, _ in postings]
+        impacts[start:start + len(postings)] = [impact for _, impact in postings]
+    save('terms', np.array(terms, dtype=str))
+    save('term_offsets', term_offsets)
+    save('doc_ids', doc_ids)
+    save('impacts', impacts)
+
+    size = len(index.documents)
+    for name in METADATA_COLUMNS:
+        save(name, getattr(metadata, name)[:size])
+    keys = [''] * size
+    for key, row in metadata.rows.items():
+        keys[row] = key
+    save('keys', np.array(keys, dtype=str))
+    save('object_ids', np.array(list(metadata.object_ids), dtype=str))
+    save('object_rows', np.array(list(metadata.object_ids.values()), dtype=np.int32))
+    if semantic_vectors is not None:
+        save('semantic_vectors', semantic_vectors.astype(np.float32))
+
+    document_offsets = np.zeros(size + 1, dtype=np.int64)
+    with open(os.path.join(path, 'documents.bin'), 'wb') as f:
+        for doc_id, document in enumerate(index.documents):
+            record = encode_document(document)
+            f.write(record)
+            document_offsets[doc_id + 1] = document_offsets[doc_id] + len(record)
+    save('document_offsets', document_offsets)
+
+    manifest = {
+        'format': FORMAT_VERSION,
+        'built_at': built_at,
+        'documents': size,
+        'avg_length': index.avg_length,
+        'field_weights': index.field_weights,
+        'k1': index.k1,
+        'b': index.b,
+        'source_ids': metadata.source_ids,
+        'semantic_built_at': semantic_built_at if semantic_vectors is not None else None
+    }
+    with open(os.path.join(path, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f)
+
+
+def publish_snapshot(directory: str, build, fresh_after: float) -> Optional[str]:
+    """
+    Write a snapshot with build(path) and make it current; returns its version.
+    One builder publishes at a time, and build only runs under the lock: when the
+    published snapshot was built at or after fresh_after it is kept instead.
+    """
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, LOCK_FILE), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            published = current_version(directory)
+            if published is not None:
+                try:
+                    if read_manifest(os.path.join(directory, published))['built_at'] >= fresh_after:
+                        logger.info(f"Index snapshot {published} is already current")
+                        return published
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Replacing unreadable index snapshot {published}: {e}")
+
+            version = f"v{time.time_ns()}"
+            tmp_path = os.path.join(directory, f'.tmp-{version}')
+            try:
+                build(tmp_path)
+                os.rename(tmp_path, os.path.join(directory, version))
+            except BaseException:
+                shutil.rmtree(tmp_path, ignore_errors=True)
+                raise
+
+            pointer_path = os.path.join(directory, f'{CURRENT_POINTER}.tmp')
+            with open(pointer_path, 'w') as f:
+                f.write(version)
+            os.replace(pointer_path, os.path.join(directory, CURRENT_POINTER))
+            logger.info(f"Published index snapshot {version}")
+
+            prune_versions(directory, version)
+            return version
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def prune_versions(directory: str, current: str, keep: int = KEEP_VERSIONS):
+    """Remove old versions; workers still mapping them keep their open files until they swap"""
+    versions = sorted(name for name in os.listdir(directory) if name.startswith('v') and name != current)
+    for name in versions[:max(len(versions) - (keep - 1), 0)]:
+        shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
@@ -0,0 +1,103 @@
+"""
+Aho-Corasick multi-keyword matcher
+Counts every keyword occurrence in a single pass over each text,
+only accepting matches that start and end on word boundaries
+"""
+from collections import deque
+from typing import Callable, List, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from text_analyzer import match_prefix
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton built from a request's keyword list.
+
+    With a normalize function (the analyzer's stemmer), keywords are treated as
+    stemmed terms: the automaton scans for their common prefix and a match counts
+    when the whole word it starts normalizes to the keyword, so 'grant' counts
+    'grants' and 'community' counts 'communities'.
+    """
+
+    def __init__(self, keywords: Iterable[str], normalize: Optional[Callable[[str], str]] = None):
+        self.keywords: List[str] = list(dict.fromkeys(k.lower() for k in keywords if k))
+        self.normalize = normalize
+
+        # Trie transitions, failure links and (keyword index, length) outputs per state
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[Tuple[int, int]]] = [[]]
+
+        for keyword_index, keyword in enumerate(self.keywords):
+            pattern = match_prefix(keyword) if normalize else keyword
+            state = 0
+            for char in pattern:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                state = next_state
+            self.output[state].append((keyword_index, len(pattern)))
+
+        self.build_failure_links()
+
+    def build_failure_links(self):
+        """Breadth-first pass linking each state to its longest proper suffix state"""
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                if self.fail[next_state] == next_state:
+                    self.fail[next_state] = 0
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+    def count(self, text: str) -> List[int]:
+        """Count whole-word occurrences of every keyword in one pass over the text"""
+        counts = [0] * len(self.keywords)
+        if not text or not self.keywords:
+            return counts
+
+        text = text.lower()
+        goto = self.goto
+        fail = self.fail
+        output = self.output
+        keywords = self.keywords
+        normalize = self.normalize
+        text_length = len(text)
+        state = 0
+
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            for keyword_index, length in output[state]:
+                start = position - length + 1
+                if start > 0 and text[start - 1].isalnum():
+                    continue
+                end = position + 1
+                if end < text_length and text[end].isalnum():
+                    if normalize is None:
+                        continue
+                    # Extend to the end of the word
+                    while end < text_length and text[end].isalnum():
+                        end += 1
+                if normalize is not None and normalize(text[start:end]) != keywords[keyword_index]:
+                    continue
+                counts[keyword_index] += 1
+
+        return counts
+
+    def count_batch(self, texts: Iterable[str]) -> np.ndarray:
+        """Count keyword occurrences for many texts as a (texts x keywords) matrix"""
+        return np.array([self.count(text) for text in texts], dtype=np.float32).reshape(-1, len(self.keywords))
@@ -7,13 +7,16 @@ import logging
 from pathlib import Path
 from dotenv import load_dotenv
 import os
-from grant_scraper import GrantWatchScraper, HumanBehaviorSimulator
 from datetime import datetime
 
 # Load environment
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+# Imported after .env is loaded so shared pools are sized from it
+from grant_scraper import GrantWatchScraper, HumanBehaviorSimulator
+from mongo_client import mongo
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -70,6 +73,7 @@ async def test_scraping(num_grants: int = 5, category: str = None):
         
     finally:
         await scraper.close()
+        await mongo.close()
 
 async def run_single_session():
     """Run a single full scraping session"""
@@ -101,6 +105,7 @@ async def run_single_session():
         
     finally:
         await scraper.close()
+        await mongo.close()
 
 async def check_progress():
     """Check current scraping progress"""
@@ -140,6 +145,7 @@ async def check_progress():
         
     finally:
         await scraper.close()
+        await mongo.close()
 
 async def test_human_behavior():
     """Test human behavior simulation"""
@@ -182,6 +188,7 @@ async def reset_daily_counters():
         
     finally:
         await scraper.close()
+        await mongo.close()
 
 def main():
     parser = argparse.ArgumentParser(description='Manual grant scraping utility')
@@ -0,0 +1,95 @@
+"""
+TTL + LRU cache for ranked grant match results
+Keyed on the normalized keyword set, focus area and organization type
+"""
+import time
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[Tuple[str, ...], str, str, Tuple[Optional[float], Optional[float]]]
+
+
+class MatchResultCache:
+    """Bounded cache of ranked candidates with size- and TTL-based eviction"""
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 300):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.entries: 'OrderedDict[CacheKey, Tuple[float, Any]]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(
+        keywords: Iterable[str],
+        focus_area: str = "",
+        org_type: str = "",
+        amounts: Tuple[Optional[float], Optional[float]] = (None, None)
+    ) -> CacheKey:
+        """Normalize a query so equivalent requests share one entry"""
+        return (
+            tuple(sorted({k.strip().lower() for k in keywords if k and k.strip()})),
+            ' '.join((focus_area or '').lower().split()),
+            ' '.join((org_type or '').lower().split()),
+            tuple(None if amount is None else float(amount) for amount in amounts)
+        )
+
+    def get(self, key: CacheKey) -> Optional[Any]:
+        """Return cached grants for a key, or None on a miss or expired entry"""
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, grants = entry
+        if expires_at <= time.monotonic():
+            del self.entries[key]
+            self.evictions += 1
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return grants
+
+    def set(self, key: CacheKey, grants: Any, ttl_seconds: Optional[float] = None):
+        """Store grants for a key, evicting the least recently used entries"""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self.entries[key] = (time.monotonic() + ttl, grants)
+        self.entries.move_to_end(key)
+
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self):
+        """Drop every entry, e.g. after the grants collection changed"""
+        if self.entries:
+            logger.info(f"Invalidating {len(self.entries)} cached match results")
+        self.entries.clear()
+
+    def invalidate_where(self, predicate: Callable[[CacheKey, Any], bool]) -> int:
+        """Drop the entries a predicate(key, grants) selects; returns how many were dropped"""
+        stale = [key for key, (_, grants) in self.entries.items() if predicate(key, grants)]
+        for key in stale:
+            del self.entries[key]
+        if stale:
+            logger.info(f"Invalidating {len(stale)} of {len(self.entries) + len(stale)} cached match results")
+        return len(stale)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters"""
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self.entries),
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': (self.hits / lookups) if lookups else 0
+        }
@@ -0,0 +1,205 @@
+"""
+Shared MongoDB connection manager
+One Motor client (and connection pool) per process for every module, with
+pool size, timeouts and wire compression from the environment, opened at
+startup and closed at shutdown, plus pool metrics that show exhaustion
+"""
+import os
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """
+    Connection pool counters fed by PyMongo's pool events. Events arrive on the
+    driver's worker threads; a checkout's start and finish happen on the same one.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.open_connections = 0
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.checkouts = 0
+        self.checkout_failures: Dict[str, int] = {}
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.pools_cleared = 0
+
+    def connection_check_out_started(self, event):
+        self.local.started = time.monotonic()
+        with self.lock:
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+
+    def connection_checked_out(self, event):
+        wait = time.monotonic() - getattr(self.local, 'started', time.monotonic())
+        with self.lock:
+            self.waiting -= 1
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+            self.checkouts += 1
+            self.total_wait_seconds += wait
+            self.max_wait_seconds = max(self.max_wait_seconds, wait)
+
+    def connection_check_out_failed(self, event):
+        # reason 'timeout' means the pool was exhausted for waitQueueTimeoutMS
+        with self.lock:
+            self.waiting -= 1
+            self.checkout_failures[event.reason] = self.checkout_failures.get(event.reason, 0) + 1
+
+    def connection_checked_in(self, event):
+        with self.lock:
+            self.checked_out -= 1
+
+    def connection_created(self, event):
+        with self.lock:
+            self.open_connections += 1
+
+    def connection_closed(self, event):
+        with self.lock:
+            self.open_connections -= 1
+
+    def pool_cleared(self, event):
+        with self.lock:
+            self.pools_cleared += 1
+
+    # Remaining pool events carry nothing the counters need
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                'open_connections': self.open_connections,
+                'checked_out': self.checked_out,
+                'max_checked_out': self.max_checked_out,
+                'waiting': self.waiting,
+                'max_waiting': self.max_waiting,
+                'checkouts': self.checkouts,
+                'checkout_failures': dict(self.checkout_failures),
+                'avg_wait_ms': (self.total_wait_seconds / self.checkouts * 1000) if self.checkouts else 0,
+                'max_wait_ms': self.max_wait_seconds * 1000,
+                'pools_cleared': self.pools_cleared
+            }
+
+
+class MongoConnectionManager:
+    """Owns the application-wide Motor client and hands out database handles"""
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        db_name: Optional[str] = None,
+        max_pool_size: int = 50,
+        min_pool_size: int = 0,
+        max_idle_seconds: float = 300,
+        connect_timeout: float = 5,
+        server_selection_timeout: float = 10,
+        wait_queue_timeout: float = 5,
+        compressors: str = ''
+    ):
+        self.url = url
+        self.db_name = db_name
+        self.max_pool_size = max_pool_size
+        self.min_pool_size = min_pool_size
+        self.max_idle_seconds = max_idle_seconds
+        self.connect_timeout = connect_timeout
+        self.server_selection_timeout = server_selection_timeout
+        self.wait_queue_timeout = wait_queue_timeout
+        self.compressors = compressors
+        self.metrics = PoolMetrics()
+        self._clients: Dict[str, AsyncIOMotorClient] = {}
+
+    @classmethod
+    def from_env(cls) -> 'MongoConnectionManager':
+        return cls(
+            url=os.environ.get('MONGO_URL'),
+            db_name=os.environ.get('DB_NAME'),
+            max_pool_size=int(os.environ.get('MONGO_MAX_POOL_SIZE', 50)),
+            min_pool_size=int(os.environ.get('MONGO_MIN_POOL_SIZE', 0)),
+            max_idle_seconds=float(os.environ.get('MONGO_MAX_IDLE_SECONDS', 300)),
+            connect_timeout=float(os.environ.get('MONGO_CONNECT_TIMEOUT_SECONDS', 5)),
+            server_selection_timeout=float(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_SECONDS', 10)),
+            wait_queue_timeout=float(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_SECONDS', 5)),
+            compressors=os.environ.get('MONGO_COMPRESSORS', '')
+        )
+
+    def client(self, url: Optional[str] = None) -> AsyncIOMotorClient:
+        """Get the shared client for a URL (default MONGO_URL), creating it on first use"""
+        url = url or self.url or os.environ.get('MONGO_URL')
+        if not url:
+            raise RuntimeError("MONGO_URL is not configured")
+
+        # Creation never awaits, so concurrent first requests cannot race into two pools
+        client = self._clients.get(url)
+        if client is None:
+            options = {
+                'maxPoolSize': self.max_pool_size,
+                'minPoolSize': self.min_pool_size,
+                'maxIdleTimeMS': int(self.max_idle_seconds * 1000),
+                'connectTimeoutMS': int(self.connect_timeout * 1000),
+                'serverSelectionTimeoutMS': int(self.server_selection_timeout * 1000),
+                'waitQueueTimeoutMS': int(self.wait_queue_timeout * 1000),
+                'event_listeners': [self.metrics]
+            }
+            if self.compressors:
+                options['compressors'] = self.compressors
+            client = AsyncIOMotorClient(url, **options)
+            self._clients[url] = client
+        return client
+
+    def database(self, name: Optional[str] = None, url: Optional[str] = None) -> AsyncIOMotorDatabase:
+        """Handle of a database (default DB_NAME) on the shared client"""
+        name = name or self.db_name or os.environ.get('DB_NAME')
+        if not name:
+            raise RuntimeError("DB_NAME is not configured")
+        return self.client(url)[name]
+
+    async def start(self):
+        """Open the pool by running a ping"""
+        await self.client().admin.command('ping')
+        logger.info(
+            f"MongoDB pool started (max_pool_size={self.max_pool_size}, "
+            f"compressors={self.compressors or 'none'})"
+        )
+
+    async def close(self):
+        """Close every client and its connections"""
+        for client in self._clients.values():
+            client.close()
+        self._clients.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get pool configuration and usage"""
+        return {
+            'open': bool(self._clients),
+            'max_pool_size': self.max_pool_size,
+            'min_pool_size': self.min_pool_size,
+            'wait_queue_timeout_seconds': self.wait_queue_timeout,
+            'compressors': self.compressors or None,
+            **self.metrics.snapshot()
+        }
+
+
+# Shared by every module in this process
+mongo = MongoConnectionManager.from_env()
@@ -2,7 +2,6 @@
 Script to populate the grants database with opportunities from the PDF
 """
 import asyncio
-from motor.motor_asyncio import AsyncIOMotorClient
 from datetime import datetime
 import os
 from dotenv import load_dotenv
@@ -11,6 +10,10 @@ from pathlib import Path
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+# Imported after .env is loaded so shared pools are sized from it
+from grant_normalization import normalize_grant
+from mongo_client import mongo
+
 # Grant data extracted from PDF
 GRANTS_DATA = [
     {
@@ -643,8 +646,7 @@ async def populate_database():
         mongo_url = os.environ['MONGO_URL']
         db_name = os.environ['DB_NAME']
         
-        client = AsyncIOMotorClient(mongo_url)
-        db = client[db_name]
+        db = mongo.database(db_name, mongo_url)
         grants_collection = db.grants
         
         print(f"Connected to database: {db_name}")
@@ -658,6 +660,7 @@ async def populate_database():
             grant['source'] = 'Black Tech Saturdays PDF'
             grant['date_added'] = datetime.utcnow()
             grant['is_active'] = True
+            normalize_grant(grant)
         
         # Insert all grants
         result = await grants_collection.insert_many(GRANTS_DATA)
@@ -667,11 +670,17 @@ async def populate_database():
         await grants_collection.create_index([('title', 'text'), ('description', 'text'), ('focus_areas', 'text')])
         print("Created text index for search")
         
+        await grants_collection.create_index([('is_active', 1), ('deadline_at', 1)])
+        print("Created deadline index")
+        
+        await grants_collection.create_index([('amount_min', 1), ('amount_max', 1)])
+        print("Created funding amount index")
+        
         # Display summary
         total = await grants_collection.count_documents({})
         print(f"\nTotal grants in database: {total}")
         
-        client.close()
+        await mongo.close()
         print("Database connection closed")
         
     except Exception as e:
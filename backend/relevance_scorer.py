@@ -0,0 +1,130 @@
+"""
+Vectorized TF-IDF relevance scoring for grant candidates
+Keeps a cached sparse document-term row per indexed grant and scores a whole
+candidate pool against the query keywords with a single sparse product.
+Ad-hoc candidates (e.g. USAspending results) are counted with a per-request
+Aho-Corasick automaton instead of being tokenized into the cache.
+"""
+import logging
+from collections import OrderedDict
+from typing import List, Dict, Any, Iterable, Tuple
+
+import numpy as np
+
+from text_analyzer import analyzer, stem
+from keyword_matcher import KeywordAutomaton
+
+logger = logging.getLogger(__name__)
+
+
+class RelevanceScorer:
+    """TF-IDF scorer backed by a cached sparse document-term matrix"""
+
+    def __init__(self, max_cached_documents: int = 20000, max_vocabulary: int = 200000):
+        self.max_cached_documents = max_cached_documents
+        self.max_vocabulary = max_vocabulary
+        self.vocabulary: Dict[str, int] = {}
+        self.rows: 'OrderedDict[Tuple[str, str], Tuple[np.ndarray, np.ndarray]]' = OrderedDict()
+
+    def clear(self):
+        """Drop all cached rows and the vocabulary"""
+        self.vocabulary = {}
+        self.rows.clear()
+
+    def term_id(self, term: str) -> int:
+        term_id = self.vocabulary.get(term)
+        if term_id is None:
+            term_id = len(self.vocabulary)
+            self.vocabulary[term] = term_id
+        return term_id
+
+    def document_key(self, grant: Dict[str, Any]) -> Tuple[str, str]:
+        return (grant.get('title', ''), grant.get('description', ''))
+
+    def document_text(self, grant: Dict[str, Any]) -> str:
+        return f"{grant.get('title', '')} {grant.get('description', '')}"
+
+    def add_documents(self, grants: Iterable[Dict[str, Any]]):
+        """Precompute and cache the sparse rows of indexed grants"""
+        for grant in grants:
+            self.document_row(grant)
+
+    def document_row(self, grant: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the sparse (term ids, term counts) row for a grant, tokenizing it only once"""
+        key = self.document_key(grant)
+        row = self.rows.get(key)
+        if row is not None:
+            self.rows.move_to_end(key)
+            return row
+
+        counts: Dict[str, int] = {}
+        for term in analyzer.analyze(self.document_text(grant)):
+            counts[term] = counts.get(term, 0) + 1
+
+        row = (
+            np.fromiter((self.term_id(term) for term in counts), dtype=np.int32, count=len(counts)),
+            np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+        )
+
+        self.rows[key] = row
+        if len(self.rows) > self.max_cached_documents:
+            self.rows.popitem(last=False)
+        return row
+
+    def score(self, grants: List[Dict[str, Any]], keywords: List[str]) -> np.ndarray:
+        """Return one TF-IDF score per grant for the query keywords"""
+        num_grants = len(grants)
+        keywords = list(dict.fromkeys(keywords))
+        if not num_grants or not keywords:
+            return np.zeros(num_grants, dtype=np.float32)
+
+        # Reset before assembling so every row shares one vocabulary
+        if len(self.vocabulary) >= self.max_vocabulary:
+            logger.info("Relevance scorer vocabulary full, resetting cached rows")
+            self.clear()
+
+        keyword_ids = np.array([self.term_id(keyword) for keyword in keywords], dtype=np.int32)
+
+        # Cached rows for indexed grants, automaton counts for everything else
+        row_ids, term_ids, term_counts = [], [], []
+        adhoc_positions = []
+        for position, grant in enumerate(grants):
+            key = self.document_key(grant)
+            row = self.rows.get(key)
+            if row is None:
+                adhoc_positions.append(position)
+                continue
+            self.rows.move_to_end(key)
+            indices, counts = row
+            row_ids.append(np.full(len(indices), position, dtype=np.int64))
+            term_ids.append(indices)
+            term_counts.append(counts)
+
+        if adhoc_positions:
+            automaton = KeywordAutomaton(keywords, normalize=stem)
+            matrix = automaton.count_batch(self.document_text(grants[p]) for p in adhoc_positions)
+            rows, columns = np.nonzero(matrix)
+            row_ids.append(np.asarray(adhoc_positions, dtype=np.int64)[rows])
+            term_ids.append(keyword_ids[columns])
+            term_counts.append(matrix[rows, columns])
+
+        indices = np.concatenate(term_ids) if term_ids else np.zeros(0, dtype=np.int32)
+        if not len(indices):
+            return np.zeros(num_grants, dtype=np.float32)
+        counts = np.concatenate(term_counts)
+        row_ids = np.concatenate(row_ids)
+
+        # Query vector over the vocabulary
+        in_query = np.zeros(len(self.vocabulary), dtype=bool)
+        in_query[keyword_ids] = True
+
+        hits = in_query[indices]
+        hit_terms = indices[hits]
+
+        # Smoothed IDF over the candidate pool
+        df = np.bincount(hit_terms, minlength=len(self.vocabulary))
+        idf = np.log((1 + num_grants) / (1 + df)) + 1
+
+        # Sublinear TF times IDF, summed per row
+        weights = (1 + np.log(counts[hits])) * idf[hit_terms]
+        return np.bincount(row_ids[hits], weights=weights, minlength=num_grants)
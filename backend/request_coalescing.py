@@ -0,0 +1,44 @@
+"""
+Single-flight request coalescing
+Concurrent callers with the same key await one shared in-flight call
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls for the same key"""
+
+    def __init__(self):
+        self.calls: Dict[Hashable, asyncio.Task] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn once per key at a time and share its result with concurrent callers"""
+        task = self.calls.get(key)
+        if task is None:
+            # Run as a task so one caller disconnecting does not cancel the others
+            task = asyncio.ensure_future(fn())
+            self.calls[key] = task
+            task.add_done_callback(lambda done: self.forget(key, done))
+            self.executed += 1
+        else:
+            self.coalesced += 1
+
+        return await asyncio.shield(task)
+
+    def forget(self, key: Hashable, task: asyncio.Task):
+        if self.calls.get(key) is task:
+            del self.calls[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """Get coalescing counters"""
+        return {
+            'in_flight': len(self.calls),
+            'executed': self.executed,
+            'coalesced': self.coalesced
+        }
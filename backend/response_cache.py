@@ -0,0 +1,188 @@
+"""
+Persistent stale-while-revalidate response cache backed by SQLite
+Fresh entries are served directly, stale entries are served immediately
+while a background task refreshes them, and the file is kept under a size bound.
+The cache is best-effort: when the file cannot be read or written, responses
+come straight from the loader.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class PersistentResponseCache:
+    """Disk-backed cache of JSON responses keyed on the normalized request payload"""
+
+    def __init__(
+        self,
+        path: str,
+        fresh_seconds: float = 86400,
+        stale_seconds: float = 7 * 86400,
+        max_bytes: int = 50 * 1024 * 1024
+    ):
+        self.path = path
+        self.fresh_seconds = fresh_seconds
+        self.stale_seconds = stale_seconds
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        # Loads of missed and stale keys, kept until their response is written
+        self.loads: Dict[str, asyncio.Task] = {}
+        self.conn: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def connection(self) -> sqlite3.Connection:
+        if self.conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            try:
+                self.init_schema(conn)
+            except sqlite3.Error:
+                conn.close()
+                raise
+            self.conn = conn
+        return self.conn
+
+    @staticmethod
+    def init_schema(conn: sqlite3.Connection):
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                body TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)')
+
+    @staticmethod
+    def make_key(payload: Any) -> str:
+        """Hash a request payload, normalizing case, whitespace and key order"""
+        def normalize(value):
+            if isinstance(value, str):
+                return ' '.join(value.lower().split())
+            if isinstance(value, dict):
+                return {k: normalize(v) for k, v in value.items()}
+            if isinstance(value, (list, tuple)):
+                return [normalize(v) for v in value]
+            return value
+
+        encoded = json.dumps(normalize(payload), sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(encoded.encode()).hexdigest()
+
+    def read(self, key: str) -> Optional[Tuple[Any, float]]:
+        """Return (value, age in seconds) for a key, or None"""
+        with self.lock:
+            conn = self.connection()
+            row = conn.execute('SELECT body, fetched_at FROM responses WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (time.time(), key))
+        body, fetched_at = row
+        return json.loads(body), time.time() - fetched_at
+
+    def write(self, key: str, value: Any):
+        """Store a value and evict least recently used entries past the size bound"""
+        body = json.dumps(value, separators=(',', ':'))
+        now = time.time()
+        with self.lock:
+            conn = self.connection()
+            conn.execute(
+                'INSERT OR REPLACE INTO responses (key, body, size, fetched_at, accessed_at) VALUES (?, ?, ?, ?, ?)',
+                (key, body, len(body), now, now)
+            )
+            total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+            if total > self.max_bytes:
+                self.evict(conn, total - self.max_bytes)
+
+    def evict(self, conn: sqlite3.Connection, excess: int):
+        freed = 0
+        keys = []
+        for key, size in conn.execute('SELECT key, size FROM responses ORDER BY accessed_at'):
+            keys.append(key)
+            freed += size
+            if freed >= excess:
+                break
+        conn.executemany('DELETE FROM responses WHERE key = ?', [(k,) for k in keys])
+        logger.info(f"Evicted {len(keys)} cached responses ({freed} bytes)")
+
+    async def fetch(self, payload: Any, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Serve a cached response for the payload, loading or revalidating it as needed"""
+        key = self.make_key(payload)
+        try:
+            cached = await asyncio.to_thread(self.read, key)
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning(f"Response cache read failed, loading directly: {e}")
+            cached = None
+
+        if cached is not None:
+            value, age = cached
+            if age < self.fresh_seconds:
+                self.hits += 1
+                return value
+            if age < self.stale_seconds:
+                self.stale_hits += 1
+                if key not in self.loads:
+                    self.start_load(key, loader).add_done_callback(self.log_refresh_failure)
+                return value
+
+        self.misses += 1
+        task = self.loads.get(key) or self.start_load(key, loader)
+        # A caller giving up (e.g. a source deadline) does not cancel the load,
+        # so a slow upstream response still fills the cache
+        return await asyncio.shield(task)
+
+    def start_load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        task = asyncio.create_task(self.load(key, loader))
+        self.loads[key] = task
+        task.add_done_callback(lambda _: self.finish_load(key, task))
+        return task
+
+    def finish_load(self, key: str, task: asyncio.Task):
+        self.loads.pop(key, None)
+        # Mark the error retrieved: every caller of an abandoned miss may be gone
+        if not task.cancelled():
+            task.exception()
+
+    async def load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Call the loader and store its response"""
+        value = await loader()
+        try:
+            await asyncio.to_thread(self.write, key, value)
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning(f"Response cache write failed: {e}")
+        return value
+
+    @staticmethod
+    def log_refresh_failure(task: asyncio.Task):
+        """Background refreshes have no caller to see their errors"""
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Background refresh failed, keeping stale response: {task.exception()}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters"""
+        return {
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'errors': self.errors,
+            'loading': len(self.loads)
+        }
+
+    def close(self):
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
@@ -11,9 +11,8 @@ import os
 from enum import Enum
 import json
 
-# Import scraping modules
-from grant_scraper import GrantWatchScraper
-from scraping_scheduler import ScrapingScheduler
+# The scraping stack (selenium, undetected_chromedriver, fake_useragent) is
+# imported on first use so the API starts without it
 
 # Create API router
 scraping_router = APIRouter(prefix="/scraping", tags=["scraping"])
@@ -21,6 +20,7 @@ scraping_router = APIRouter(prefix="/scraping", tags=["scraping"])
 # Global scheduler instance
 scheduler_instance = None
 scraper_instance = None
+grants_changed_callbacks = []
 scraping_status = {
     "scheduler_running": False,
     "session_active": False,
@@ -57,12 +57,25 @@ async def get_scraper_instance():
     """Get or create scraper instance"""
     global scraper_instance
     if not scraper_instance:
+        from grant_scraper import GrantWatchScraper
+        
         mongo_url = os.environ.get('MONGO_URL')
         db_name = os.environ.get('DB_NAME')
         scraper_instance = GrantWatchScraper(mongo_url, db_name)
         await scraper_instance.initialize()
     return scraper_instance
 
+async def notify_grants_changed(grants=None):
+    """
+    Let registered listeners (e.g. the grant matcher) know the grants collection changed.
+    grants lists the upserted documents when known; None means anything may have changed.
+    """
+    for callback in grants_changed_callbacks:
+        try:
+            await callback(grants)
+        except Exception as e:
+            print(f"Grants changed callback error: {e}")
+
 # API Endpoints
 
 @scraping_router.get("/status")
@@ -138,6 +151,7 @@ async def start_manual_session(
             
             # Run the session
             await scraper.run_scraping_session()
+            await notify_grants_changed(scraper.last_saved_grants)
             
             scraping_status["last_session"] = datetime.now().isoformat()
             
@@ -191,6 +205,8 @@ async def control_scheduler(
         async def run_scheduler():
             global scheduler_instance
             try:
+                from scraping_scheduler import ScrapingScheduler
+                
                 scheduler_instance = ScrapingScheduler()
                 scraping_status["scheduler_running"] = True
                 await scheduler_instance.run()
@@ -414,6 +430,9 @@ async def remove_duplicate_grants() -> Dict[str, Any]:
         result = await scraper.db.grants.delete_many({'_id': {'$in': ids_to_remove}})
         removed_count += result.deleted_count
     
+    if removed_count:
+        await notify_grants_changed()
+    
     return {
         "status": "duplicates_removed",
         "removed_count": removed_count,
@@ -421,8 +440,11 @@ async def remove_duplicate_grants() -> Dict[str, Any]:
     }
 
 # Integration with main FastAPI app
-def register_scraping_routes(app):
+def register_scraping_routes(app, on_grants_changed=None):
     """
-    Register scraping routes with the main FastAPI app
+    Register scraping routes with the main FastAPI app.
+    on_grants_changed(grants) is awaited after scraping routes modify the grants collection.
     """
+    if on_grants_changed:
+        grants_changed_callbacks.append(on_grants_changed)
     app.include_router(scraping_router, prefix="/api")
@@ -10,12 +10,14 @@ from pathlib import Path
 from dotenv import load_dotenv
 import schedule
 import time as time_module
-from grant_scraper import GrantWatchScraper
 
 # Load environment
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+# Imported after .env is loaded so shared pools are sized from it
+from grant_scraper import GrantWatchScraper
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -0,0 +1,308 @@
+"""
+Latent Semantic Index for grant matching
+A truncated SVD (LSA) projection of the grants' TF-IDF matrix, built offline
+with NumPy and persisted with the grant vectors. Queries and new grants are
+folded into the same latent space, so a summary about literacy tutoring lands
+near education grants even when they share no keywords.
+"""
+import logging
+import os
+import time
+from collections import Counter, OrderedDict
+from typing import List, Dict, Any, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from text_analyzer import analyzer
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+
+def document_text(document: Dict[str, Any]) -> str:
+    """Text a grant is embedded from; the title counts twice"""
+    focus_areas = document.get('focus_areas') or []
+    if isinstance(focus_areas, (list, tuple)):
+        focus_areas = ' '.join(str(area) for area in focus_areas)
+    title = document.get('title') or ''
+    return f"{title} {title} {focus_areas} {document.get('description') or ''}"
+
+
+class SparseRows:
+    """Minimal CSR matrix with the two products the randomized SVD needs"""
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, data: np.ndarray, shape: Tuple[int, int]):
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.shape = shape
+
+    def dot(self, dense: np.ndarray) -> np.ndarray:
+        """self @ dense"""
+        out = np.zeros((self.shape[0], dense.shape[1]), dtype=np.float64)
+        if not len(self.data):
+            return out
+        products = self.data[:, None] * dense[self.indices]
+        starts = self.indptr[:-1]
+        nonempty = starts < self.indptr[1:]
+        out[nonempty] = np.add.reduceat(products, starts[nonempty], axis=0)
+        return out
+
+    def transpose(self) -> 'SparseRows':
+        """CSR of the transposed matrix"""
+        rows = np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+        order = np.argsort(self.indices, kind='stable')
+        counts = np.bincount(self.indices, minlength=self.shape[1])
+        indptr = np.concatenate(([0], np.cumsum(counts)))
+        return SparseRows(indptr, rows[order], self.data[order], (self.shape[1], self.shape[0]))
+
+
+def randomized_svd(
+    matrix: SparseRows,
+    dimensions: int,
+    oversample: int = 10,
+    power_iterations: int = 4,
+    seed: int = 0
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Top singular values and right singular vectors (terms x dimensions) of a sparse matrix"""
+    rng = np.random.default_rng(seed)
+    transposed = matrix.transpose()
+    rank = min(dimensions + oversample, *matrix.shape)
+
+    sketch = matrix.dot(rng.standard_normal((matrix.shape[1], rank)))
+    for _ in range(power_iterations):
+        basis, _ = np.linalg.qr(sketch)
+        term_basis, _ = np.linalg.qr(transposed.dot(basis))
+        sketch = matrix.dot(term_basis)
+    basis, _ = np.linalg.qr(sketch)
+
+    # Small dense SVD of the projected matrix (rank x terms)
+    _, singular_values, right = np.linalg.svd(transposed.dot(basis).T, full_matrices=False)
+    return singular_values[:dimensions], right[:dimensions].T
+
+
+class SemanticIndex:
+    """
+    LSA model (vocabulary, idf, term components) plus unit-length grant vectors.
+    Vectors are stored per grant key; GrantMatcher aligns them with its search
+    index document ids and folds in grants the model was not built with.
+    """
+
+    def __init__(
+        self,
+        terms: Dict[str, int],
+        idf: np.ndarray,
+        components: np.ndarray,
+        stored_vectors: Optional[Dict[str, np.ndarray]] = None,
+        built_at: float = 0.0,
+        max_cached_documents: int = 20000
+    ):
+        self.terms = terms
+        self.idf = idf.astype(np.float32)
+        self.components = components.astype(np.float32)
+        self.stored_vectors = stored_vectors or {}
+        self.built_at = built_at
+
+        # Vectors aligned with the search index's document ids
+        self.vectors = np.zeros((0, self.dimensions), dtype=np.float32)
+        self.size = 0
+
+        # Folded-in vectors of ad-hoc candidates (catalog, USAspending)
+        self.max_cached_documents = max_cached_documents
+        self.cache: 'OrderedDict[Tuple[str, str], np.ndarray]' = OrderedDict()
+
+    @property
+    def dimensions(self) -> int:
+        return self.components.shape[1]
+
+    @staticmethod
+    def term_counts(text: str) -> Counter:
+        return Counter(analyzer.analyze(text))
+
+    @classmethod
+    def fit(
+        cls,
+        documents: Sequence[Dict[str, Any]],
+        keys: Sequence[Optional[str]],
+        dimensions: int = 100,
+        min_df: int = 1
+    ) -> 'SemanticIndex':
+        """Build the LSA projection of a corpus (the offline step)"""
+        started = time.monotonic()
+        counts = [cls.term_counts(document_text(document)) for document in documents]
+
+        df = Counter()
+        for document_counts in counts:
+            df.update(document_counts.keys())
+        vocabulary = sorted(term for term, frequency in df.items() if frequency >= min_df)
+        terms = {term: column for column, term in enumerate(vocabulary)}
+
+        num_docs = len(documents)
+        idf = np.array([np.log((1 + num_docs) / (1 + df[term])) + 1 for term in vocabulary], dtype=np.float64)
+
+        # Sublinear tf-idf rows, L2-normalized
+        indptr, indices, data = [0], [], []
+        for document_counts in counts:
+            columns = [terms[term] for term in document_counts if term in terms]
+            weights = np.array(
+                [(1 + np.log(document_counts[term])) for term in document_counts if term in terms],
+                dtype=np.float64
+            ) * idf[columns]
+            norm = np.linalg.norm(weights)
+            indices.extend(columns)
+            data.extend((weights / norm if norm else weights).tolist())
+            indptr.append(len(indices))
+
+        matrix = SparseRows(
+            np.array(indptr, dtype=np.int64),
+            np.array(indices, dtype=np.int64),
+            np.array(data, dtype=np.float64),
+            (num_docs, len(vocabulary))
+        )
+        dimensions = max(1, min(dimensions, num_docs - 1, len(vocabulary) - 1))
+        _, components = randomized_svd(matrix, dimensions)
+
+        index = cls(terms, idf, components, built_at=time.time())
+        vectors = index.normalize(matrix.dot(components))
+        index.stored_vectors = {key: vector for key, vector in zip(keys, vectors) if key is not None}
+        logger.info(
+            f"Built semantic index: {num_docs} documents, {len(vocabulary)} terms, "
+            f"{index.dimensions} dimensions in {time.monotonic() - started:.2f}s"
+        )
+        return index
+
+    @staticmethod
+    def normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return (vectors / np.where(norms == 0, 1, norms)).astype(np.float32)
+
+    def embed(self, text: str) -> np.ndarray:
+        """Fold a piece of text into the latent space as a unit vector"""
+        document_counts = self.term_counts(text)
+        columns = [self.terms[term] for term in document_counts if term in self.terms]
+        if not columns:
+            return np.zeros(self.dimensions, dtype=np.float32)
+        weights = np.array(
+            [(1 + np.log(document_counts[term])) for term in document_counts if term in self.terms],
+            dtype=np.float32
+        ) * self.idf[columns]
+        return self.normalize(weights @ self.components[columns])
+
+    def embed_query(self, keywords: Iterable[str]) -> np.ndarray:
+        return self.embed(' '.join(keywords))
+
+    def document_vector(self, document: Dict[str, Any]) -> np.ndarray:
+        """Folded-in vector of an ad-hoc grant, cached by title and description"""
+        key = (document.get('title', ''), document.get('description', ''))
+        vector = self.cache.get(key)
+        if vector is None:
+            vector = self.embed(document_text(document))
+            self.cache[key] = vector
+            if len(self.cache) > self.max_cached_documents:
+                self.cache.popitem(last=False)
+        else:
+            self.cache.move_to_end(key)
+        return vector
+
+    def fold_in(self, documents: Iterable[Dict[str, Any]], keys: Iterable[Optional[str]]) -> int:
+        """Add or refresh stored vectors of grants without refitting the model"""
+        count = 0
+        for document, key in zip(documents, keys):
+            if key is not None:
+                self.stored_vectors[key] = self.embed(document_text(document))
+                count += 1
+        return count
+
+    def align(self, documents: Sequence[Dict[str, Any]], keys: Sequence[Optional[str]]):
+        """Set the aligned vectors for the search index documents, reusing stored ones"""
+        self.vectors = np.zeros((max(len(documents), 1), self.dimensions), dtype=np.float32)
+        self.size = 0
+        folded = 0
+        for document, key in zip(documents, keys):
+            stored = self.stored_vectors.get(key) if key is not None else None
+            if stored is None:
+                folded += 1
+            self.upsert(self.size, document, key, stored)
+        logger.info(f"Aligned semantic vectors: {self.size} grants, {folded} folded in")
+
+    def vectors_for(self, documents: Sequence[Dict[str, Any]], keys: Sequence[Optional[str]]) -> np.ndarray:
+        """Vectors of index documents, stored ones where available, leaving the index untouched"""
+        vectors = np.zeros((len(documents), self.dimensions), dtype=np.float32)
+        for row, (document, key) in enumerate(zip(documents, keys)):
+            stored = self.stored_vectors.get(key) if key is not None else None
+            vectors[row] = stored if stored is not None else self.embed(document_text(document))
+        return vectors
+
+    def adopt(self, vectors: np.ndarray):
+        """Use precomputed aligned vectors, e.g. the memory-mapped ones of an index snapshot"""
+        self.vectors = vectors
+        self.size = len(vectors)
+
+    def upsert(self, row: int, document: Dict[str, Any], key: Optional[str] = None, vector: Optional[np.ndarray] = None):
+        """Set the vector of an index document (appending when row is new), folding it in if needed"""
+        if vector is None:
+            vector = self.embed(document_text(document))
+            if key is not None:
+                self.stored_vectors[key] = vector
+        self.cache[(document.get('title', ''), document.get('description', ''))] = vector
+        if row >= len(self.vectors):
+            grown = np.zeros((max(row + 1, 2 * len(self.vectors)), self.dimensions), dtype=np.float32)
+            grown[:self.size] = self.vectors[:self.size]
+            self.vectors = grown
+        self.vectors[row] = vector
+        self.size = max(self.size, row + 1)
+
+    def search(self, query: np.ndarray, k: int = 20, mask: Optional[np.ndarray] = None, min_score: float = 0.0) -> List[Tuple[int, float]]:
+        """Top-k (row, cosine) pairs by dense dot product over the aligned vectors"""
+        if not self.size or not query.any():
+            return []
+        scores = self.vectors[:self.size] @ query
+        if mask is not None:
+            scores = np.where(mask[:self.size], scores, -np.inf)
+        k = min(k, self.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(int(row), float(scores[row])) for row in top if scores[row] > min_score]
+
+    def similarities(self, documents: Sequence[Dict[str, Any]], query: np.ndarray) -> np.ndarray:
+        """Cosine similarity of each candidate grant to the query"""
+        if not documents or not query.any():
+            return np.zeros(len(documents), dtype=np.float32)
+        return np.stack([self.document_vector(document) for document in documents]) @ query
+
+    def save(self, path: str):
+        """Persist the model and grant vectors, replacing any previous file atomically"""
+        keys = list(self.stored_vectors)
+        vectors = (
+            np.stack([self.stored_vectors[key] for key in keys])
+            if keys else np.zeros((0, self.dimensions), dtype=np.float32)
+        )
+        vocabulary = sorted(self.terms, key=self.terms.get)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f,
+                version=np.array(FORMAT_VERSION),
+                built_at=np.array(self.built_at),
+                terms=np.array(vocabulary, dtype=str),
+                idf=self.idf,
+                components=self.components,
+                keys=np.array(keys, dtype=str),
+                vectors=vectors
+            )
+        os.replace(tmp_path, path)
+        logger.info(f"Saved semantic index to {path}: {len(keys)} grant vectors")
+
+    @classmethod
+    def load(cls, path: str) -> Optional['SemanticIndex']:
+        """Load a persisted index, or None when there is none (or it is from another format version)"""
+        if not os.path.exists(path):
+            return None
+        with np.load(path, allow_pickle=False) as data:
+            if int(data['version']) != FORMAT_VERSION:
+                logger.warning(f"Ignoring semantic index {path}: format version {int(data['version'])}")
+                return None
+            terms = {str(term): column for column, term in enumerate(data['terms'])}
+            stored_vectors = {str(key): vector for key, vector in zip(data['keys'], data['vectors'])}
+            return cls(terms, data['idf'], data['components'], stored_vectors, float(data['built_at']))
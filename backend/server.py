@@ -1,60 +1,56 @@
 from fastapi import FastAPI, APIRouter, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
 import os
 import logging
 import asyncio
+import json
 from pathlib import Path
-from pydantic import BaseModel, Field, EmailStr, ConfigDict
-from typing import List, Optional
+from pydantic import BaseModel, Field, EmailStr, ConfigDict, model_validator
+from typing import Any, Awaitable, Dict, List, Optional
 import uuid
+import time
 from datetime import datetime, timezone
-import stripe
+
+# Loaded before the custom modules so their pools are sized from .env
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
 
 # Import custom modules
 from grant_matcher import GrantMatcher
+from grant_watcher import GrantChangeWatcher
+from grant_normalization import AmountRange
 from database import Database
 from airtable_webhook import send_to_airtable
+from http_client import http_client
+from mongo_client import mongo
+from submission_buffer import SubmissionBuffer
 from scraping_api import register_scraping_routes
 
-ROOT_DIR = Path(__file__).parent
-load_dotenv(ROOT_DIR / '.env')
-
-# MongoDB connection
+# MongoDB connection: one shared pool for the whole backend
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db_client = client[os.environ['DB_NAME']]
+db_client = mongo.database(os.environ['DB_NAME'], mongo_url)
 
 # Initialize services
 grant_matcher = GrantMatcher(mongo_url, os.environ['DB_NAME'])
 database = Database(mongo_url, os.environ['DB_NAME'])
+submission_buffer = SubmissionBuffer.from_env(database)
 
-# Stripe configuration
-stripe.api_key = os.environ.get('STRIPE_SECRET_KEY', '')
+# Stripe configuration (the stripe package is imported by the checkout route)
+STRIPE_SECRET_KEY = os.environ.get('STRIPE_SECRET_KEY', '')
 STRIPE_PRICE_ID = os.environ.get('STRIPE_PRICE_ID', 'price_1234')  # Set your price ID
 FRONTEND_URL = os.environ.get('FRONTEND_URL', 'https://scraper-suite.preview.emergentagent.com')
 
 # Airtable webhook
 AIRTABLE_WEBHOOK_URL = os.environ.get('AIRTABLE_WEBHOOK_URL', '')
 
-# Create the main app without a prefix
-app = FastAPI()
+# Startup warm-up steps give up after this long rather than stall the worker
+WARM_UP_TIMEOUT_SECONDS = float(os.environ.get('WARM_UP_TIMEOUT_SECONDS', 10))
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
-# Configure CORS BEFORE defining routes
-# This MUST come before route definitions to work properly
-app.add_middleware(
-    CORSMiddleware,
-    allow_credentials=True,
-    allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
 # Define Models
 class StatusCheck(BaseModel):
     model_config = ConfigDict(extra="ignore")  # Ignore MongoDB's _id field
@@ -71,6 +67,23 @@ class GrantMatchRequest(BaseModel):
     organization_type: str
     focus_area: str
     email: EmailStr
+    # Optional funding bounds in dollars, e.g. min_amount=50000 for "only grants over $50k"
+    min_amount: Optional[float] = Field(None, ge=0)
+    max_amount: Optional[float] = Field(None, ge=0)
+    # Seeds the variety sample of the top matches; defaults to the submission id
+    seed: Optional[int] = None
+    
+    @model_validator(mode='after')
+    def check_amount_bounds(self):
+        if self.min_amount is not None and self.max_amount is not None and self.min_amount > self.max_amount:
+            raise ValueError('min_amount must not exceed max_amount')
+        return self
+    
+    def amount_range(self) -> AmountRange:
+        return AmountRange(self.min_amount, self.max_amount)
+
+class BatchMatchRequest(BaseModel):
+    items: List[GrantMatchRequest] = Field(..., min_length=1, max_length=1000)
 
 class Grant(BaseModel):
     title: str
@@ -112,48 +125,58 @@ async def get_status_checks():
     
     return status_checks
 
+async def record_submission(request: GrantMatchRequest, req: Request) -> str:
+    """Save a match submission and forward it to Airtable"""
+    # Get client IP
+    client_ip = req.client.host if req.client else None
+    
+    # Queue the submission; it is written in bulk off the request path
+    submission_id = await submission_buffer.add(
+        project_summary=request.project_summary,
+        email=request.email,
+        organization_type=request.organization_type,
+        focus_area=request.focus_area,
+        ip_address=client_ip
+    )
+    
+    # Send to Airtable webhook (async, don't wait)
+    if AIRTABLE_WEBHOOK_URL:
+        webhook_data = {
+            'project_summary': request.project_summary,
+            'email': request.email,
+            'organization_type': request.organization_type,
+            'focus_area': request.focus_area,
+            'timestamp': datetime.utcnow().isoformat(),
+            'submission_id': submission_id
+        }
+        asyncio.create_task(send_to_airtable(AIRTABLE_WEBHOOK_URL, webhook_data))
+    
+    return submission_id
+
 @api_router.post("/match")
 async def match_grants(request: GrantMatchRequest, req: Request):
     """
     Match grants from 7+ public data sources based on project summary
     """
     try:
-        # Get client IP
-        client_ip = req.client.host if req.client else None
-        
-        # Save submission to database
-        submission_id = await database.save_submission(
-            project_summary=request.project_summary,
-            email=request.email,
-            organization_type=request.organization_type,
-            focus_area=request.focus_area,
-            ip_address=client_ip
-        )
-        
-        # Send to Airtable webhook (async, don't wait)
-        if AIRTABLE_WEBHOOK_URL:
-            webhook_data = {
-                'project_summary': request.project_summary,
-                'email': request.email,
-                'organization_type': request.organization_type,
-                'focus_area': request.focus_area,
-                'timestamp': datetime.utcnow().isoformat(),
-                'submission_id': submission_id
-            }
-            asyncio.create_task(send_to_airtable(AIRTABLE_WEBHOOK_URL, webhook_data))
+        submission_id = await record_submission(request, req)
         
         # Match grants from multiple sources
-        grants = await grant_matcher.match_grants(
+        result = await grant_matcher.match(
             project_summary=request.project_summary,
             focus_area=request.focus_area,
-            org_type=request.organization_type
+            org_type=request.organization_type,
+            amounts=request.amount_range(),
+            seed=request.seed if request.seed is not None else submission_id
         )
+        grants = result['grants']
         
         logger.info(f"Matched {len(grants)} grants for submission {submission_id}")
         
         return {
             'success': True,
             'grants': grants,
+            'sources': result['sources'],
             'submission_id': submission_id
         }
         
@@ -164,6 +187,110 @@ async def match_grants(request: GrantMatchRequest, req: Request):
             content={'success': False, 'error': 'Failed to match grants'}
         )
 
+@api_router.post("/match/stream")
+async def stream_match_grants(request: GrantMatchRequest, req: Request):
+    """
+    Stream grant matches as NDJSON: one event per completed source with a
+    provisional top 10, then a final event with the ordered top 10
+    """
+    try:
+        submission_id = await record_submission(request, req)
+    except Exception as e:
+        logger.error(f"Grant matching error: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={'success': False, 'error': 'Failed to match grants'}
+        )
+    
+    async def events():
+        yield json.dumps({'event': 'submission', 'submission_id': submission_id}) + '\n'
+        try:
+            async for event in grant_matcher.stream_match(
+                project_summary=request.project_summary,
+                focus_area=request.focus_area,
+                org_type=request.organization_type,
+                amounts=request.amount_range(),
+                seed=request.seed if request.seed is not None else submission_id
+            ):
+                yield json.dumps(event, default=str) + '\n'
+        except Exception as e:
+            logger.error(f"Grant match stream error: {e}")
+            yield json.dumps({'event': 'error', 'error': 'Failed to match grants'}) + '\n'
+    
+    return StreamingResponse(events(), media_type='application/x-ndjson')
+
+@api_router.post("/match/batch")
+async def match_grants_batch(request: BatchMatchRequest, req: Request):
+    """
+    Match many project summaries at once: submissions queued for one bulk write
+    and one fetch per source, with every summary scored against the shared pool
+    """
+    try:
+        client_ip = req.client.host if req.client else None
+        
+        submission_ids = await submission_buffer.add_many([
+            {
+                'project_summary': item.project_summary,
+                'email': item.email,
+                'organization_type': item.organization_type,
+                'focus_area': item.focus_area,
+                'ip_address': client_ip
+            }
+            for item in request.items
+        ])
+        
+        batch = await grant_matcher.match_batch([
+            {
+                'project_summary': item.project_summary,
+                'focus_area': item.focus_area,
+                'org_type': item.organization_type,
+                'min_amount': item.min_amount,
+                'max_amount': item.max_amount,
+                'seed': item.seed if item.seed is not None else submission_id
+            }
+            for item, submission_id in zip(request.items, submission_ids)
+        ])
+        
+        logger.info(f"Matched batch of {len(request.items)} submissions")
+        
+        return {
+            'success': True,
+            'results': [
+                {'submission_id': submission_id, 'grants': grants}
+                for submission_id, grants in zip(submission_ids, batch['results'])
+            ],
+            'sources': batch['sources']
+        }
+        
+    except Exception as e:
+        logger.error(f"Batch grant matching error: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={'success': False, 'error': 'Failed to match grants'}
+        )
+
+@api_router.get("/match/cache")
+async def get_match_cache_stats(req: Request):
+    """Get match result cache hit/miss statistics"""
+    grant_watcher = getattr(req.app.state, 'grant_watcher', None)
+    return {
+        'success': True,
+        'cache': grant_matcher.cache.stats(),
+        'single_flight': grant_matcher.inflight.stats(),
+        'grant_watcher': grant_watcher.stats if grant_watcher is not None else None
+    }
+
+@api_router.get("/match/sources")
+async def get_match_source_health():
+    """Get circuit breaker state and health of every grant source"""
+    return {
+        'success': True,
+        'sources': grant_matcher.source_health(),
+        'http_pool': http_client.stats(),
+        'mongo_pool': mongo.stats(),
+        'usaspending_cache': grant_matcher.usaspending_cache.stats()
+    }
+
 @api_router.post("/create-checkout-session")
 async def create_checkout_session(request: CheckoutRequest):
     """
@@ -171,7 +298,7 @@ async def create_checkout_session(request: CheckoutRequest):
     """
     try:
         # Validate Stripe configuration
-        if not stripe.api_key or stripe.api_key == '':
+        if not STRIPE_SECRET_KEY:
             logger.error("Stripe API key not configured")
             return JSONResponse(
                 status_code=400,
@@ -185,6 +312,9 @@ async def create_checkout_session(request: CheckoutRequest):
                 content={'success': False, 'error': 'Payment system not configured. Please contact support.'}
             )
         
+        import stripe
+        stripe.api_key = STRIPE_SECRET_KEY
+        
         # Create Stripe checkout session
         checkout_session = stripe.checkout.Session.create(
             customer_email=request.email,
@@ -225,8 +355,10 @@ async def create_checkout_session(request: CheckoutRequest):
 async def get_stats():
     """Get submission statistics"""
     try:
+        # Count what is still buffered too
+        await submission_buffer.flush()
         stats = await database.get_submission_stats()
-        return {'success': True, 'stats': stats}
+        return {'success': True, 'stats': stats, 'submission_buffer': submission_buffer.stats()}
     except Exception as e:
         logger.error(f"Stats error: {e}")
         return JSONResponse(
@@ -234,11 +366,15 @@ async def get_stats():
             content={'success': False, 'error': 'Failed to fetch stats'}
         )
 
-# Include the router in the main app
-app.include_router(api_router)
-
-# Register scraping routes
-register_scraping_routes(app)
+@api_router.get("/health")
+async def health(req: Request):
+    """Readiness and how long the startup warm-up took"""
+    startup = getattr(req.app.state, 'startup', None)
+    return {
+        'success': True,
+        'ready': startup is not None,
+        'startup': startup
+    }
 
 # Configure logging
 logging.basicConfig(
@@ -247,6 +383,78 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+async def warm_up(app: FastAPI):
+    """
+    Startup phase: open the HTTP and MongoDB pools, build or open the grant index
+    and exercise the matching path once, so the first request does none of it
+    """
+    timings: Dict[str, float] = {}
+    
+    async def timed(name: str, step: Awaitable[Any]):
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(step, WARM_UP_TIMEOUT_SECONDS)
+        except Exception as e:
+            logger.warning(f"Warm-up step {name} failed: {e!r}")
+        timings[name] = round((time.perf_counter() - started) * 1000, 1)
+    
+    started = time.perf_counter()
+    await timed('http_pool', http_client.start())
+    await timed('mongo', mongo.start())
+    await timed('grant_index', grant_matcher.build_index())
+    await timed('matcher', grant_matcher.warm_up())
+    timings['total'] = round((time.perf_counter() - started) * 1000, 1)
+    
+    app.state.startup = {'timings_ms': timings, 'finished_at': datetime.now(timezone.utc).isoformat()}
+    logger.info(f"Startup warm-up finished in {timings['total']} ms: {timings}")
+
+def create_app() -> FastAPI:
+    """
+    Build the API app. Scraping routes are registered here, but the scraping stack
+    (selenium, undetected_chromedriver, fake_useragent) and stripe are imported
+    only when a route needs them.
+    """
+    app = FastAPI()
+    
+    # Configure CORS BEFORE including routes
+    app.add_middleware(
+        CORSMiddleware,
+        allow_credentials=True,
+        allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    
+    app.include_router(api_router)
+    
+    # Register scraping routes
+    register_scraping_routes(app, on_grants_changed=grant_matcher.refresh_index)
+    
+    @app.on_event("startup")
+    async def startup():
+        await warm_up(app)
+        if grant_matcher.snapshot_dir:
+            app.state.snapshot_watcher = asyncio.create_task(grant_matcher.watch_snapshots())
+        
+        # With an index server, it follows the grants collection for every worker
+        grant_watcher = GrantChangeWatcher.from_env(grant_matcher) if grant_matcher.index_client is None else None
+        if grant_watcher is not None:
+            app.state.grant_watcher = grant_watcher
+            app.state.grant_watcher_task = asyncio.create_task(grant_watcher.run())
+    
+    @app.on_event("shutdown")
+    async def shutdown():
+        if getattr(app.state, 'snapshot_watcher', None):
+            app.state.snapshot_watcher.cancel()
+        if getattr(app.state, 'grant_watcher_task', None):
+            app.state.grant_watcher_task.cancel()
+        if grant_matcher.index_client is not None:
+            grant_matcher.index_client.close()
+        await submission_buffer.close()
+        await mongo.close()
+        await http_client.close()
+        grant_matcher.usaspending_cache.close()
+    
+    return app
+
+app = create_app()
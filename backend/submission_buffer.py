@@ -0,0 +1,128 @@
+"""
+Write-behind buffer for grant search submissions
+Submissions get a client-generated id immediately and are written in bulk by a
+background task when the batch is full or has waited long enough, so a burst of
+matches becomes a few bulk inserts instead of one write per request. Works with
+any backend that has new_submission and insert_submissions (Database, PostgresDatabase).
+"""
+import os
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SubmissionBuffer:
+    """Queues submissions in memory and flushes them to the database in batches"""
+
+    def __init__(self, database, max_batch: int = 500, flush_seconds: float = 0.5, max_pending: int = 10000):
+        self.database = database
+        self.max_batch = max_batch
+        self.flush_seconds = flush_seconds
+        self.max_pending = max_pending
+        self.pending: List[Dict[str, Any]] = []
+        self.lock = asyncio.Lock()
+        self.wake = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.stats_counters = {'buffered': 0, 'written': 0, 'flushes': 0, 'errors': 0}
+
+    @classmethod
+    def from_env(cls, database) -> 'SubmissionBuffer':
+        return cls(
+            database,
+            max_batch=int(os.environ.get('SUBMISSION_BUFFER_MAX_BATCH', 500)),
+            flush_seconds=float(os.environ.get('SUBMISSION_BUFFER_FLUSH_SECONDS', 0.5)),
+            max_pending=int(os.environ.get('SUBMISSION_BUFFER_MAX_PENDING', 10000))
+        )
+
+    async def add(
+        self,
+        project_summary: str,
+        email: str,
+        organization_type: str,
+        focus_area: str,
+        ip_address: Optional[str] = None
+    ) -> str:
+        """Queue one submission and return its id without waiting for the write"""
+        return (await self.add_many([{
+            'project_summary': project_summary,
+            'email': email,
+            'organization_type': organization_type,
+            'focus_area': focus_area,
+            'ip_address': ip_address
+        }]))[0]
+
+    async def add_many(self, submissions: List[Dict[str, Any]]) -> List[str]:
+        """Queue submissions (save_submissions items) and return their ids"""
+        # Backpressure: when writes fall behind, the caller waits for one
+        if len(self.pending) >= self.max_pending:
+            await self.flush()
+
+        submission_ids = []
+        for item in submissions:
+            submission_id, document = self.database.new_submission(
+                item['project_summary'], item['email'], item['organization_type'],
+                item['focus_area'], item.get('ip_address')
+            )
+            self.pending.append(document)
+            submission_ids.append(submission_id)
+        self.stats_counters['buffered'] += len(submissions)
+
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+        if len(self.pending) >= self.max_batch:
+            self.wake.set()
+        return submission_ids
+
+    async def run(self):
+        """Flush when a batch fills up or flush_seconds after the last flush"""
+        while True:
+            try:
+                await asyncio.wait_for(self.wake.wait(), self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self.wake.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                # The batch went back to the queue; the next round retries it
+                logger.error(f"Submission flush failed, will retry: {e}")
+
+    async def flush(self):
+        """Write everything queued so far, one batch at a time"""
+        async with self.lock:
+            while self.pending:
+                batch = self.pending[:self.max_batch]
+                del self.pending[:len(batch)]
+                try:
+                    await self.database.insert_submissions(batch)
+                except BaseException:
+                    # Ids are client-generated, so rewriting a partly written batch is safe
+                    self.pending[:0] = batch
+                    self.stats_counters['errors'] += 1
+                    raise
+                self.stats_counters['written'] += len(batch)
+                self.stats_counters['flushes'] += 1
+
+    async def close(self):
+        """Stop the background task and drain what is still queued"""
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Lost {len(self.pending)} buffered submissions at shutdown: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'pending': len(self.pending),
+            'max_batch': self.max_batch,
+            'flush_seconds': self.flush_seconds,
+            **self.stats_counters
+        }
@@ -0,0 +1,138 @@
+"""
+Shared text analysis pipeline for grant matching
+Precompiled tokenization, stop words, light stemming and input bounds.
+The same analyzer runs at index time and at query time so terms match exactly.
+"""
+import hashlib
+import re
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+KEYWORD_PATTERN = re.compile(r'\b[a-z]{3,}\b')
+
+# Longer summaries are truncated before analysis
+MAX_INPUT_CHARS = 20000
+
+STOP_WORDS = frozenset({
+    'a', 'about', 'above', 'after', 'again', 'against', 'all', 'also', 'am', 'an', 'and', 'any',
+    'are', 'as', 'at', 'be', 'because', 'been', 'before', 'being', 'below', 'between', 'both',
+    'but', 'by', 'can', 'could', 'did', 'do', 'does', 'doing', 'down', 'during', 'each', 'etc',
+    'few', 'for', 'from', 'further', 'had', 'has', 'have', 'having', 'he', 'her', 'here', 'hers',
+    'herself', 'him', 'himself', 'his', 'how', 'i', 'if', 'in', 'into', 'is', 'it', 'its',
+    'itself', 'just', 'may', 'me', 'might', 'more', 'most', 'must', 'my', 'myself', 'no', 'nor',
+    'not', 'now', 'of', 'off', 'on', 'once', 'only', 'or', 'other', 'our', 'ours', 'ourselves',
+    'out', 'over', 'own', 'same', 'shall', 'she', 'should', 'so', 'some', 'such', 'than', 'that',
+    'the', 'their', 'theirs', 'them', 'themselves', 'then', 'there', 'these', 'they', 'this',
+    'those', 'through', 'to', 'too', 'under', 'until', 'up', 'us', 'very', 'via', 'was', 'we',
+    'were', 'what', 'when', 'where', 'which', 'while', 'who', 'whom', 'why', 'will', 'with',
+    'within', 'would', 'you', 'your', 'yours', 'yourself', 'yourselves'
+})
+
+
+def strip_suffix(word: str) -> str:
+    if len(word) <= 3:
+        return word
+    if word.endswith('ies') and len(word) > 4:
+        return word[:-3] + 'y'
+    if word.endswith(('sses', 'shes', 'ches', 'xes', 'zzes')):
+        return word[:-2]
+    if word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        return word[:-1]
+    if word.endswith('ing') and len(word) >= 7:
+        return word[:-3]
+    return word
+
+
+@lru_cache(maxsize=50000)
+def stem(word: str) -> str:
+    """
+    Light suffix stripping: plurals and -ing forms.
+    Applied to a fixed point, so stemming an already stemmed term is a no-op.
+    """
+    stemmed = strip_suffix(word)
+    while stemmed != word:
+        word, stemmed = stemmed, strip_suffix(stemmed)
+    return stemmed
+
+
+def match_prefix(term: str) -> str:
+    """
+    Longest prefix every surface form of a stemmed term starts with,
+    e.g. 'community' for 'communities' is found by scanning for 'communit'
+    """
+    return term[:-1] if term.endswith('y') and len(term) > 3 else term
+
+
+def fingerprint(*parts: Optional[str]) -> str:
+    """Case-, punctuation- and whitespace-insensitive key, e.g. for near-duplicate grants"""
+    return '|'.join(''.join(TOKEN_PATTERN.findall((part or '').lower())) for part in parts)
+
+
+class Keywords(list):
+    """
+    Query terms as analyzed (stemmed) for the local indexes and scoring, carrying
+    the words they came from: surface[i] is the most common input word of term i.
+    External full-text searches get surface forms, which they match as written.
+    """
+
+    def __init__(self, terms=(), surface=None):
+        super().__init__(terms)
+        self.surface = list(self) if surface is None else list(surface)
+
+
+def surface_forms(keywords: List[str]) -> List[str]:
+    """Words to send to an external search: surface forms when known, else the terms"""
+    return list(getattr(keywords, 'surface', keywords))
+
+
+class TextAnalyzer:
+    """Tokenizes, filters and stems text, memoizing keyword extraction per summary"""
+
+    def __init__(self, memo_size: int = 4096, max_input_chars: int = MAX_INPUT_CHARS):
+        self.memo_size = memo_size
+        self.max_input_chars = max_input_chars
+        self.memo: 'OrderedDict[bytes, Tuple[Tuple[str, ...], Tuple[str, ...]]]' = OrderedDict()
+
+    def analyze(self, text: Optional[str]) -> List[str]:
+        """Index/query terms for a piece of text"""
+        if not text:
+            return []
+        return [
+            stem(token)
+            for token in TOKEN_PATTERN.findall(text[:self.max_input_chars].lower())
+            if token not in STOP_WORDS
+        ]
+
+    def extract_keywords(self, text: str, focus_area: str = "", limit: int = 10) -> Keywords:
+        """Most common analyzed terms of a summary plus its focus area, memoized"""
+        text = (text or '')[:self.max_input_chars]
+        key = hashlib.blake2b(f"{limit}\0{focus_area}\0{text}".encode(), digest_size=16).digest()
+        cached = self.memo.get(key)
+        if cached is not None:
+            self.memo.move_to_end(key)
+            return Keywords(*cached)
+
+        words = [word for word in KEYWORD_PATTERN.findall(text.lower()) if word not in STOP_WORDS]
+        # Add focus area terms
+        words.extend(
+            token for token in TOKEN_PATTERN.findall((focus_area or '')[:self.max_input_chars].lower())
+            if token not in STOP_WORDS
+        )
+
+        forms: Dict[str, Counter] = {}
+        for word in words:
+            forms.setdefault(stem(word), Counter())[word] += 1
+        terms = Counter(stem(word) for word in words)
+
+        keywords = tuple(term for term, count in terms.most_common(limit))
+        surface = tuple(forms[term].most_common(1)[0][0] for term in keywords)
+        self.memo[key] = (keywords, surface)
+        if len(self.memo) > self.memo_size:
+            self.memo.popitem(last=False)
+        return Keywords(keywords, surface)
+
+
+# Shared by the index, the scorer and the matcher
+analyzer = TextAnalyzer()
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# The backend is a flat set of modules run from its own directory
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend')
+sys.path.insert(0, BACKEND_DIR)
+
+# Keep the matcher's persistent USAspending cache out of the source tree
+os.environ.setdefault('USASPENDING_CACHE_PATH', os.path.join(os.environ.get('TMPDIR', '/tmp'), 'celfund-test-usaspending.sqlite3'))
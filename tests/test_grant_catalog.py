@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta
+
+from grant_catalog import StaticGrant, StaticGrantCatalog
+from grant_normalization import AmountRange
+
+
+def make_catalog():
+    return StaticGrantCatalog({
+        'state': (
+            StaticGrant('Rural Health Clinics', 'State Health', 'Clinic funding', 30, '$10,000 - $50,000', 'https://a'),
+            StaticGrant('Solar Schools', 'State Energy', 'Solar panels for schools', 60, '$100,000 - $500,000', 'https://b'),
+            StaticGrant('Arts Access', 'State Arts', 'Community arts', 90, '$5,000', 'https://c')
+        ),
+        'other': (
+            StaticGrant('Solar Farms', 'Energy Fund', 'Solar farms', 45, '$1,000,000', 'https://d'),
+        )
+    })
+
+
+def test_search_returns_matches_first_then_the_rest_of_the_source():
+    grants = make_catalog().search('state', ['solar'])
+    assert [grant['title'] for grant in grants] == ['Solar Schools', 'Rural Health Clinics', 'Arts Access']
+    assert grants[0]['amount_min'] == 100000.0 and grants[0]['url'] == 'https://b'
+
+
+def test_search_applies_funding_bounds():
+    catalog = make_catalog()
+    assert [grant['title'] for grant in catalog.search('state', ['solar'], AmountRange(20000, 60000))] == [
+        'Rural Health Clinics'
+    ]
+    assert catalog.search('other', ['solar'], AmountRange(None, 1000)) == []
+
+
+def test_returned_grants_are_copies_with_resolved_deadlines():
+    catalog = make_catalog()
+    before = datetime.now()
+    grant = catalog.search('state', ['solar'])[0]
+    deadline = datetime.fromisoformat(grant['deadline'])
+    assert before + timedelta(days=60) <= deadline <= datetime.now() + timedelta(days=60)
+
+    grant['title'] = 'Changed'
+    assert catalog.search('state', ['solar'])[0]['title'] == 'Solar Schools'
+    assert catalog.records[1]['deadline'] is None
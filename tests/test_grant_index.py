@@ -0,0 +1,39 @@
+import numpy as np
+
+from grant_index import GrantSearchIndex
+
+
+def build_index():
+    index = GrantSearchIndex()
+    index.build([
+        {'title': 'Solar Schools', 'description': 'Rooftop panels for public schools', 'focus_areas': ['energy']},
+        {'title': 'Youth Arts', 'description': 'Community programs with solar themed murals', 'focus_areas': ['arts']},
+        {'title': 'Rural Health', 'description': 'Clinics in rural counties', 'focus_areas': ['health']}
+    ])
+    return index
+
+
+def titles(results):
+    return [document['title'] for document, _ in results]
+
+
+def test_title_matches_outrank_description_matches():
+    index = build_index()
+    assert titles(index.search(['solar'])) == ['Solar Schools', 'Youth Arts']
+    assert index.search(['volcano']) == []
+
+
+def test_search_keeps_top_k_inside_the_mask():
+    index = build_index()
+    assert titles(index.search(['solar'], k=1)) == ['Solar Schools']
+    assert titles(index.search(['solar'], mask=np.array([False, True, True]))) == ['Youth Arts']
+
+
+def test_add_and_replace_without_rebuild():
+    index = build_index()
+    doc_id = index.add({'title': 'Solar Farms', 'description': 'Community solar', 'focus_areas': ['energy']})
+    assert doc_id == 3 and 'Solar Farms' in titles(index.search(['solar']))
+
+    index.replace(0, {'title': 'School Gardens', 'description': 'Vegetable beds', 'focus_areas': ['food']})
+    assert 'School Gardens' not in titles(index.search(['solar']))
+    assert titles(index.search(['gardens'])) == ['School Gardens']
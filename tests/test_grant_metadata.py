@@ -0,0 +1,77 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from grant_matcher import GrantMatcher
+from grant_metadata import GrantMetadataStore, MatchFilters
+
+
+def grant(grant_id, object_id, title, **fields):
+    return {
+        '_id': object_id,
+        'grant_id': grant_id,
+        'title': title,
+        'description': f'{title} program',
+        'is_active': True,
+        'deadline': (datetime.utcnow() + timedelta(days=30)).strftime('%Y-%m-%d'),
+        **fields
+    }
+
+
+def test_unique_keeps_last_duplicate_at_first_position():
+    grants = [grant('g1', 'a', 'First'), grant('g2', 'b', 'Other'), grant('g1', 'c', 'Second')]
+    assert [g['_id'] for g in GrantMetadataStore.unique(grants)] == ['c', 'b']
+
+
+def test_index_rows_line_up_with_metadata_when_grant_ids_repeat():
+    db_grants = [
+        grant('g1', 'a', 'Solar Schools', funding_amount='$1,000'),
+        grant('g1', 'b', 'Solar Schools Updated', funding_amount='$5,000'),
+        grant('g2', 'c', 'Solar Farms', funding_amount='$9,000')
+    ]
+
+    async def build():
+        matcher = GrantMatcher('mongodb://unused', 'test', index_server_socket='')
+        matcher.snapshot_dir = ''
+        matcher.semantic_index_path = ''
+
+        async def load_active_grants():
+            return db_grants
+        matcher.load_active_grants = load_active_grants
+        await matcher.build_memory_index()
+        matcher.usaspending_cache.close()
+        return matcher
+
+    matcher = asyncio.run(build())
+    assert len(matcher.index) == matcher.metadata.size == 2
+    for document, row_grant in zip(matcher.index.documents, GrantMetadataStore.unique(db_grants)):
+        row = matcher.metadata.row_for(row_grant)
+        assert matcher.index.documents[row] is document
+        assert document['title'] == row_grant['title']
+
+    # Both duplicates still map to the shared row, so deleting one keeps it searchable
+    assert matcher.metadata.object_ids == {'a': 0, 'b': 0, 'c': 1}
+    titles = [g['title'] for g in matcher.search_index(['solar'])]
+    assert sorted(titles) == ['Solar Farms', 'Solar Schools Updated']
+    matcher.remove_grants(['a'])
+    assert len(matcher.search_index(['solar'])) == 2
+
+
+def test_external_candidates_get_the_same_category_filters_as_the_index():
+    matcher = GrantMatcher('mongodb://unused', 'test', index_server_socket='')
+    matcher.usaspending_cache.close()
+    candidates = [
+        {'title': 'Clinic Expansion', 'funder': 'A', 'focus_areas': ['Health'], 'source': 'usaspending'},
+        {'title': 'School Libraries', 'funder': 'B', 'focus_areas': 'Education', 'source': 'grants_gov'},
+        {'title': 'Open Call', 'funder': 'C', 'source': 'data_gov'},
+        {'title': 'Startup Fund', 'funder': 'D', 'focus_areas': ['education'], 'eligibility': 'Startups only',
+         'source': 'corporate_csr'}
+    ]
+    filters = MatchFilters(focus_area='education', org_type='nonprofit')
+    kept = matcher.filter_and_dedupe([dict(grant) for grant in candidates], filters)
+    assert [grant['title'] for grant in kept] == ['School Libraries', 'Open Call']
+
+    # The index mask agrees on the same grants
+    metadata = GrantMetadataStore()
+    metadata.build([dict(grant, grant_id=grant['title']) for grant in candidates])
+    assert metadata.mask(filters).tolist() == [False, True, True, False]
+    assert len(matcher.filter_and_dedupe([dict(grant) for grant in candidates])) == 4
@@ -0,0 +1,68 @@
+from datetime import datetime
+
+import pytest
+
+from grant_normalization import (
+    DEADLINE_DATE, DEADLINE_ROLLING, DEADLINE_UNKNOWN, DEADLINE_VARIES, DEADLINE_WINDOW,
+    AmountRange, normalize_amount, normalize_deadline, parse_amount
+)
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('$20,000', (20000.0, 20000.0)),
+    ('$100,000 - $500,000', (100000.0, 500000.0)),
+    ('$1-2 million', (1e6, 2e6)),
+    ('Up to $50K', (0.0, 50000.0)),
+    ('$100K+', (100000.0, None)),
+    ('$1.5 million', (1.5e6, 1.5e6)),
+    ('250K', (250000.0, 250000.0)),
+    ('Varies', (None, None)),
+    ('12-week program', (None, None)),
+    ('', (None, None)),
+    (None, (None, None)),
+])
+def test_parse_amount(text, expected):
+    assert parse_amount(text) == expected
+
+
+def test_normalize_amount_accepts_numbers():
+    assert normalize_amount(5000) == {'amount_min': 5000.0, 'amount_max': 5000.0}
+    assert normalize_amount(['not text']) == {'amount_min': None, 'amount_max': None}
+
+
+def test_unknown_amounts_never_match_set_bounds():
+    assert AmountRange(1000, 5000).matches(0.0, 50000.0)
+    assert not AmountRange(100000, None).matches(0.0, 50000.0)
+    assert not AmountRange(1000, None).matches(None, None)
+    assert AmountRange().matches(None, None)
+
+
+@pytest.mark.parametrize('text, deadline_at', [
+    ('2025-12-15', datetime(2025, 12, 15, 23, 59, 59)),
+    ('2025-12-15T08:00:00Z', datetime(2025, 12, 15, 23, 59, 59)),
+    ('Deadline: 12/15/2025', datetime(2025, 12, 15, 23, 59, 59)),
+    ('Due 3/1/26', datetime(2026, 3, 1, 23, 59, 59)),
+    ('March 1st, 2026', datetime(2026, 3, 1, 23, 59, 59)),
+    ('Sept. 30 2026', datetime(2026, 9, 30, 23, 59, 59)),
+    ('1 Oct 2026', datetime(2026, 10, 1, 23, 59, 59)),
+])
+def test_normalize_deadline_dates(text, deadline_at):
+    assert normalize_deadline(text) == {'deadline_at': deadline_at, 'deadline_kind': DEADLINE_DATE}
+
+
+@pytest.mark.parametrize('text, kind', [
+    ('Rolling', DEADLINE_ROLLING),
+    ('Open until filled', DEADLINE_ROLLING),
+    ('January - March', DEADLINE_WINDOW),
+    ('Varies by program', DEADLINE_VARIES),
+    ('Contact us', DEADLINE_UNKNOWN),
+    ('', DEADLINE_UNKNOWN),
+    (None, DEADLINE_UNKNOWN),
+])
+def test_normalize_deadline_kinds(text, kind):
+    assert normalize_deadline(text) == {'deadline_at': None, 'deadline_kind': kind}
+
+
+def test_normalize_deadline_keeps_datetimes():
+    value = datetime(2026, 1, 2, 3, 4, 5)
+    assert normalize_deadline(value) == {'deadline_at': value, 'deadline_kind': DEADLINE_DATE}
@@ -0,0 +1,87 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from grant_metadata import NO_FILTERS, MatchFilters
+from grant_normalization import AmountRange
+from index_service import IndexClient, IndexServer, IndexServerError
+
+
+class StubIndex:
+    is_built = True
+
+    def __len__(self):
+        return 1
+
+
+class StubMatcher:
+    """The parts of GrantMatcher the index server calls"""
+
+    def __init__(self):
+        self.index = StubIndex()
+        self.snapshot = None
+        self.index_generation = 7
+        self.searches = []
+        self.refreshes = []
+
+    async def fetch_internal_grants(self, keywords, filters, limit=None):
+        if keywords == ['fail']:
+            raise ValueError('index unavailable')
+        self.searches.append((keywords, filters, limit))
+        return [{'title': 'Solar Schools', 'deadline_at': datetime(2026, 3, 1, 23, 59, 59)}]
+
+    async def refresh_index(self, grants=None):
+        self.refreshes.append(grants)
+        self.index_generation += 1
+
+
+def run_with_server(tmp_path, exchange):
+    async def run():
+        matcher = StubMatcher()
+        server = IndexServer(matcher, str(tmp_path / 'index.sock'))
+        await server.start()
+        client = IndexClient(server.socket_path, timeout=2)
+        try:
+            return matcher, await exchange(client)
+        finally:
+            client.close()
+            await server.close()
+    return asyncio.run(run())
+
+
+def test_search_round_trip(tmp_path):
+    filters = MatchFilters(AmountRange(1000, None), 'education', 'nonprofit')
+
+    async def exchange(client):
+        return await client.search(['solar', 'école'], filters, 25)
+
+    matcher, (generation, grants) = run_with_server(tmp_path, exchange)
+    assert generation == 7
+    assert matcher.searches == [(['solar', 'école'], filters, 25)]
+    assert grants == [{'title': 'Solar Schools', 'deadline_at': datetime(2026, 3, 1, 23, 59, 59)}]
+
+
+def test_refresh_and_ping_reuse_one_connection(tmp_path):
+    async def exchange(client):
+        rebuild = await client.refresh()
+        upsert = await client.refresh([{'grant_id': 'g1', 'title': 'Solar'}])
+        stats = await client.ping()
+        return rebuild, upsert, stats, len(client.idle)
+
+    matcher, (rebuild, upsert, stats, idle) = run_with_server(tmp_path, exchange)
+    assert (rebuild, upsert) == (8, 9)
+    assert matcher.refreshes == [None, [{'grant_id': 'g1', 'title': 'Solar'}]]
+    assert stats['generation'] == 9 and stats['requests'] == 3 and stats['documents'] == 1
+    assert idle == 1
+
+
+def test_server_errors_reach_the_client(tmp_path):
+    async def exchange(client):
+        with pytest.raises(IndexServerError, match='index unavailable'):
+            await client.search(['fail'], NO_FILTERS, 10)
+        # The connection stays usable after an error response
+        return await client.search(['solar'], NO_FILTERS, 10)
+
+    _, (generation, grants) = run_with_server(tmp_path, exchange)
+    assert generation == 7 and len(grants) == 1
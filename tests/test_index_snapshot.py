@@ -0,0 +1,97 @@
+import asyncio
+import json
+
+from grant_matcher import GrantMatcher
+from index_snapshot import current_version
+from tests.test_grant_metadata import grant
+
+
+def snapshot_matcher(directory, db_grants):
+    matcher = GrantMatcher('mongodb://unused', 'test', index_server_socket='')
+    matcher.snapshot_dir = str(directory)
+    matcher.semantic_index_path = ''
+
+    async def load_active_grants():
+        return db_grants
+    matcher.load_active_grants = load_active_grants
+    return matcher
+
+
+def titles(grants):
+    return sorted(g['title'] for g in grants)
+
+
+def test_snapshot_publish_open_upsert_remove(tmp_path):
+    db_grants = [
+        grant('g1', 'a', 'Solar Schools', funding_amount='$1,000'),
+        grant('g2', 'b', 'Solar Farms', funding_amount='$9,000'),
+        grant('g3', 'c', 'Youth Arts', funding_amount='$2,000')
+    ]
+    writer = snapshot_matcher(tmp_path, db_grants)
+    asyncio.run(writer.build_index())
+    writer.usaspending_cache.close()
+    version = current_version(str(tmp_path))
+    assert version is not None and writer.snapshot.version == version
+
+    # A second worker maps the published snapshot without reading MongoDB
+    reader = snapshot_matcher(tmp_path, [])
+    assert reader.open_snapshot()
+    reader.usaspending_cache.close()
+    assert reader.snapshot.size == 3
+    assert titles(reader.search_index(['solar'])) == ['Solar Farms', 'Solar Schools']
+    assert titles(reader.search_index(['arts'])) == ['Youth Arts']
+
+    reader.upsert_grants([
+        grant('g1', 'a', 'Solar Schools Renewed'),
+        grant('g4', 'd', 'Solar Libraries')
+    ])
+    assert titles(reader.search_index(['solar'])) == ['Solar Farms', 'Solar Libraries', 'Solar Schools Renewed']
+
+    reader.remove_grants(['b'])
+    assert titles(reader.search_index(['solar'])) == ['Solar Libraries', 'Solar Schools Renewed']
+
+    # Changes stay local to the worker; the snapshot on disk is unchanged
+    fresh = snapshot_matcher(tmp_path, [])
+    assert fresh.open_snapshot()
+    fresh.usaspending_cache.close()
+    assert titles(fresh.search_index(['solar'])) == ['Solar Farms', 'Solar Schools']
+
+
+def test_stale_snapshot_is_rebuilt_by_one_worker(tmp_path):
+    db_grants = [grant('g1', 'a', 'Solar Schools'), grant('g2', 'b', 'Youth Arts')]
+    loads = []
+
+    def worker():
+        matcher = snapshot_matcher(tmp_path, db_grants)
+        matcher.snapshot_max_age = 60
+
+        async def load_active_grants():
+            loads.append(matcher)
+            await asyncio.sleep(0.05)
+            return db_grants
+        matcher.load_active_grants = load_active_grants
+        return matcher
+
+    first = worker()
+    asyncio.run(first.build_index())
+    first.usaspending_cache.close()
+    stale = current_version(str(tmp_path))
+    manifest_path = tmp_path / stale / 'manifest.json'
+    manifest = json.loads(manifest_path.read_text())
+    manifest['built_at'] -= 3600
+    manifest_path.write_text(json.dumps(manifest))
+    loads.clear()
+
+    # Workers starting together all find the stale snapshot
+    workers = [worker() for _ in range(3)]
+
+    async def start_all():
+        await asyncio.gather(*(matcher.build_index() for matcher in workers))
+
+    asyncio.run(start_all())
+    assert len(loads) == 1
+    version = current_version(str(tmp_path))
+    assert version != stale
+    for matcher in workers:
+        matcher.usaspending_cache.close()
+        assert matcher.snapshot.version == version
@@ -0,0 +1,24 @@
+from keyword_matcher import KeywordAutomaton
+from text_analyzer import stem
+
+
+def test_counts_whole_words_only():
+    automaton = KeywordAutomaton(['art', 'grant'])
+    assert automaton.count('Art grants for smart artists; art-grant') == [2, 1]
+
+
+def test_overlapping_keywords_count_independently():
+    automaton = KeywordAutomaton(['solar', 'solar energy', 'energy'])
+    assert automaton.count('solar energy and energy solar') == [2, 1, 2]
+
+
+def test_stemmed_keywords_match_inflected_words():
+    automaton = KeywordAutomaton(['grant', 'community'], normalize=stem)
+    assert automaton.count('Grants for communities and community granting') == [2, 2]
+    # A word that starts with the keyword but stems differently is not a match
+    assert automaton.count('grantor') == [0, 0]
+
+
+def test_count_batch_shape():
+    automaton = KeywordAutomaton(['solar'])
+    assert automaton.count_batch(['solar solar', 'wind']).tolist() == [[2.0], [0.0]]
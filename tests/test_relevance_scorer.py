@@ -0,0 +1,23 @@
+from relevance_scorer import RelevanceScorer
+
+
+def grant(n):
+    return {'title': f'Grant {n}', 'description': f'solar program number {n}'}
+
+
+def test_scoring_refreshes_cached_rows():
+    scorer = RelevanceScorer(max_cached_documents=3)
+    catalog = grant('catalog')
+    scorer.add_documents([catalog])
+    for n in range(5):
+        scorer.score([catalog], ['solar'])
+        scorer.add_documents([grant(n)])
+    assert scorer.document_key(catalog) in scorer.rows
+
+
+def test_cached_and_adhoc_rows_score_alike():
+    scorer = RelevanceScorer()
+    grants = [grant(1), {'title': 'Wind', 'description': 'wind farms'}]
+    adhoc = scorer.score(grants, ['solar', 'wind'])
+    scorer.add_documents(grants)
+    assert list(scorer.score(grants, ['solar', 'wind'])) == list(adhoc)
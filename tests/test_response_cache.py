@@ -0,0 +1,36 @@
+import asyncio
+
+import pytest
+
+from response_cache import PersistentResponseCache
+
+
+def test_unwritable_path_falls_back_to_loader():
+    cache = PersistentResponseCache('/proc/nonexistent/cache.sqlite3')
+
+    async def loader():
+        return {'results': [1]}
+
+    assert asyncio.run(cache.fetch({'q': 'solar'}, loader)) == {'results': [1]}
+    assert cache.stats()['errors'] == 2
+
+
+def test_abandoned_miss_still_fills_cache(tmp_path):
+    cache = PersistentResponseCache(str(tmp_path / 'cache.sqlite3'))
+    calls = []
+
+    async def slow():
+        calls.append(1)
+        await asyncio.sleep(0.2)
+        return {'results': ['slow']}
+
+    async def scenario():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(cache.fetch({'q': 'solar'}, slow), 0.05)
+        await asyncio.sleep(0.3)
+        return await cache.fetch({'q': 'solar'}, slow)
+
+    assert asyncio.run(scenario()) == {'results': ['slow']}
+    assert len(calls) == 1
+    assert cache.stats()['hits'] == 1
+    cache.close()
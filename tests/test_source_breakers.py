@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from grant_matcher import GrantMatcher
+
+
+async def fetch_fast(keywords, filters):
+    return [{'title': 'Fast Grant'}]
+
+
+async def fetch_slow(keywords, filters):
+    await asyncio.sleep(5)
+    return []
+
+
+@pytest.fixture
+def matcher():
+    matcher = GrantMatcher('mongodb://unused', 'test', index_server_socket='')
+    matcher.sources = [fetch_fast, fetch_slow]
+    matcher.source_timeouts = {}
+    matcher.default_source_timeout = 5
+    yield matcher
+    matcher.usaspending_cache.close()
+
+
+def test_consumer_leaving_early_is_not_a_source_failure(matcher):
+    async def consume_first_event():
+        events = matcher.iter_sources(['solar'], {})
+        first = await events.__anext__()
+        await events.aclose()
+        await asyncio.sleep(0)
+        return first
+
+    for _ in range(matcher.circuit_failure_threshold + 1):
+        assert asyncio.run(consume_first_event())[0] == 'fast'
+
+    slow = matcher.breaker_for('slow').snapshot()
+    assert slow['state'] == 'closed'
+    assert slow['total_failures'] == 0
+
+
+def test_match_deadline_counts_against_the_source(matcher):
+    matcher.match_deadline = 0.05
+
+    async def consume_all():
+        return [event async for event in matcher.iter_sources(['solar'], {})]
+
+    events = asyncio.run(consume_all())
+    assert ('slow', 'timed_out', []) in events
+    assert matcher.breaker_for('slow').snapshot()['total_failures'] == 1
+
+
+def test_internal_database_errors_count_against_the_source(matcher):
+    class UnreachableGrants:
+        def find(self, *args, **kwargs):
+            raise ConnectionError('connection refused')
+
+    matcher.db = type('Database', (), {'grants': UnreachableGrants()})()
+    matcher.sources = [matcher.fetch_internal_grants, fetch_fast]
+
+    async def consume_all():
+        return await matcher.gather_sources(['solar'])
+
+    grants, sources = asyncio.run(consume_all())
+    assert sources['failed'] == ['internal_grants']
+    assert sources['included'] == ['fast']
+    assert matcher.breaker_for('internal_grants').snapshot()['total_failures'] == 1
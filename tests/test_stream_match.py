@@ -0,0 +1,32 @@
+import asyncio
+
+from grant_matcher import GrantMatcher
+
+
+async def fetch_internal_grants(keywords, filters):
+    # A MongoDB text search when the index is not built: slower than the other sources
+    await asyncio.sleep(0.05)
+    return [{'title': 'Community Solar Grant', 'description': 'solar'}]
+
+
+async def fetch_fast(keywords, filters):
+    return [{'title': 'Solar Schools Grant', 'description': 'solar'}]
+
+
+def stream_events(matcher, summary):
+    async def consume():
+        return [event async for event in matcher.stream_match(summary)]
+    return asyncio.run(consume())
+
+
+def test_internal_grants_are_streamed_first_without_an_index():
+    matcher = GrantMatcher('mongodb://unused', 'test', index_server_socket='')
+    matcher.sources = [fetch_internal_grants, fetch_fast]
+    try:
+        events = stream_events(matcher, 'solar energy for schools')
+    finally:
+        matcher.usaspending_cache.close()
+
+    assert [event.get('source') for event in events] == ['internal_grants', 'fast', None]
+    assert [grant['title'] for grant in events[0]['grants']] == ['Community Solar Grant']
+    assert events[-1]['sources']['included'] == ['internal_grants', 'fast']
@@ -0,0 +1,79 @@
+import asyncio
+
+from submission_buffer import SubmissionBuffer
+
+
+class FakeDatabase:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.batches = []
+        self.next_id = 0
+
+    def new_submission(self, project_summary, email, organization_type, focus_area, ip_address=None):
+        self.next_id += 1
+        submission_id = f'sub-{self.next_id}'
+        return submission_id, {'id': submission_id, 'project_summary': project_summary, 'email': email}
+
+    async def insert_submissions(self, batch):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError('database unavailable')
+        self.batches.append([document['id'] for document in batch])
+
+
+def submissions(count):
+    return [
+        {'project_summary': f'Project {i}', 'email': f'{i}@example.org',
+         'organization_type': 'nonprofit', 'focus_area': 'education'}
+        for i in range(count)
+    ]
+
+
+def test_failed_batch_is_requeued_in_order():
+    async def run():
+        database = FakeDatabase(failures=1)
+        buffer = SubmissionBuffer(database, max_batch=2, flush_seconds=60)
+        ids = await buffer.add_many(submissions(3))
+        try:
+            await buffer.flush()
+        except ConnectionError:
+            pass
+        assert buffer.stats()['pending'] == 3 and buffer.stats()['errors'] == 1
+        await buffer.flush()
+        await buffer.close()
+        return ids, database.batches, buffer.stats()
+
+    ids, batches, stats = asyncio.run(run())
+    assert batches == [ids[:2], ids[2:]]
+    assert stats['pending'] == 0 and stats['written'] == 3 and stats['flushes'] == 2
+
+
+def test_background_task_retries_after_a_failure():
+    async def run():
+        database = FakeDatabase(failures=1)
+        buffer = SubmissionBuffer(database, max_batch=100, flush_seconds=0.01)
+        ids = await buffer.add_many(submissions(2))
+        for _ in range(100):
+            if database.batches:
+                break
+            await asyncio.sleep(0.01)
+        await buffer.close()
+        return ids, database.batches
+
+    ids, batches = asyncio.run(run())
+    assert batches == [ids]
+
+
+def test_close_drains_pending_submissions():
+    async def run():
+        database = FakeDatabase()
+        buffer = SubmissionBuffer(database, max_batch=100, flush_seconds=60)
+        first = await buffer.add('Solar', 'a@example.org', 'nonprofit', 'energy')
+        rest = await buffer.add_many(submissions(2))
+        assert database.batches == []
+        await buffer.close()
+        return [first] + rest, database.batches, buffer
+
+    ids, batches, buffer = asyncio.run(run())
+    assert batches == [ids]
+    assert buffer.task is None and buffer.stats()['pending'] == 0
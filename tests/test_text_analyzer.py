@@ -0,0 +1,81 @@
+import asyncio
+
+from grant_matcher import GrantMatcher
+from text_analyzer import TextAnalyzer, surface_forms
+
+
+def test_keywords_are_stems_carrying_surface_forms():
+    analyzer = TextAnalyzer()
+    keywords = analyzer.extract_keywords('Affordable housing and housing counseling for families', 'community')
+    assert keywords[:2] == ['hous', 'affordable']
+    assert surface_forms(keywords)[:2] == ['housing', 'affordable']
+    assert 'family' in keywords and 'families' in keywords.surface
+
+    # Memoized results keep their surface forms
+    again = analyzer.extract_keywords('Affordable housing and housing counseling for families', 'community')
+    assert again == keywords and again.surface == keywords.surface
+
+
+def test_usaspending_is_queried_with_surface_forms():
+    matcher = GrantMatcher('mongodb://unused', 'test', index_server_socket='')
+    payloads = []
+
+    async def fetch(payload, loader):
+        payloads.append(payload)
+        return {'results': []}
+    matcher.usaspending_cache.fetch = fetch
+
+    keywords = matcher.extract_keywords('Housing funding for nursing students', 'health')
+    asyncio.run(matcher.fetch_usaspending(keywords))
+    matcher.usaspending_cache.close()
+
+    query = ' '.join(payloads[0]['filters']['keywords'])
+    assert 'housing' in query.split() and 'hous' not in query.split()
+
+
+def test_batch_sends_every_summary_query_to_usaspending():
+    matcher = GrantMatcher('mongodb://unused', 'test', index_server_socket='')
+    matcher.usaspending_queries_per_request = 2
+    payloads = []
+
+    async def fetch(payload, loader):
+        payloads.append(payload)
+        return {'results': []}
+    matcher.usaspending_cache.fetch = fetch
+
+    # No MongoDB here: drop the internal source
+    matcher.sources = [source for source in matcher.sources if source != matcher.fetch_internal_grants]
+
+    items = [
+        {'project_summary': summary, 'focus_area': '', 'org_type': 'nonprofit'}
+        for summary in ('solar panels for schools', 'rural broadband access', 'youth soccer coaching',
+                        'solar panels for schools')
+    ]
+    asyncio.run(matcher.match_batch(items))
+    matcher.usaspending_cache.close()
+
+    sent = [query for payload in payloads for query in payload['filters']['keywords']]
+    assert sorted(sent) == sorted(matcher.usaspending_query(matcher.extract_keywords(item['project_summary']))
+                                  for item in items[:3])
+    assert len(payloads) == 2
+
+
+def test_large_batch_sends_a_bounded_number_of_usaspending_requests():
+    matcher = GrantMatcher('mongodb://unused', 'test', index_server_socket='')
+    payloads = []
+
+    async def fetch(payload, loader):
+        payloads.append(payload)
+        return {'results': []}
+    matcher.usaspending_cache.fetch = fetch
+    matcher.sources = [matcher.fetch_usaspending]
+
+    # A distinct word per summary, so every summary has its own query
+    words = [''.join(chr(ord('a') + i // 26 ** power % 26) for power in range(3)) + 'ville' for i in range(1000)]
+    items = [{'project_summary': f'community garden in {word}'} for word in words]
+    result = asyncio.run(matcher.match_batch(items))
+    matcher.usaspending_cache.close()
+
+    assert result['sources']['included'] == ['usaspending']
+    assert len(payloads) == matcher.usaspending_max_requests
+    assert sum(len(payload['filters']['keywords']) for payload in payloads) == 1000